@@ -0,0 +1,78 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+os.environ.setdefault("REPORT_GEN_CACHE_DIR", tempfile.mkdtemp(prefix="bench_cache_"))
+
+from handlers.csv_handler import CsvHandler
+from utils.bom_index import bom_index_for_file
+from legacy import legacy_build_ref_to_desc
+from synthetic import make_bom
+
+# BOM位号索引（首次构建 / 命中磁盘缓存）与原逐行展开字典的对比
+# 另核对首次构建与从缓存加载的索引查询结果一致（含描述为空的BOM行）
+# 用法：python benchmarks/bench_bom_index.py [--rows 5000] [--max-range 20000] [--lookups 200000] [--empty-ratio 0.02]
+
+def same_values(expected, result):
+    # 空描述（NaN）视为相等
+    return len(expected) == len(result) and all(
+        a == b or (pd.isna(a) and pd.isna(b)) for a, b in zip(expected, result)
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--range-ratio", type=float, default=0.1)
+    parser.add_argument("--max-range", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--empty-ratio", type=float, default=0.02, help="描述为空的BOM行比例")
+    args = parser.parse_args()
+
+    content = make_bom(args.rows, range_ratio=args.range_ratio, max_range=args.max_range, empty_ratio=args.empty_ratio)
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
+        f.write(content)
+        path = f.name
+    try:
+        start = time.perf_counter()
+        ref_to_desc = legacy_build_ref_to_desc(CsvHandler().process_csv(path))
+        legacy_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        built = bom_index_for_file(path)
+        cold_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = bom_index_for_file(path)
+        warm_s = time.perf_counter() - start
+    finally:
+        os.remove(path)
+
+    rng = random.Random(0)
+    keys = rng.sample(list(ref_to_desc), min(args.lookups, len(ref_to_desc)))
+    keys += [f"R{rng.randint(1, 10 ** 7)}" for _ in range(len(keys) // 10)]
+
+    start = time.perf_counter()
+    expected = [ref_to_desc.get(k) for k in keys]
+    dict_lookup_s = time.perf_counter() - start
+    start = time.perf_counter()
+    result = [index.get(k) for k in keys]
+    index_lookup_s = time.perf_counter() - start
+
+    print(f"BOM: {args.rows} rows, {len(ref_to_desc)} designators after expansion, {index}")
+    print(f"legacy expand      : {legacy_s:8.3f}s")
+    print(f"index build (cold) : {cold_s:8.3f}s")
+    print(f"index load (cached): {warm_s:8.3f}s")
+    print(f"{len(keys)} lookups: dict {dict_lookup_s:.3f}s, index {index_lookup_s:.3f}s")
+    print("identical:", same_values(expected, result))
+    print("identical cached/uncached:", np.array_equal(built.lookup_many(keys), index.lookup_many(keys))
+          and same_values(built.descriptions, index.descriptions))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from handlers.dat_handler import DatHandler
+from legacy import legacy_process_dat
+from synthetic import make_dat
+
+# DatHandler.process_dat 单次流式解析与原始三次遍历实现的对比，以及结果表格的内存占用（类型化列 与 原object列）
+# 用法：python benchmarks/bench_dat_parser.py [--steps 1000000]
+
+def same_values(a, b):
+    # 列类型不同（整数/category 与 文本），按显示的文本比较
+    return list(a.columns) == list(b.columns) and a.astype(str).equals(b.astype(str))
+
+def same_result(a, b):
+    return (
+        a["board_name"] == b["board_name"]
+        and a["test_time"] == b["test_time"]
+        and a["coverage"] == b["coverage"]
+        and same_values(a["data"], b["data"])
+        and same_values(a["nc_data"], b["nc_data"])
+    )
+
+def frame_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    content = make_dat(args.steps)
+    print(f"synthetic DAT: {args.steps} steps, {len(content) / 1e6:.1f} MB")
+    with tempfile.NamedTemporaryFile(suffix=".DAT", delete=False) as f:
+        f.write(content)
+        path = f.name
+    try:
+        start = time.perf_counter()
+        legacy = legacy_process_dat(io.BytesIO(content))
+        legacy_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            result = DatHandler(f).process_dat()
+        stream_s = time.perf_counter() - start
+    finally:
+        os.remove(path)
+
+    print(f"legacy   : {legacy_s:8.2f}s")
+    print(f"streaming: {stream_s:8.2f}s  ({legacy_s / stream_s:.1f}x)")
+    print(f"memory   : {frame_mb(legacy['data']):8.1f} MB -> {frame_mb(result['data']):.1f} MB "
+          f"({dict(result['data'].dtypes.astype(str))})")
+    print("identical:", same_result(legacy, result))
+
+if __name__ == "__main__":
+    main()
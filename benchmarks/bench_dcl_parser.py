@@ -0,0 +1,44 @@
+import argparse
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from handlers.dcl_handler import DclHandler
+from legacy import legacy_process_dcl
+from synthetic import make_dcl
+
+# DCL解析：原逐行拆分+逐行dict 与 Component_Data整块read_csv+整列映射 的对比，并核对结果一致
+# 用法：python benchmarks/bench_dcl_parser.py [--steps 200000] [--records 4]
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=200_000)
+    parser.add_argument("--records", type=int, default=4, help="多记录文件（多联板）的记录数")
+    args = parser.parse_args()
+
+    content = make_dcl(args.steps)
+    print(f"synthetic DCL: {args.steps} steps, {len(content) / 1e6:.1f} MB")
+    (legacy_header, legacy_df), legacy_s = timed(lambda: legacy_process_dcl(io.BytesIO(content)))
+    (header, df), new_s = timed(lambda: DclHandler(io.BytesIO(content)).process_dcl())
+    print(f"legacy line loop : {legacy_s:7.3f}s")
+    print(f"read_csv columns : {new_s:7.3f}s  ({legacy_s / new_s:.1f}x)")
+    # 拼板拆分后表头另有 panel、panel_result、detail_result 等字段，只比较原有字段
+    same = legacy_header == {key: header.get(key) for key in legacy_header} and list(legacy_df.columns) == list(df.columns) and legacy_df.astype(str).equals(df.astype(str))
+    print("identical:", same)
+
+    content = make_dcl(args.steps // args.records, records=args.records)
+    records, records_s = timed(lambda: DclHandler(io.BytesIO(content)).process_records())
+    print(f"{args.records} records       : {records_s:7.3f}s, "
+          + ", ".join(f"{h['board_name']} {h['passfail']} {len(d)} rows" for h, d in records))
+
+if __name__ == "__main__":
+    main()
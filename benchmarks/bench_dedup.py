@@ -0,0 +1,42 @@
+import argparse
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from handlers.dat_handler import DatHandler
+from utils.report_utils import dedup_main_comp
+from legacy import legacy_dedup_main_comp
+from synthetic import make_dat
+
+# 主编号去重：原7次apply+多列排序 与 合成优先级+分组取最小 的对比，并核对保留的行完全一致
+# 用法：python benchmarks/bench_dedup.py [--steps 200000] [--designators 5000]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=200_000)
+    parser.add_argument("--designators", type=int, default=5000)
+    args = parser.parse_args()
+
+    df = DatHandler(io.BytesIO(make_dat(args.steps, n_designators=args.designators))).process_dat()["data"]
+
+    start = time.perf_counter()
+    expected_unique, expected_dup = legacy_dedup_main_comp(df)
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    unique, dup = dedup_main_comp(df)
+    new_s = time.perf_counter() - start
+
+    print(f"{len(df)} rows -> {len(unique)} unique, {len(dup)} duplicates")
+    print(f"legacy apply + sort   : {legacy_s:8.3f}s")
+    print(f"packed priority + min : {new_s:8.3f}s")
+    same = (expected_unique.equals(unique) and expected_unique.index.equals(unique.index)
+            and expected_dup.equals(dup) and expected_dup.index.equals(dup.index))
+    print("identical:", same)
+
+if __name__ == "__main__":
+    main()
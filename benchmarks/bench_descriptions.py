@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import io
+from handlers.csv_handler import CsvHandler
+from handlers.dat_handler import DatHandler
+from utils.bom_index import BomIndex
+from utils.report_utils import resolve_descriptions
+from legacy import legacy_build_ref_to_desc, legacy_get_description
+from synthetic import make_bom, make_dat
+
+# Description列：原逐行get_description与整列resolve_descriptions的对比
+# 用法：python benchmarks/bench_descriptions.py [--steps 200000] [--bom-rows 2000]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=200_000)
+    parser.add_argument("--bom-rows", type=int, default=2000)
+    parser.add_argument("--max-range", type=int, default=50)
+    args = parser.parse_args()
+
+    components = DatHandler(io.BytesIO(make_dat(args.steps, n_designators=5000))).process_dat()["data"]["Components"]
+    csv_df = CsvHandler().process_csv(io.BytesIO(make_bom(args.bom_rows, max_range=args.max_range)))
+    ref_to_desc = legacy_build_ref_to_desc(csv_df)
+    index = BomIndex.from_frame(csv_df)
+
+    start = time.perf_counter()
+    expected = components.apply(lambda x: legacy_get_description(x, ref_to_desc))
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = resolve_descriptions(components, index)
+    bulk_s = time.perf_counter() - start
+
+    print(f"{len(components)} rows, {components.nunique()} unique Components, {index}")
+    print(f"legacy apply : {legacy_s:8.3f}s")
+    print(f"bulk resolve : {bulk_s:8.3f}s")
+    print("identical:", expected.equals(result))
+
+if __name__ == "__main__":
+    main()
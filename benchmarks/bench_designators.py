@@ -0,0 +1,65 @@
+import argparse
+import io
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from handlers import designator
+from handlers.dat_handler import DatHandler
+from handlers.testable_rules import get_default_rules
+from utils.bom_index import bom_index_for_file
+from utils.report_utils import dedup_main_comp, merge_description
+from synthetic import make_bom, make_dat
+
+# 元件编号驻留表（handlers/designator.py）：同一产品的第一块板（表为空，每个编号在查Description时解析一次）
+# 与之后的板（编号已在表中，各阶段只查表）逐阶段的耗时，并核对两次的结果一致；Testable判定不经过此表，作为参照
+# 用法：python benchmarks/bench_designators.py [--steps 200000] [--designators 5000] [--repeat 3]
+
+def run(df, components, skips, rules, index):
+    timings = {}
+    start = time.perf_counter()
+    codes = rules.classify_codes(components, skips)
+    timings["testable"] = time.perf_counter() - start
+    start = time.perf_counter()
+    df_with_desc, _ = merge_description(df.copy(), index)
+    timings["description"] = time.perf_counter() - start
+    start = time.perf_counter()
+    unique, dup = dedup_main_comp(df_with_desc)
+    timings["dedup"] = time.perf_counter() - start
+    return timings, (codes, df_with_desc, unique, dup)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=200_000)
+    parser.add_argument("--designators", type=int, default=5000, help="不同主编号数（测试名另有_1、-PX、/NP等变体）")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    df = DatHandler(io.BytesIO(make_dat(args.steps, n_designators=args.designators))).process_dat()["data"]
+    index = bom_index_for_file(io.BytesIO(make_bom(max(1, args.steps // 4))))
+    components, skips = df["Components"].tolist(), df["Skip"].astype(str).tolist()
+    rules = get_default_rules()
+    print(f"{len(df)} rows, {df['Components'].nunique()} unique Components")
+
+    first = later = None
+    for _ in range(args.repeat):
+        designator._table.clear()
+        cold, expected = run(df, components, skips, rules, index)
+        warm, result = run(df, components, skips, rules, index)
+        first = cold if first is None else {k: min(v, first[k]) for k, v in cold.items()}
+        later = warm if later is None else {k: min(v, later[k]) for k, v in warm.items()}
+    print(f"{'stage':<12} {'first board':>12} {'later boards':>13}")
+    for stage in first:
+        print(f"{stage:<12} {first[stage]:11.3f}s {later[stage]:12.3f}s")
+    print(f"{'total':<12} {sum(first.values()):11.3f}s {sum(later.values()):12.3f}s")
+    print(f"interned designators: {len(designator._table)}")
+    same = ((expected[0] == result[0]).all() and all(a.equals(b) and a.index.equals(b.index) for a, b in zip(expected[1:], result[1:])))
+    print("identical:", same)
+
+if __name__ == "__main__":
+    main()
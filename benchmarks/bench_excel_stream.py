@@ -0,0 +1,74 @@
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import pandas as pd
+from handlers.dcl_handler import DclHandler
+from utils.excel_utils import fill_template_excel
+from utils.excel_stream import stream_template_excel
+
+# 报告写出：openpyxl整本加载写入 与 流式生成XML 的耗时及Python内存峰值（tracemalloc）对比
+# 用法：python benchmarks/bench_excel_stream.py [--rows 10000 50000] [--skip-openpyxl-above 50000]
+
+def make_frames(n_rows):
+    with open(os.path.join(ROOT, "500504.csv"), "rb") as f:
+        header_data, component_df = DclHandler(f).process_dcl()
+    repeat = -(-n_rows // len(component_df))
+    component_df = pd.concat([component_df] * repeat, ignore_index=True).head(n_rows)
+    parts = pd.DataFrame({
+        "Step": [str(i) for i in range(1, n_rows + 1)],
+        "No.": range(1, n_rows + 1),
+        "Components": [f"R{i}/C{i + 1}" for i in range(n_rows)],
+        "Testable": ["Y", "N", "L", "Y"] * (n_rows // 4) + ["Y"] * (n_rows % 4),
+        "Skip": "0",
+        "Description": "RES SMD 10K 0603 1%",
+    })
+    report = {"data": parts, "nc_data": pd.DataFrame(), "board_name": "SYN001", "test_time": "", "coverage": 0.75}
+    return header_data, component_df, report
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--skip-openpyxl-above", type=int, default=50_000)
+    parser.add_argument("--template", default=os.path.join(ROOT, "template.xlsx"))
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    # 先各生成一次小报告，模板缓存不计入测量
+    header_data, component_df, report = make_frames(10)
+    fill_template_excel(args.template, component_df, pd.DataFrame(), header_data, report)
+    stream_template_excel(args.template, io.BytesIO(), component_df, header_data, report)
+
+    for n_rows in args.rows:
+        header_data, component_df, report = make_frames(n_rows)
+        with tempfile.TemporaryDirectory() as tmp:
+            out_path = os.path.join(tmp, "report.xlsx")
+            stream_s, stream_mb = measure(lambda: stream_template_excel(
+                args.template, out_path, component_df, header_data, report))
+            size_mb = os.path.getsize(out_path) / 2 ** 20
+        line = f"{n_rows:>8} rows x 2 sheets  stream: {stream_s:7.2f}s peak {stream_mb:7.1f} MB (file {size_mb:.1f} MB)"
+        if n_rows <= args.skip_openpyxl_above:
+            opx_s, opx_mb = measure(lambda: fill_template_excel(
+                args.template, component_df, pd.DataFrame(), header_data, report))
+            line += f"  | openpyxl: {opx_s:7.2f}s peak {opx_mb:7.1f} MB"
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import io
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import openpyxl
+import pandas as pd
+from handlers.csv_handler import CsvHandler
+from handlers.dat_handler import DatHandler
+from handlers.dcl_handler import DclHandler
+from utils.bom_index import BomIndex
+from utils.excel_utils import fill_template_excel
+from utils.report_utils import merge_description, dedup_main_comp, calc_coverage
+from legacy import legacy_fill_template_excel
+from synthetic import make_bom, make_dat
+
+# Excel报告写入：原iterrows逐格写入+重复加边框 与 按行元组批量写入+共用样式 的对比
+# 用法：python benchmarks/bench_excel_writer.py [--steps 2000] [--dcl-rows 2000]（原实现在上万行时需数分钟）
+
+def cell_dump(data):
+    wb = openpyxl.load_workbook(io.BytesIO(data))
+    out = []
+    for ws in wb.worksheets:
+        for row in ws.iter_rows():
+            for c in row:
+                b = c.border
+                out.append((ws.title, c.coordinate, c.value, c.number_format, c.font.name, c.font.sz,
+                            b.left.style, b.right.style, b.top.style, b.bottom.style,
+                            c.alignment.horizontal, c.alignment.vertical))
+    return out
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--dcl-rows", type=int, default=2000)
+    parser.add_argument("--template", default=os.path.join(ROOT, "template.xlsx"))
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    with open(os.path.join(ROOT, "500504.csv"), "rb") as f:
+        header_data, component_df = DclHandler(f).process_dcl()
+    repeat = -(-args.dcl_rows // len(component_df))
+    component_df = pd.concat([component_df] * repeat, ignore_index=True).head(args.dcl_rows)
+    dat_data = DatHandler(io.BytesIO(make_dat(args.steps, n_designators=args.steps))).process_dat()
+    index = BomIndex.from_frame(CsvHandler().process_csv(io.BytesIO(make_bom(args.steps // 3))))
+    df_with_desc, _ = merge_description(dat_data["data"], index)
+    df_unique, _ = dedup_main_comp(df_with_desc)
+    report = {
+        "data": df_unique,
+        "nc_data": dat_data["nc_data"],
+        "board_name": "SYN001",
+        "test_time": "",
+        "coverage": calc_coverage(df_unique)[3],
+    }
+
+    start = time.perf_counter()
+    expected = legacy_fill_template_excel(args.template, component_df, pd.DataFrame(), header_data, report)
+    legacy_s = time.perf_counter() - start
+
+    timings = {}
+    start = time.perf_counter()
+    result = fill_template_excel(args.template, component_df, pd.DataFrame(), header_data, report, timings)
+    new_s = time.perf_counter() - start
+
+    print(f"Test Result rows: {len(component_df)}, PartsCoverage rows: {len(df_unique)}")
+    print(f"legacy iterrows + styling passes: {legacy_s:8.3f}s")
+    print(f"row tuples + shared styles      : {new_s:8.3f}s  "
+          + ", ".join(f"{k}={v:.3f}" for k, v in timings.items()))
+    # 同一模板第二次生成：模板已缓存，不再解析xlsx
+    start = time.perf_counter()
+    fill_template_excel(args.template, component_df, pd.DataFrame(), header_data, report, timings)
+    print(f"second report (cached template) : {time.perf_counter() - start:8.3f}s  "
+          + ", ".join(f"{k}={v:.3f}" for k, v in timings.items()))
+    print("identical values and styles:", cell_dump(expected.getvalue()) == cell_dump(result.getvalue()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from handlers.dcl_handler import DclHandler
+from utils.history import failure_rate, record_run, top_failures, yield_trend
+from synthetic import make_dcl
+
+# 历史结果库：写入N次运行后查询元件失败率、良率趋势、失败最多元件的耗时，
+# 与不建库、每次查询都重新解析全部原始DCL统计的耗时（按解析单个文件的耗时估算）对比
+# 用法：python benchmarks/bench_history.py [--runs 2000] [--steps 400] [--variants 20]
+
+def parse(data):
+    return DclHandler(io.BytesIO(data)).process_dcl()
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=2000, help="写入的运行数")
+    parser.add_argument("--steps", type=int, default=400, help="每次运行的测试步数")
+    parser.add_argument("--variants", type=int, default=20, help="不同的DCL文件数（循环使用）")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_history_"), "history.sqlite")
+    files = [make_dcl(args.steps, seed=seed, fail_ratio=0.01) for seed in range(args.variants)]
+    parsed = [parse(data) for data in files]
+    component = parsed[0][1]["Component Name"].iloc[0].split("-")[0]
+
+    start = time.perf_counter()
+    for i in range(args.runs):
+        header_data, component_df = parsed[i % len(parsed)]
+        day, second = divmod(i, 100)  # 每天100次运行
+        header = dict(header_data, test_time=f"2025-{7 + day // 28:02d}-{1 + day % 28:02d} {second // 60:02d}:{second % 60:02d}:00")
+        record_run(header, component_df, run_key=f"bench-{i}", path=path)
+    write_s = time.perf_counter() - start
+    print(f"{args.runs} runs x {args.steps} steps, db {os.path.getsize(path) / 1e6:.1f} MB")
+    print(f"record_run            : {write_s / args.runs * 1e3:7.2f} ms/run")
+
+    _, parse_s = timed(lambda: parse(files[0]), repeat=3)
+    print(f"reparse all DCLs (est): {parse_s * args.runs:7.3f}s ({parse_s * 1e3:.1f} ms/file)")
+
+    rate, rate_s = timed(lambda: failure_rate(component, path=path))
+    print(f"failure_rate {component:<9}: {rate_s * 1e3:7.2f} ms ({rate['runs']} runs, {rate['rate']:.2%})")
+    _, last_s = timed(lambda: failure_rate(component, last=100, path=path))
+    print(f"failure_rate last 100 : {last_s * 1e3:7.2f} ms")
+    trend, trend_s = timed(lambda: yield_trend(path=path))
+    print(f"yield_trend (day)     : {trend_s * 1e3:7.2f} ms ({len(trend)} days)")
+    _, top_s = timed(lambda: top_failures(path=path))
+    print(f"top_failures          : {top_s * 1e3:7.2f} ms")
+
+if __name__ == "__main__":
+    main()
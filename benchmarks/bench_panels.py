@@ -0,0 +1,46 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+os.environ.setdefault("REPORT_GEN_CACHE_DIR", tempfile.mkdtemp(prefix="bench_cache_"))
+
+from batch import run_batch
+from synthetic import make_dat, make_dcl
+
+# 拼板：每个子板一个任务并行生成报告，整板耗时 与 各子板耗时之和、最慢子板 的对比
+# 用法：python benchmarks/bench_panels.py [--panels 8] [--steps 5000] [-j 进程数...]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--panels", type=int, default=8, help="子板数")
+    parser.add_argument("--steps", type=int, default=5000, help="每个子板的测试步数")
+    parser.add_argument("-j", "--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_panels_")
+    try:
+        with open(os.path.join(work_dir, "PANEL.dcl"), "wb") as f:
+            f.write(make_dcl(args.steps, board="PANEL", records=args.panels))
+        with open(os.path.join(work_dir, "PANEL.DAT"), "wb") as f:
+            f.write(make_dat(args.steps, board="PANEL"))
+        shutil.copy(os.path.join(ROOT, "BOM.csv"), work_dir)
+        template = os.path.join(ROOT, "template.xlsx")
+        print(f"{args.panels} sub-boards x {args.steps} steps, {os.cpu_count()} CPUs")
+        for workers in args.workers:
+            start = time.perf_counter()
+            results = run_batch(work_dir, template, os.path.join(work_dir, f"out_{workers}"), workers)
+            wall = time.perf_counter() - start
+            times = [r["total_s"] for r in results]
+            ok = sum(1 for r in results if r["status"] == "ok")
+            print(f"-j {workers:<3}: {ok}/{len(results)} ok, wall {wall:6.2f}s, "
+                  f"sum of sub-boards {sum(times):6.2f}s, slowest {max(times):6.2f}s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+os.environ["REPORT_GEN_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_cache_")
+
+from handlers.csv_handler import CsvHandler
+from handlers.dat_handler import DatHandler
+from utils import parse_cache
+from synthetic import make_bom, make_dat
+
+# 解析缓存：直接解析 与 首次（解析+写磁盘）/ 内存命中 / 磁盘命中（新进程）的对比
+# 用法：python benchmarks/bench_parse_cache.py [--steps 200000] [--bom-rows 50000]
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=200_000)
+    parser.add_argument("--bom-rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    inputs = [
+        ("DAT", make_dat(args.steps), lambda data: DatHandler(io.BytesIO(data)).process_dat()["data"], lambda data: parse_cache.parse_dat(io.BytesIO(data))["data"]),
+        ("BOM", make_bom(args.bom_rows, extra_cols=12), lambda data: CsvHandler().process_csv(io.BytesIO(data)), lambda data: parse_cache.parse_csv(io.BytesIO(data))),
+    ]
+    for name, data, direct, cached in inputs:
+        expected, direct_s = timed(lambda: direct(data))
+        _, cold_s = timed(lambda: cached(data))
+        _, memory_s = timed(lambda: cached(data))
+        parse_cache._results.clear()  # 模拟新进程：只剩磁盘缓存
+        result, disk_s = timed(lambda: cached(data))
+        print(f"{name}: {len(data) / 1e6:.1f} MB, {len(expected)} rows")
+        print(f"  parse          : {direct_s:7.3f}s")
+        print(f"  cached (cold)  : {cold_s:7.3f}s")
+        print(f"  memory hit     : {memory_s:7.3f}s")
+        print(f"  disk hit       : {disk_s:7.3f}s")
+        print("  identical:", expected.equals(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+os.environ.setdefault("REPORT_GEN_CACHE_DIR", tempfile.mkdtemp(prefix="bench_cache_"))
+os.environ["REPORT_GEN_PARSE_CACHE_MB"] = "0"  # 不写磁盘缓存，内存缓存每次清空，记录的是解析器本身的耗时
+
+from batch import build_report
+from utils import parse_cache
+from utils.profiling import TRACEMALLOC_ENV, Profiler, stage_summary
+from synthetic import make_bom, make_dat, make_dcl
+
+# 性能记录的开销：同一块合成板 不记录 / 记录耗时与RSS / 另外统计tracemalloc 三种方式生成报告的总耗时，
+# 并输出各阶段的耗时、行数和内存，找出大板上最慢的阶段
+# 用法：python benchmarks/bench_profiling.py [--steps 20000] [--repeat 3]
+
+def run(paths, template, profiler, repeat):
+    best = None
+    for _ in range(repeat):
+        profiler.records = []
+        parse_cache._results.clear()
+        start = time.perf_counter()
+        build_report(*paths, template, output=os.path.join(os.path.dirname(paths[0]), "out.xlsx"), history=False, profiler=profiler)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    work_dir = tempfile.mkdtemp(prefix="bench_profiling_")
+    paths = []
+    for name, data in (("SYN.dcl", make_dcl(args.steps)), ("SYN.DAT", make_dat(args.steps)), ("BOM.csv", make_bom(args.steps // 4))):
+        paths.append(os.path.join(work_dir, name))
+        with open(paths[-1], "wb") as f:
+            f.write(data)
+    template = os.path.join(ROOT, "template.xlsx")
+    profile = os.path.join(work_dir, "profile.jsonl")
+    print(f"{args.steps} steps")
+
+    off_s = run(paths, template, Profiler(enabled=False), args.repeat)
+    profiler = Profiler("SYN", path=profile)
+    on_s = run(paths, template, profiler, args.repeat)
+    os.environ[TRACEMALLOC_ENV] = "1"
+    traced = Profiler("SYN", path=profile)
+    traced_s = run(paths, template, traced, 1)
+    print(f"profiling off         : {off_s:7.3f}s")
+    print(f"profiling on          : {on_s:7.3f}s ({(on_s / off_s - 1) * 100:+.1f}%)")
+    print(f"profiling + tracemalloc: {traced_s:6.3f}s ({(traced_s / off_s - 1) * 100:+.1f}%)")
+
+    peaks = {record["stage"]: record.get("py_peak_bytes", 0) for record in traced.records}
+    print(f"{'stage':<12} {'wall_s':>8} {'rows':>8} {'py_peak_MB':>11}")
+    for stage, _, total, _, rows in stage_summary(profiler.records):
+        print(f"{stage:<12} {total:8.3f} {rows:8d} {peaks.get(stage, 0) / 1e6:11.1f}")
+
+if __name__ == "__main__":
+    main()
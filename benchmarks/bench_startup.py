@@ -0,0 +1,82 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 冷启动耗时：用 python -X importtime 导入各入口模块，统计导入总耗时、子进程总耗时和各顶层包的导入耗时
+# 入口（桌面版、网页版、批处理、报告服务、历史查询）在显示界面或解析参数前不应导入 pandas / openpyxl 等重依赖，
+# 这些模块在首次使用时导入，或在界面显示后由 utils/warmup.py 在后台线程中预先导入
+# 用法：python benchmarks/bench_startup.py [--repeat 5] [--top 8] [--check]
+#   --check：有入口在启动时导入了 HEAVY_PACKAGES 中的包时返回1
+
+ENTRIES = [
+    ("desktop", "exeuse"),
+    ("streamlit", "app"),
+    ("batch", "batch"),
+    ("service", "service"),
+    ("history", "history"),
+    ("pipeline", "utils.pipeline"),  # 参照：处理流程本身需要导入的全部模块
+]
+LAZY_ENTRIES = {"desktop", "streamlit", "batch", "service"}  # 启动时不应导入重依赖的入口
+HEAVY_PACKAGES = {"pandas", "numpy", "openpyxl"}
+
+def import_profile(module):
+    # 在新进程中导入module，返回 (导入总耗时秒, 子进程总耗时秒, {顶层包: 自身导入耗时秒})；导入失败时返回错误信息
+    code = f"import sys; sys.path.insert(0, {os.path.join(ROOT, 'src')!r}); sys.path.insert(0, {ROOT!r}); import {module}"
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, cwd=ROOT)
+    wall_s = time.perf_counter() - start
+    if proc.returncode != 0:
+        return proc.stderr.strip().splitlines()[-1]
+    total_us = 0
+    packages = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us)
+        if not name.startswith("  "):  # 顶层导入的累计耗时之和为总耗时
+            total_us += int(cumulative_us)
+    return total_us / 1e6, wall_s, {name: us / 1e6 for name, us in packages.items()}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5, help="每个入口导入的次数，取最快的一次")
+    parser.add_argument("--top", type=int, default=8, help="显示导入最慢的顶层包数")
+    parser.add_argument("--check", action="store_true", help="入口启动时导入了重依赖时返回1")
+    args = parser.parse_args()
+
+    eager = []
+    print(f"Python {sys.version.split()[0]}, best of {args.repeat}")
+    for name, module in ENTRIES:
+        best = None
+        for _ in range(args.repeat):
+            result = import_profile(module)
+            if isinstance(result, str):
+                best = result
+                break
+            if best is None or result[0] < best[0]:
+                best = result
+        if isinstance(best, str):
+            print(f"{name:<10} {module:<15} skipped: {best}")  # 未安装PyQt5 / streamlit等
+            continue
+        total_s, wall_s, packages = best
+        heavy = sorted(HEAVY_PACKAGES & packages.keys())
+        slowest = sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+        print(f"{name:<10} {module:<15} import {total_s * 1e3:7.1f} ms, process {wall_s * 1e3:7.1f} ms, "
+              f"heavy: {', '.join(heavy) or '-'}")
+        print("    " + ", ".join(f"{package} {seconds * 1e3:.1f}" for package, seconds in slowest))
+        if name in LAZY_ENTRIES and heavy:
+            eager.append(name)
+    if args.check and eager:
+        print("启动时导入了重依赖：" + "，".join(eager))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
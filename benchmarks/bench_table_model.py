@@ -0,0 +1,61 @@
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from handlers.dat_handler import DatHandler
+from utils.frame_view import FrameView
+from synthetic import make_dat
+
+# 桌面版结果表格：原逐单元格 str() 生成全部文本（QTableWidgetItem之前的部分，不含Qt对象本身的开销）
+# 与 FrameView 打开 + 显示一屏 + 排序 + 筛选 的耗时和内存对比
+# 用法：python benchmarks/bench_table_model.py [--steps 200000] [--visible 40]
+
+def measure(func):
+    # 耗时与内存分两次测量，tracemalloc会明显拖慢耗时
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def legacy_cells(df):
+    return [[str(value) for value in row] for row in df.itertuples(index=False)]
+
+def visible_cells(view, visible):
+    return [[view.cell(i, j) for j in range(view.column_count())] for i in range(min(visible, view.row_count()))]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=200_000)
+    parser.add_argument("--visible", type=int, default=40, help="一屏显示的行数")
+    args = parser.parse_args()
+
+    df = DatHandler(io.BytesIO(make_dat(args.steps))).process_dat()["data"]
+    print(f"{len(df)} rows x {df.shape[1]} columns")
+
+    cells, legacy_s, legacy_mem = measure(lambda: legacy_cells(df))
+    print(f"legacy str() per cell : {legacy_s:7.3f}s, peak {legacy_mem / 1e6:7.1f} MB")
+
+    view, open_s, open_mem = measure(lambda: FrameView(df))
+    first, show_s, _ = measure(lambda: visible_cells(view, args.visible))
+    print(f"view open             : {open_s:7.3f}s, peak {open_mem / 1e6:7.1f} MB")
+    print(f"view first screen     : {show_s:7.3f}s")
+    print("identical first screen:", first == cells[:args.visible])
+
+    column = view.columns.index("Components") if "Components" in view.columns else 0
+    _, sort_s, sort_mem = measure(lambda: view.sort(column, descending=True))
+    _, filter_s, filter_mem = measure(lambda: view.filter("R1"))
+    print(f"view sort             : {sort_s:7.3f}s, peak {sort_mem / 1e6:7.1f} MB")
+    print(f"view filter           : {filter_s:7.3f}s, peak {filter_mem / 1e6:7.1f} MB ({view.row_count()} rows)")
+
+if __name__ == "__main__":
+    main()
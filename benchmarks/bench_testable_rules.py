@@ -0,0 +1,46 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from handlers.testable_rules import TestableRules
+from legacy import legacy_classify
+from synthetic import make_component
+
+# Testable 判定：查找表整列判定与原逐行 if/else 对比
+# 用法：python benchmarks/bench_testable_rules.py [--rows 500000] [--pool 5000]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--pool", type=int, default=0, help="从N个不同元件中抽样（模拟重复编号），0表示不限制")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    if args.pool:
+        pool = [make_component(rng, suffix_ratio=0.5)[0] for _ in range(args.pool)]
+        components = [rng.choice(pool) for _ in range(args.rows)]
+    else:
+        components = [make_component(rng, suffix_ratio=0.5)[0] for _ in range(args.rows)]
+    skips = [rng.choice(["0", "0", "0", "1", ""]) for _ in range(args.rows)]
+    rules = TestableRules.load()
+
+    start = time.perf_counter()
+    expected = [legacy_classify(c, s) for c, s in zip(components, skips)]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = rules.classify(components, skips)
+    table_s = time.perf_counter() - start
+
+    print(f"rows: {args.rows}, unique components: {len(set(components))}")
+    print(f"legacy loop : {legacy_s:8.3f}s")
+    print(f"rules engine: {table_s:8.3f}s  ({legacy_s / table_s:.1f}x)")
+    print("identical:", list(result) == expected)
+
+if __name__ == "__main__":
+    main()
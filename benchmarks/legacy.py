@@ -0,0 +1,540 @@
+import pandas as pd
+import re
+import openpyxl
+from io import BytesIO, StringIO
+from openpyxl.cell.cell import MergedCell
+from openpyxl.styles import Alignment, Border, Side
+
+# 优化前的原始实现，仅用于基准测试中对比结果与耗时
+
+def legacy_process_dat(file):
+    board_name = ""
+    test_time = ""
+    test_rows = []
+    nc_rows = []
+    content = file.read().decode('utf-8')
+    lines = content.splitlines()
+    # 提取板名和时间
+    for line in lines:
+        if line.startswith("! Board Name:"):
+            parts = line.split("Time:")
+            if len(parts) == 2:
+                board_name = parts[0].replace("! Board Name:", "").strip()
+                test_time = parts[1].strip()
+
+    # 查找step为1的数据行作为数据区第一行
+    data_start = 0
+    for idx, line in enumerate(lines):
+        l = line.strip()
+        if not l or l.startswith("!"):
+            continue
+        m = re.match(r'^(\d+)', l)
+        if m and m.group(1) == "1":
+            data_start = idx
+            break
+
+    i = data_start
+    while i < len(lines):
+        line = lines[i].strip()
+        if not line or line.startswith("!"):
+            i += 1
+            continue
+        match = re.match(r'^(\d+)\s+([^\s]+)', line)
+        if match:
+            step = match.group(1)
+            parts_n = match.group(2)
+            tokens = line.split()
+            # 校验skip字段，只能是0或1，且其后一列为字母
+            skip = ""
+            for idx_token in range(len(tokens) - 1):
+                if tokens[idx_token] in ("0", "1") and tokens[idx_token + 1].isalpha():
+                    skip = tokens[idx_token]
+                    break
+            # /NC 特殊处理
+            if "/NC" in parts_n.upper():
+                nc_rows.append({
+                    "Step": step,
+                    "No.": None,
+                    "Components": parts_n,
+                    "Testable": "NC",
+                    "Skip": skip
+                })
+                i += 1
+                continue
+
+            # 新增特殊规则
+            testable = ""
+            parts_n_upper = parts_n.upper()
+            group_y = ["R", "IC", "U", "C", "Q", "D"]
+            group_n = ["SG", "L", "NP", "RM", "VM", "PCB"]
+            group_l = ["TVS", "PCB"]
+
+            def match_any(comp, group):
+                for g in group:
+                    if comp == g:
+                        return True
+                return False
+
+            # 优先用/后缀判断
+            if "/" in parts_n_upper:
+                suffix = parts_n_upper.split("/")[-1]
+                prefix_match = re.match(r"^([A-Z]+)\d+", parts_n_upper)
+                prefix = prefix_match.group(1) if prefix_match else ""
+                if skip == "0":
+                    if match_any(suffix, group_n):
+                        testable = "N"
+                    elif match_any(suffix, group_y):
+                        testable = "Y"
+                    elif match_any(suffix, group_l):
+                        testable = "L"
+                    else:
+                        # 如果/后面没命中，再用前缀判断
+                        if prefix and match_any(prefix, group_y):
+                            testable = "Y"
+                        elif prefix and match_any(prefix, group_n):
+                            testable = "N"
+                        elif prefix and match_any(prefix, group_l):
+                            testable = "L"
+                        else:
+                            testable = ""
+                elif skip == "1":
+                    if match_any(suffix, group_n):
+                        testable = "N"
+                    elif match_any(suffix, group_y):
+                        testable = "L"
+                    elif match_any(suffix, group_l):
+                        testable = "L"
+                    else:
+                        if prefix and match_any(prefix, group_n):
+                            testable = "N"
+                        elif prefix and match_any(prefix, group_y):
+                            testable = "L"
+                        elif prefix and match_any(prefix, group_l):
+                            testable = "L"
+                        else:
+                            testable = ""
+                else:
+                    testable = ""
+            else:
+                # 没有/，直接判断
+                if skip == "0":
+                    testable = "Y"
+                elif skip == "1":
+                    testable = ""
+                else:
+                    testable = ""
+
+            test_rows.append({
+                "Step": step,
+                "No.": None,
+                "Components": parts_n,
+                "Testable": testable,
+                "Skip": skip
+            })
+        i += 1
+
+    df = pd.DataFrame(test_rows)
+    nc_df = pd.DataFrame(nc_rows)
+    # No.为自然序号，Step为原始编号
+    if not df.empty:
+        df["No."] = range(1, len(df) + 1)
+    if not nc_df.empty:
+        nc_df["No."] = range(1, len(nc_df) + 1)
+
+    # 计算覆盖率
+    y_count = df["Testable"].value_counts().get("Y", 0)
+    n_count = df["Testable"].value_counts().get("N", 0)
+    l_count = df["Testable"].value_counts().get("L", 0)
+    total = y_count + n_count + l_count
+    coverage = (y_count + l_count) / total if total > 0 else 0
+
+    return {
+        "board_name": board_name,
+        "test_time": test_time,
+        "data": df,
+        "nc_data": nc_df,
+        "coverage": coverage
+    }
+
+def legacy_classify(parts_n, skip):
+    # 原 process_dat 循环内的逐行 Y/N/L 判定
+    testable = ""
+    parts_n_upper = parts_n.upper()
+    group_y = ["R", "IC", "U", "C", "Q", "D"]
+    group_n = ["SG", "L", "NP", "RM", "VM", "PCB"]
+    group_l = ["TVS", "PCB"]
+
+    def match_any(comp, group):
+        for g in group:
+            if comp == g:
+                return True
+        return False
+
+    if "/" in parts_n_upper:
+        suffix = parts_n_upper.split("/")[-1]
+        prefix_match = re.match(r"^([A-Z]+)\d+", parts_n_upper)
+        prefix = prefix_match.group(1) if prefix_match else ""
+        if skip == "0":
+            if match_any(suffix, group_n):
+                testable = "N"
+            elif match_any(suffix, group_y):
+                testable = "Y"
+            elif match_any(suffix, group_l):
+                testable = "L"
+            else:
+                if prefix and match_any(prefix, group_y):
+                    testable = "Y"
+                elif prefix and match_any(prefix, group_n):
+                    testable = "N"
+                elif prefix and match_any(prefix, group_l):
+                    testable = "L"
+                else:
+                    testable = ""
+        elif skip == "1":
+            if match_any(suffix, group_n):
+                testable = "N"
+            elif match_any(suffix, group_y):
+                testable = "L"
+            elif match_any(suffix, group_l):
+                testable = "L"
+            else:
+                if prefix and match_any(prefix, group_n):
+                    testable = "N"
+                elif prefix and match_any(prefix, group_y):
+                    testable = "L"
+                elif prefix and match_any(prefix, group_l):
+                    testable = "L"
+                else:
+                    testable = ""
+        else:
+            testable = ""
+    else:
+        if skip == "0":
+            testable = "Y"
+        elif skip == "1":
+            testable = ""
+        else:
+            testable = ""
+    return testable
+
+def legacy_process_csv(file):
+    for encoding in ["utf-8", "gbk", "latin1"]:
+        try:
+            df = pd.read_csv(file, encoding=encoding)
+            if not df.empty:
+                break
+        except pd.errors.EmptyDataError:
+            return pd.DataFrame()
+        except Exception:
+            continue
+    else:
+        return pd.DataFrame()
+
+    needed_cols = []
+    if "Reference" in df.columns:
+        needed_cols.append("Reference")
+    if "Description" in df.columns:
+        needed_cols.append("Description")
+    if needed_cols:
+        df = df[needed_cols]
+        df["Reference"] = df["Reference"].astype(str)
+        df["Description"] = df["Description"].astype(str)
+    return df
+
+def legacy_process_dcl(file):
+    header_fields = []
+    header_values = []
+    in_header = False
+    component_fields = []
+    component_rows = []
+    in_component = False
+
+    content = file.read().decode('utf-8')
+    f = StringIO(content)
+
+    for line in f:
+        line = line.strip()
+        # Header_Data 区块
+        if line.startswith("// Header_Data"):
+            in_header = True
+            in_component = False
+            continue
+        if in_header and line.startswith("//"):
+            header_fields = [x.strip() for x in line[2:].split(',')]
+            continue
+        if in_header and line and not line.startswith("//"):
+            header_values = [x.strip() for x in line.split(',')]
+            in_header = False  # 只取第一条
+            continue
+        # Component_Data 区块
+        if line.startswith("// Component_Data"):
+            in_component = True
+            continue
+        if in_component and line.startswith("//"):
+            component_fields = [x.strip() for x in line[2:].split(',')]
+            continue
+        if in_component and line and not line.startswith("//"):
+            row = [x.strip() for x in line.split(',')]
+            if len(row) == len(component_fields):
+                component_rows.append(row)
+    # Header_Data
+    field_map = {name: idx for idx, name in enumerate(header_fields)}
+    board_name = header_values[field_map.get("BoardName", -1)] if "BoardName" in field_map else ""
+    # 取PASS/FAIL字段
+    passfail = header_values[field_map.get("PASS/FAIL", -1)] if "PASS/FAIL" in field_map else ""
+    result = header_values[field_map.get("Result", -1)] if "Result" in field_map else ""
+    date = header_values[field_map.get("Date", -1)] if "Date" in field_map else ""
+    time = header_values[field_map.get("Time", -1)] if "Time" in field_map else ""
+    test_time = ""
+    if date and time and len(date) == 8 and len(time) == 6:
+        test_time = f"{date[:4]}-{date[4:6]}-{date[6:]} {time[:2]}:{time[2:4]}:{time[4:]}"
+    header_data = {
+        "passfail": passfail,
+        "result": result,
+        "test_time": test_time,
+        "board_name": board_name
+    }
+    # Component_Data 映射
+    comp_map = {
+        "No.": "StepNum",
+        "Component Name": "PartName",
+        "Testing Type": "Type",
+        "Testing Point No.": ("HPin", "LPin"),
+        "Reference Value": "Std_V",
+        "Lower Limit(%)": "HLim",
+        "Upper Limit(%)": "LLim",
+        "Measured Value": "Msr_V",
+        "Result": "Result"
+    }
+    comp_field_idx = {name: idx for idx, name in enumerate(component_fields)}
+    data = []
+    for row in component_rows:
+        item = {}
+        for k, v in comp_map.items():
+            if k == "Testing Point No.":
+                hpin = row[comp_field_idx.get("HPin", -1)] if "HPin" in comp_field_idx else ""
+                lpin = row[comp_field_idx.get("LPin", -1)] if "LPin" in comp_field_idx else ""
+                item[k] = f"{hpin},{lpin}" if hpin and lpin else hpin or lpin
+            else:
+                idx = comp_field_idx.get(v, -1) if isinstance(v, str) else -1
+                item[k] = row[idx] if idx >= 0 else ""
+        # 处理Result字段
+        item["Result"] = "PASS" if item["Result"] == "0" else "FAIL"
+        data.append(item)
+    component_df = pd.DataFrame(data)
+    return header_data, component_df
+
+def legacy_expand_reference(ref_str):
+    refs = []
+    for part in str(ref_str).replace(' ', '').split(','):
+        m = re.match(r'([A-Za-z]+)(\d+)-([A-Za-z]+)?(\d+)', part)
+        if m:
+            prefix1, start, prefix2, end = m.groups()
+            prefix2 = prefix2 if prefix2 else prefix1
+            for i in range(int(start), int(end)+1):
+                refs.append(f"{prefix2.upper()}{i}")
+        else:
+            if part:
+                refs.append(part.upper())
+    return refs
+
+def legacy_build_ref_to_desc(csv_df):
+    ref_to_desc = {}
+    for _, row in csv_df.iterrows():
+        desc = row["Description"]
+        for ref in legacy_expand_reference(row["Reference"]):
+            ref_to_desc[ref] = desc
+    return ref_to_desc
+
+def legacy_get_description(components, ref_to_desc):
+    if pd.isna(components):
+        return ""
+    parts = []
+    for part in str(components).replace(',', '/').replace(' ', '').split('/'):
+        part = part.strip().upper()
+        if part:
+            # 先按下划线分割，再按短横线分割，只取第一个编号
+            part_main = part.split('_')[0].split('-')[0]
+            parts.append(part_main)
+    for part in parts:
+        if part in ref_to_desc:
+            return ref_to_desc[part]
+    return ""
+
+def legacy_extract_main_comp(comp):
+    # 取第一个/前的编号，再去掉下划线及后缀
+    if pd.isna(comp):
+        return ""
+    comp = str(comp).replace(' ', '').upper()
+    main = comp.split('/')[0].split(',')[0]
+    main = main.split('_')[0].split('-')[0]
+    return main
+
+LEGACY_DEDUP_COLS = ["main_comp", "testable_notna", "has_np", "has_slash", "has_underscore", "has_dash", "comp_len"]
+
+def legacy_dedup_main_comp(df_with_desc):
+    # 去重逻辑：同主编号优先保留带/NP的，其次带/的，其次带_的，再其次没有-的，最后字符串长度最短的
+    if df_with_desc.empty:
+        return df_with_desc, pd.DataFrame()
+    df_with_desc = df_with_desc.copy()
+    df_with_desc["main_comp"] = df_with_desc["Components"].apply(legacy_extract_main_comp)
+    df_with_desc["testable_notna"] = df_with_desc["Testable"].apply(lambda x: pd.notna(x) and str(x).strip() != "")
+    df_with_desc["has_np"] = df_with_desc["Components"].apply(lambda x: "/NP" in str(x).upper())
+    df_with_desc["has_slash"] = df_with_desc["Components"].apply(lambda x: "/" in str(x))
+    df_with_desc["has_dash"] = df_with_desc["Components"].apply(lambda x: "-" in str(x))
+    df_with_desc["has_underscore"] = df_with_desc["Components"].apply(lambda x: "_" in str(x))
+    df_with_desc["comp_len"] = df_with_desc["Components"].apply(lambda x: len(str(x)))
+    idx = (
+        df_with_desc
+        .sort_values(
+            ["main_comp", "testable_notna", "has_np", "has_slash", "has_dash", "has_underscore", "comp_len"],
+            ascending=[True, False, False, False, False, False, True]  # has_dash放在has_underscore前，且False优先
+        )
+        .groupby("main_comp", as_index=False)
+        .head(1)
+        .index
+    )
+    # 保留唯一主编号的行，其余为重复项
+    df_unique = df_with_desc.loc[idx].copy()
+    df_dup = df_with_desc.drop(idx).copy()
+    # 清理辅助列
+    df_unique = df_unique.drop(columns=LEGACY_DEDUP_COLS)
+    df_dup = df_dup.drop(columns=LEGACY_DEDUP_COLS)
+    return df_unique, df_dup
+
+def legacy_add_full_border(ws, min_row, max_row, min_col, max_col):
+    thin = Side(border_style="thin", color="000000")
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    for row in ws.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
+        for cell in row:
+            cell.border = border
+
+def legacy_fill_template_excel(template_file, dcl_df, csv_df, dcl_data, dat_data=None):
+    wb = openpyxl.load_workbook(template_file)
+    ws_result = wb['Test Result']
+    ws_parts = wb['PartsCoverage']
+
+    # 写入Test Result（dcl数据）
+    ws_result['I7'] = dcl_data.get("passfail", "")
+    ws_result['I8'] = dcl_data.get("test_time", "")
+    ws_result['I4'] = dcl_data.get("board_name", "")
+
+    # 获取Test Result表头（假设表头在第10行，数据从A11开始）
+    header_row = 10
+    start_row = 11
+    headers = [cell.value for cell in ws_result[header_row]]
+
+    # 保证dcl_df列顺序与表头一致，只保留表头列
+    dcl_df_to_write = dcl_df.reindex(columns=headers)
+
+    for i, row in dcl_df_to_write.iterrows():
+        for col_idx, col_name in enumerate(headers, start=1):
+            cell = ws_result.cell(row=start_row + i, column=col_idx)
+            if not isinstance(cell, MergedCell):
+                val = row.get(col_name, "")
+                if isinstance(val, (pd.Series, list)):
+                    val = val.iloc[0] if hasattr(val, "iloc") else val[0]
+                if pd.isna(val):
+                    val = ""
+                cell.value = val
+
+    # 写入PartsCoverage（dat_data["data"]，同理按表头名称写入，表头在第10行，数据从A11开始）
+    if dat_data and "data" in dat_data:
+        dat_df = dat_data["data"]
+        parts_header_row = 10
+        parts_start_row = 11
+        parts_headers = [cell.value for cell in ws_parts[parts_header_row]]
+
+        # 确保Description在表头中
+        if "Description" not in parts_headers:
+            parts_headers.append("Description")
+
+                # 只保留有Description的行，并重排No.为连续自然数
+        dat_df = dat_df[dat_df["Description"].notna() & (dat_df["Description"] != "")]
+        dat_df = dat_df.reset_index(drop=True)
+        if "No." in dat_df.columns:
+            dat_df["No."] = range(1, len(dat_df) + 1)
+
+        # 自动生成Remark列
+        def gen_remark(row):
+            if row.get("Testable") == "N":
+                return "No test point"
+            elif row.get("Testable") == "L":
+                comps = str(row.get("Components", ""))
+                if "/" in comps:
+                    return f"it is in parallel with {comps.split('/')[-1].strip()}"
+                elif "," in comps:
+                    return f"it is in parallel with {comps.split(',')[-1].strip()}"
+                else:
+                    return "it is in parallel with"
+            else:
+                return row.get("Remark", "")
+        dat_df["Remark"] = dat_df.apply(gen_remark, axis=1)
+
+        # 保证dat_df列顺序与表头一致，只保留表头列
+        dat_df_to_write = dat_df.reindex(columns=parts_headers)
+
+        for i, row in dat_df_to_write.iterrows():
+            for col_idx, col_name in enumerate(parts_headers, start=1):
+                cell = ws_parts.cell(row=parts_start_row + i, column=col_idx)
+                if not isinstance(cell, MergedCell):
+                    val = row.get(col_name, "")
+                    if isinstance(val, (pd.Series, list)):
+                        val = val.iloc[0] if hasattr(val, "iloc") else val[0]
+                    if pd.isna(val):
+                        val = ""
+                    cell.value = val
+
+    # 写入dat_data的board_name和test_time到PartsCoverage的指定单元格
+    if dat_data:
+        ws_parts['H4'] = dat_data.get("board_name", "")
+        ws_parts['H7'] = dat_data.get("test_time", "")
+
+        coverage = dat_data.get("coverage", None)
+        if coverage is not None:
+            ws_parts['C7'] = "{:.2%}".format(coverage)
+
+     # 给Test Result sheet加边框
+    if not dcl_df_to_write.empty:
+        min_row = start_row
+        max_row = start_row + len(dcl_df_to_write) - 1
+        min_col = 1
+        max_col = len(headers)
+        legacy_add_full_border(ws_result, min_row, max_row, min_col, max_col)
+
+    # 给PartsCoverage sheet加边框
+    if dat_data and "data" in dat_data and not dat_df_to_write.empty:
+        min_row = parts_start_row
+        max_row = parts_start_row + len(dat_df_to_write) - 1
+        min_col = 1
+        max_col = len(parts_headers)
+        legacy_add_full_border(ws_parts, min_row, max_row, min_col, max_col)
+
+    # 给Test Result sheet加边框
+    if not dcl_df_to_write.empty:
+        min_row = start_row
+        max_row = start_row + len(dcl_df_to_write) - 1
+        min_col = 1
+        max_col = len(headers)
+        legacy_add_full_border(ws_result, min_row, max_row, min_col, max_col)
+        # 居中显示
+        for row in ws_result.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
+            for cell in row:
+                cell.alignment = Alignment(horizontal="center", vertical="center")
+
+    # 给PartsCoverage sheet加边框
+    if dat_data and "data" in dat_data and not dat_df_to_write.empty:
+        min_row = parts_start_row
+        max_row = parts_start_row + len(dat_df_to_write) - 1
+        min_col = 1
+        max_col = len(parts_headers)
+        legacy_add_full_border(ws_parts, min_row, max_row, min_col, max_col)
+        # 居中显示
+        for row in ws_parts.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
+            for cell in row:
+                cell.alignment = Alignment(horizontal="center", vertical="center")
+
+    output = BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return output
@@ -0,0 +1,151 @@
+import argparse
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_dat
+
+# 报告服务压测：不同并发数下提交任务 -> 轮询状态 -> 下载报告，统计吞吐量与端到端延迟（p50/p99）
+# 默认在本机启动 src/service.py 子进程；--url 指定时压测已运行的服务
+# 用法：python benchmarks/load_test_service.py [--concurrency 1 2 4 8] [--jobs 16] [-j 进程数] [--steps 2000]
+
+def encode_multipart(files):
+    boundary = uuid.uuid4().hex
+    out = io.BytesIO()
+    for name, (filename, content) in files.items():
+        out.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                  f"Content-Type: application/octet-stream\r\n\r\n".encode("utf-8"))
+        out.write(content)
+        out.write(b"\r\n")
+    out.write(f"--{boundary}--\r\n".encode("ascii"))
+    return out.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+def request(url, data=None, headers=None):
+    req = urllib.request.Request(url, data=data, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=300) as resp:
+            return resp.status, resp.read(), resp.headers
+    except urllib.error.HTTPError as e:
+        return e.code, e.read(), e.headers
+
+def run_one(url, body, content_type, poll_interval):
+    # 返回 (端到端延迟, 被503拒绝的次数, 是否成功)
+    start = time.perf_counter()
+    rejected = 0
+    while True:
+        status, payload, headers = request(f"{url}/jobs", body, {"Content-Type": content_type})
+        if status != 503:
+            break
+        rejected += 1
+        time.sleep(float(headers.get("Retry-After", 1)) / 10)
+    if status != 202:
+        return time.perf_counter() - start, rejected, False
+    job_id = json.loads(payload)["id"]
+    while True:
+        status, payload, _ = request(f"{url}/jobs/{job_id}")
+        state = json.loads(payload)["status"]
+        if state in ("done", "failed"):
+            break
+        time.sleep(poll_interval)
+    if state == "failed":
+        return time.perf_counter() - start, rejected, False
+    status, report, _ = request(f"{url}/jobs/{job_id}/report")
+    return time.perf_counter() - start, rejected, status == 200 and report[:2] == b"PK"
+
+def run_level(url, body, content_type, concurrency, n_jobs, poll_interval):
+    results = []
+    lock = threading.Lock()
+    remaining = [n_jobs]
+
+    def client():
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+            r = run_one(url, body, content_type, poll_interval)
+            with lock:
+                results.append(r)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies = sorted(r[0] for r in results)
+    pick = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)]
+    ok = sum(1 for r in results if r[2])
+    print(f"concurrency {concurrency:>3}: {ok}/{len(results)} ok, {ok / elapsed:6.2f} jobs/s, "
+          f"p50 {pick(0.50):6.3f}s, p99 {pick(0.99):6.3f}s, 503 retries {sum(r[1] for r in results)}")
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="已运行的服务地址，不指定时在本机启动一个")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--jobs", type=int, default=16, help="每个并发级别提交的任务数")
+    parser.add_argument("-j", "--workers", type=int, default=2, help="启动本机服务时的进程数")
+    parser.add_argument("--max-queue", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=0, help="用合成的DAT（步数），0为使用仓库中的示例DAT")
+    parser.add_argument("--poll", type=float, default=0.02, help="轮询间隔（秒）")
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, "500504.csv"), "rb") as f:
+        dcl = f.read()
+    if args.steps:
+        dat = make_dat(args.steps)
+    else:
+        with open(os.path.join(ROOT, "500504.DAT"), "rb") as f:
+            dat = f.read()
+    with open(os.path.join(ROOT, "BOM.csv"), "rb") as f:
+        bom = f.read()
+    with open(os.path.join(ROOT, "template.xlsx"), "rb") as f:
+        template = f.read()
+    body, content_type = encode_multipart({
+        "dcl": ("500504.csv", dcl), "dat": ("500504.DAT", dat), "bom": ("BOM.csv", bom), "template": ("template.xlsx", template),
+    })
+
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-W", "ignore", os.path.join(ROOT, "src", "service.py"), "--port", str(port),
+             "-j", str(args.workers), "--max-queue", str(args.max_queue), "--quiet"],
+            stdout=subprocess.DEVNULL,
+        )
+        url = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                if request(f"{url}/health")[0] == 200:
+                    break
+            except OSError:
+                time.sleep(0.1)
+    try:
+        print(f"service {url}, request body {len(body) / 1e6:.2f} MB, {args.jobs} jobs per level")
+        run_level(url, body, content_type, 1, 2, args.poll)  # 预热：工作进程启动、模板解析
+        for concurrency in args.concurrency:
+            run_level(url, body, content_type, concurrency, args.jobs, args.poll)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_bom, make_dat, make_dcl
+
+# 基准测试套件：按给定规模（测试步数）生成合成 DAT / DCL / BOM，逐阶段（解析 -> 合并Description -> 去重 -> 生成Excel）
+# 记录耗时、吞吐量（行/秒）和内存，保存为基线JSON，之后的修改与基线对比找出性能回退
+# 每个规模在新的子进程中运行（不使用解析缓存），峰值RSS只包含该规模
+# 用法：
+#   python benchmarks/suite.py --save reference                  生成并保存基线 benchmarks/baselines/reference.json
+#   python benchmarks/suite.py --compare reference               与基线对比，有阶段变慢超过 --threshold 时返回1
+#   python benchmarks/suite.py --sizes 1000 1000000 --nc-ratio 0.1 --dup-ratio 0.2 --tracemalloc
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+STREAM_ABOVE = 50_000  # 超过此步数时用流式写出Excel（openpyxl整本写入百万行不可行）
+NOISE_FLOOR_S = 0.05  # 耗时低于此值的阶段不判定回退
+
+def write_inputs(work_dir, size, options):
+    # 生成一块板的输入文件，返回 (dcl, dat, bom) 路径；BOM行数约为步数的1/4（每行多个位号，部分为区间）
+    files = {
+        "SYN.dcl": make_dcl(size, seed=options["seed"], fail_ratio=options["fail_ratio"]),
+        "SYN.DAT": make_dat(
+            size, seed=options["seed"], dup_ratio=options["dup_ratio"], nc_ratio=options["nc_ratio"],
+            np_ratio=options["np_ratio"], suffix_ratio=options["suffix_ratio"], n_designators=max(2000, size // 4),
+        ),
+        "BOM.csv": make_bom(max(1, size // 4), seed=options["seed"], range_ratio=options["range_ratio"]),
+    }
+    paths = []
+    for name, data in files.items():
+        paths.append(os.path.join(work_dir, name))
+        with open(paths[-1], "wb") as f:
+            f.write(data)
+    return paths
+
+def run_size(size, options):
+    # 在子进程中运行：不使用磁盘解析缓存，缓存目录为新的临时目录
+    work_dir = tempfile.mkdtemp(prefix=f"bench_suite_{size}_")
+    os.environ["REPORT_GEN_CACHE_DIR"] = os.path.join(work_dir, "cache")
+    os.environ["REPORT_GEN_PARSE_CACHE_MB"] = "0"
+    if options["tracemalloc"]:
+        os.environ["REPORT_GEN_PROFILE_TRACEMALLOC"] = "1"
+    warnings.filterwarnings("ignore")
+    from batch import build_report
+    from utils.profiling import Profiler, peak_rss_bytes
+
+    start = time.perf_counter()
+    paths = write_inputs(work_dir, size, options)
+    generate_s = time.perf_counter() - start
+    input_bytes = sum(os.path.getsize(path) for path in paths)
+    profiler = Profiler(f"SYN{size}", path=os.path.join(work_dir, "profile.jsonl"))
+    stream = size > STREAM_ABOVE if options["stream"] is None else options["stream"]
+    output = os.path.join(work_dir, "SYN.xlsx")
+    start = time.perf_counter()
+    excel_bytes = build_report(*paths, options["template"], output=output if stream else None, history=False, profiler=profiler)
+    total_s = time.perf_counter() - start
+    if not stream:
+        with open(output, "wb") as f:
+            f.write(excel_bytes.getvalue())
+    stages = {}
+    for record in profiler.records:
+        stage = {"wall_s": record["wall_s"], "rows": record["rows"] or 0}
+        stage["rows_per_s"] = stage["rows"] / record["wall_s"] if record["wall_s"] else 0.0
+        if "py_peak_bytes" in record:
+            stage["py_peak_mb"] = record["py_peak_bytes"] / 2 ** 20
+        stages[record["stage"]] = stage
+    return {
+        "steps": size,
+        "input_mb": input_bytes / 2 ** 20,
+        "output_mb": os.path.getsize(output) / 2 ** 20,
+        "excel": "stream" if stream else "openpyxl",
+        "generate_s": generate_s,
+        "total_s": total_s,
+        "steps_per_s": size / total_s,
+        "peak_rss_mb": (peak_rss_bytes() or 0) / 2 ** 20,
+        "stages": stages,
+    }
+
+def environment():
+    import numpy
+    import openpyxl
+    import pandas
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "python": platform.python_version(), "pandas": pandas.__version__, "numpy": numpy.__version__,
+        "openpyxl": openpyxl.__version__, "platform": platform.platform(), "cpus": os.cpu_count(),
+        "commit": commit, "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+def print_result(result):
+    print(f"{result['steps']:>8} steps: total {result['total_s']:8.3f}s ({result['steps_per_s']:9.0f} steps/s), "
+          f"peak RSS {result['peak_rss_mb']:7.1f} MB, input {result['input_mb']:.1f} MB, excel {result['excel']}")
+    for name, stage in result["stages"].items():
+        memory = f", py peak {stage['py_peak_mb']:7.1f} MB" if "py_peak_mb" in stage else ""
+        print(f"    {name:<12} {stage['wall_s']:8.3f}s {stage['rows']:>9} rows {stage['rows_per_s']:11.0f} rows/s{memory}")
+
+def compare(current, baseline, threshold):
+    # 返回回退项列表；与基线的生成参数不同时只提示，不判定
+    if current["options"] != baseline["options"]:
+        print("[note] 生成参数与基线不同，对比仅供参考")
+    regressions = []
+    print(f"\n对比基线（{baseline['environment'].get('commit', '')} {baseline['environment'].get('date', '')}），阈值 +{threshold:.0%}")
+    for size, result in current["results"].items():
+        base = baseline["results"].get(size)
+        if base is None:
+            continue
+        rows = [("total", base["total_s"], result["total_s"])]
+        rows += [(name, base["stages"][name]["wall_s"], stage["wall_s"]) for name, stage in result["stages"].items() if name in base["stages"]]
+        for name, before, after in rows:
+            ratio = after / before if before else float("inf")
+            flag = ""
+            if after > before * (1 + threshold) and after > NOISE_FLOOR_S:
+                flag = "  <-- slower"
+                regressions.append(f"{size} {name}")
+            print(f"{size:>8} {name:<12} {before:8.3f}s -> {after:8.3f}s  x{ratio:5.2f}{flag}")
+        before, after = base["peak_rss_mb"], result["peak_rss_mb"]
+        flag = ""
+        if after > before * (1 + threshold):
+            flag = "  <-- more memory"
+            regressions.append(f"{size} peak_rss")
+        print(f"{size:>8} {'peak RSS':<12} {before:7.1f}MB -> {after:7.1f}MB  x{after / before if before else 0:5.2f}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="ICT报告生成基准测试套件")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="测试步数（1k ~ 1M）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--nc-ratio", type=float, default=0.05, help="/NC元件比例")
+    parser.add_argument("--np-ratio", type=float, default=0.03, help="/NP元件比例")
+    parser.add_argument("--suffix-ratio", type=float, default=0.3, help="带_1、-PX、/TVS等后缀的测试名比例")
+    parser.add_argument("--dup-ratio", type=float, default=0.1, help="重复测试已出现主编号的比例")
+    parser.add_argument("--range-ratio", type=float, default=0.1, help="BOM中区间位号（如R1-R200）的比例")
+    parser.add_argument("--fail-ratio", type=float, default=0.02, help="DCL中FAIL的比例")
+    parser.add_argument("--stream", action=argparse.BooleanOptionalAction, default=None,
+                        help=f"流式写出Excel，默认超过{STREAM_ABOVE}步时使用")
+    parser.add_argument("--tracemalloc", action="store_true", help="另外统计各阶段tracemalloc内存峰值（较慢）")
+    parser.add_argument("--template", default=os.path.join(ROOT, "template.xlsx"))
+    parser.add_argument("--save", metavar="NAME", help="保存为基线 benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="与基线对比（名称或JSON路径）")
+    parser.add_argument("--threshold", type=float, default=0.2, help="判定回退的变慢比例")
+    args = parser.parse_args()
+
+    options = {
+        "seed": args.seed, "nc_ratio": args.nc_ratio, "np_ratio": args.np_ratio, "suffix_ratio": args.suffix_ratio,
+        "dup_ratio": args.dup_ratio, "range_ratio": args.range_ratio, "fail_ratio": args.fail_ratio,
+        "stream": args.stream, "tracemalloc": args.tracemalloc,
+    }
+    current = {"environment": environment(), "options": dict(options), "results": {}}
+    options["template"] = args.template
+    print(f"{current['environment']['platform']}, Python {current['environment']['python']}, "
+          f"pandas {current['environment']['pandas']}, {current['environment']['cpus']} CPUs")
+    for size in args.sizes:
+        # 每个规模一个新进程，峰值RSS互不影响
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            result = pool.submit(run_size, size, options).result()
+        current["results"][str(size)] = result
+        print_result(result)
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=1)
+        print(f"基线已保存：{path}")
+    if args.compare:
+        path = args.compare if args.compare.endswith(".json") else os.path.join(BASELINE_DIR, f"{args.compare}.json")
+        with open(path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print("性能回退：" + "，".join(regressions))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import random
+
+# 合成测试数据生成器（TR518SII 格式的 DAT 清单、DCL测试结果、BOM）
+
+DAT_HEADER = (
+    "! File Name: {board}.DAT Test Data Listing TR518SII\r\n"
+    "! Board: {board}      \r\n"
+    "! \r\n"
+    "!Step   Parts-N                      BOM-V     LC  Hi-P  Lo-P G-P1  G-P2  G-P3  G-P4  G-P5  Skip Type  CanATL  AnaSkip  TJ_Source TJ-Frequency\r\n"
+    "!       Meas-V                       ExpectV  +Lm%     -Lm%        DLY MODE  AVGE  RPT   SMP  OFFSET  DEV% Ver\r\n"
+)
+PREFIX_TYPES = [("R", "R"), ("C", "C"), ("D", "D"), ("IC", "U"), ("U", "U"), ("Q", "Q"), ("L", "L"), ("T", "J")]
+
+def make_component(rng, nc_ratio=0.05, np_ratio=0.03, suffix_ratio=0.3, n_designators=2000):
+    prefix, type_code = rng.choice(PREFIX_TYPES)
+    name = f"{prefix}{rng.randint(1, n_designators)}"
+    r = rng.random()
+    if r < nc_ratio:
+        return name + "/NC", type_code
+    r -= nc_ratio
+    if r < np_ratio:
+        return name + "/NP", type_code
+    r -= np_ratio
+    if r < suffix_ratio:
+        return name + rng.choice(["_1", "_1_2", "-PX", "/TVS", "/SG", f"/C{rng.randint(1, n_designators)}", f",R{rng.randint(1, n_designators)}"]), type_code
+    return name, type_code
+
+DUP_SUFFIXES = ["_1", "_2", "-PX", "_1_2"]
+
+def make_dat(n_steps, board="SYN001", seed=0, dup_ratio=0.0, **kwargs):
+    # dup_ratio：重复测试已出现过的主编号（加_1、-PX等后缀）的比例，去重时合并为一行
+    rng = random.Random(seed)
+    out = [DAT_HEADER.format(board=board)]
+    mains = []
+    for step in range(1, n_steps + 1):
+        if dup_ratio and mains and rng.random() < dup_ratio:
+            main, type_code = rng.choice(mains)
+            comp = main + rng.choice(DUP_SUFFIXES)
+        else:
+            comp, type_code = make_component(rng, **kwargs)
+            if dup_ratio:
+                mains.append((comp.split("/")[0].split(",")[0].split("_")[0].split("-")[0], type_code))
+        skip = 1 if rng.random() < 0.2 else 0
+        value = rng.choice(["0.200", "4.000", "1.500V", "10.00K", "-1.000V"])
+        hi, lo = rng.randint(1, 999), rng.randint(1, 999)
+        out.append(
+            f"{step:>4} {comp:<32}{value:>7}    B4   {hi:>3}  {lo:>3}     0     0     0     0     0  {skip}  {type_code}   0   0 0.0 0.000\r\n"
+            f"                             0.00V    {value:>6}  -1.000000 20.000000  100     8     0     3     0   0.000    0.0  0\r\n"
+        )
+    return "".join(out).encode("utf-8")
+
+def make_bom(n_rows, seed=0, range_ratio=0.1, max_range=200, refs_per_row=4, extra_cols=0, encoding="utf-8", chinese=False,
+             empty_ratio=0.0):
+    # BOM CSV（Reference/Description 及若干无关列），部分行为区间位号（如 R1-R200）；empty_ratio 为描述为空的行比例
+    # extra_cols 追加ERP导出常见的无关列；chinese 为True时描述带中文（配合 encoding="gbk" 测试编码识别）
+    rng = random.Random(seed)
+    extra_header = "".join(f",Extra{i}" for i in range(extra_cols))
+    lines = [f"Level,Pos,Quantity,Unit,Material No,Description,Reference,Part type{extra_header}\r\n"]
+    next_number = {}
+    for row in range(n_rows):
+        prefix = rng.choice(["R", "C", "D", "IC", "U", "Q", "L"])
+        refs = []
+        for _ in range(rng.randint(1, refs_per_row)):
+            start = next_number.get(prefix, 1)
+            if rng.random() < range_ratio:
+                end = start + rng.randint(1, max_range)
+                refs.append(f"{prefix}{start}-{prefix}{end}")
+            else:
+                end = start
+                refs.append(f"{prefix}{start}")
+            next_number[prefix] = end + 1
+        desc = f"{prefix} {rng.randint(1, 999)}{rng.choice(['R', 'K', 'NF', 'UF'])} {rng.choice(['0603', '0805', '1206'])} SM"
+        if chinese:
+            desc = rng.choice(["电阻", "电容", "二极管", "芯片"]) + " " + desc
+        if empty_ratio and rng.random() < empty_ratio:
+            desc = ""
+        extra = "".join(f",{9000000 + row}-{i}" for i in range(extra_cols))
+        lines.append(f'1.{row},{row * 10},{len(refs)},st,{9000000 + row},"{desc}","{",".join(refs)}",component{extra}\r\n')
+    return "".join(lines).encode(encoding)
+
+DCL_HEADER_FIELDS = ("PASS/FAIL, ICT_ID, SeriesNo, BoardName, BarCode, Date, Time, Result, Retest,WorkSchedule,OperID, "
+                     "DetailResult, MulBrdNum, MulBrdResult,RetryCnt,BeginDate,BeginTime,Version,BoardVersion,FixtureBarcode,PinOffset,LeftRight,Duration")
+DCL_COMPONENT_FIELDS = "StepNum, PartName, Act_V, Std_V, Offset, HLim, LLim, Mode, Type, HPin, LPin, Delay, GP1, GP2, GP3, Avge, Rpt, Msr_V, Dev, Result"
+
+def make_dcl(n_steps, board="SYN001", seed=0, records=1, fail_ratio=0.02):
+    # DCL（与示例 500504.csv 格式相同）；records>1 时为多条记录（多联板），每条记录 n_steps 行
+    rng = random.Random(seed)
+    out = []
+    for record in range(1, records + 1):
+        failed = rng.random() < 0.5 if records > 1 else False
+        out.append(
+            f"// Header_Data\r\n// {DCL_HEADER_FIELDS}\r\n"
+            f"{'FAIL' if failed else 'PASS'},1,3,{board},10315400400110{record:02d},20250719,124745,{'F' if failed else 'P'},0,1,,PPPPP,"
+            f"{record},{'F' if failed else 'P'},0,20250719,124741,0,,,0,0,4.94sec\r\n\r\n"
+            f"// Component_Data\r\n// {DCL_COMPONENT_FIELDS}\r\n"
+        )
+        for step in range(1, n_steps + 1):
+            comp, type_code = make_component(rng, nc_ratio=0)
+            comp = comp.split("/")[0].split(",")[0]
+            result = 1 if rng.random() < fail_ratio else 0
+            out.append(
+                f"{step:>4}, {comp},    0.200  ,    0.120V , 0.000000,  -1.0,  20.0, 8, {type_code}, {rng.randint(1, 999)}, {rng.randint(1, 999)}, "
+                f"100, 386, 0, 0, 0, D, 0.1985467V , +65.5 %, {result}\r\n"
+            )
+        out.append(" \r\n")
+    return "".join(out).encode("utf-8")
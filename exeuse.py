@@ -1,72 +1,147 @@
+import os
 import sys
-import pandas as pd
-import re
+import threading
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QObject, Qt, QThread, QTimer, pyqtSignal
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QFileDialog, QLabel, QProgressBar, QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView
+    QFileDialog, QLabel, QLineEdit, QProgressBar, QMessageBox, QTableView, QHeaderView
 )
-from handlers.dat_handler import DatHandler
-from handlers.csv_handler import CsvHandler
-from handlers.dcl_handler import DclHandler
-from utils.excel_utils import fill_template_excel
-
-def expand_reference(ref_str):
-    refs = []
-    for part in str(ref_str).replace(' ', '').split(','):
-        m = re.match(r'([A-Za-z]+)(\d+)-([A-Za-z]+)?(\d+)', part)
-        if m:
-            prefix1, start, prefix2, end = m.groups()
-            prefix2 = prefix2 if prefix2 else prefix1
-            for i in range(int(start), int(end)+1):
-                refs.append(f"{prefix2.upper()}{i}")
+from utils.frame_view import FrameView
+from utils.profiling import Profiler
+from utils.progress import Cancelled
+from utils.warmup import warm_up
+
+# 解析、合并、去重和导出Excel都在后台线程（QThread）中运行，界面线程只负责显示
+# 进度按已解析的字节数和已写入的行数回报，点“取消”后在下一个进度检查点中止
+# 启动时只导入PyQt5，窗口显示后再在后台线程中导入处理流程（pandas、openpyxl、解析器），见 utils/warmup.py
+
+class TaskWorker(QObject):
+    # 后台任务 task(report, *args)：report(百分比, 说明) 发出进度信号，已取消时抛出Cancelled
+    progress = pyqtSignal(int, str)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    cancelled = pyqtSignal()
+    done = pyqtSignal()
+
+    def __init__(self, task, args):
+        super().__init__()
+        self.task = task
+        self.args = args
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def report(self, percent, text):
+        if self.cancel_event.is_set():
+            raise Cancelled()
+        self.progress.emit(int(percent), text)
+
+    def run(self):
+        try:
+            result = self.task(self.report, *self.args)
+        except Cancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(e)
         else:
-            if part:
-                refs.append(part.upper())
-    return refs
-
-def build_ref_to_desc(csv_df):
-    ref_to_desc = {}
-    for _, row in csv_df.iterrows():
-        desc = row["Description"]
-        for ref in expand_reference(row["Reference"]):
-            ref_to_desc[ref] = desc
-    return ref_to_desc
-
-def get_description(components, ref_to_desc):
-    if pd.isna(components):
-        return ""
-    parts = []
-    for part in str(components).replace(',', '/').replace(' ', '').split('/'):
-        part = part.strip().upper()
-        if part:
-            part_main = part.split('_')[0].split('-')[0]
-            parts.append(part_main)
-    for part in parts:
-        if part in ref_to_desc:
-            return ref_to_desc[part]
-    return ""
-
-def gen_remark(row):
-    if row.get("Testable") == "N":
-        return "No test point"
-    elif row.get("Testable") == "L":
-        comps = str(row.get("Components", ""))
-        if "/" in comps:
-            return f"it is in parallel with {comps.split('/')[-1].strip()}"
-        elif "," in comps:
-            return f"it is in parallel with {comps.split(',')[-1].strip()}"
+            self.finished.emit(result)
+        finally:
+            self.done.emit()
+
+class DataFrameModel(QAbstractTableModel):
+    # 结果表格的数据模型：只在单元格滚动到可见时格式化，不为每个单元格创建Qt对象
+    def __init__(self, df=None, parent=None):
+        super().__init__(parent)
+        self.view = FrameView(df)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.view.row_count()
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.view.column_count()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return self.view.cell(index.row(), index.column())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.view.columns[section]
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.view.sort(column, order == Qt.DescendingOrder)
+        self.layoutChanged.emit()
+
+    def set_filter(self, text):
+        self.beginResetModel()
+        self.view.filter(text)
+        self.endResetModel()
+
+def make_table():
+    table = QTableView()
+    # 不按第一列自动排序，点击表头时才排序
+    table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+    table.setSortingEnabled(True)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    table.setModel(DataFrameModel(parent=table))
+    return table
+
+def process_inputs(report, dat_path, dcl_path, csv_path):
+    # 解析进度按文件字节数分配（5%~70%），之后合并Description、去重（utils/pipeline.py）
+    sizes = {path: os.path.getsize(path) for path in (dcl_path, dat_path, csv_path) if path}
+    total = sum(sizes.values()) or 1
+    offsets = {"dcl": 0, "dat": sizes[dcl_path], "bom": sizes[dcl_path] + sizes.get(dat_path, 0)}
+    names = {"dcl": "解析 .dcl 文件", "dat": "解析 .dat 文件", "bom": "解析 .csv 文件"}
+
+    def progress(stage, done, size):
+        if stage == "description":
+            report(72, f"合并Description（{size} 行）...")
+        elif stage == "dedup":
+            report(80, f"去重（{size} 行）...")
+        elif size:
+            report(5 + 65 * (offsets[stage] + done) / total, f"{names[stage]} {done * 100 // size}%")
         else:
-            return "it is in parallel with"
-    else:
-        return row.get("Remark", "")
-
-def extract_main_comp(comp):
-    if pd.isna(comp):
-        return ""
-    comp = str(comp).replace(' ', '').upper()
-    main = comp.split('/')[0].split(',')[0]
-    main = main.split('_')[0].split('-')[0]
-    return main
+            report(5 + 65 * offsets[stage] / total, f"{names[stage]}...")
+
+    # 设置 REPORT_GEN_PROFILE 时记录各阶段的耗时、内存和行数（见 utils/profiling.py）
+    from utils.pipeline import ReportPipeline
+    pipeline = ReportPipeline(Profiler("desktop"), progress)
+    result = pipeline.run(dcl_path, dat_path, csv_path, require_bom=True)
+    report(85, f"完成：{len(result.parts)} 个唯一主编号")
+    pipeline.profiler.flush()
+    return result
+
+def export_report(report, save_path, template_path, dcl_path, result):
+    def excel_progress(stage, done, total):
+        if stage == "write":
+            report(10 + 70 * done / max(total, 1), f"写入Excel（{done}/{total} 行）")
+        elif stage == "style":
+            report(85, "设置表格样式...")
+        else:
+            report(92, "保存Excel...")
+
+    # 生成Excel
+    from utils.pipeline import ReportPipeline
+    pipeline = ReportPipeline(Profiler("desktop"), excel_progress)
+    report(5, "加载模板...")
+    excel_bytes = pipeline.export(result, template_path)
+    report(98, "写入文件...")
+    # 先写临时文件再改名，中途失败不留下半个文件
+    tmp_path = save_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(excel_bytes.getvalue())
+    os.replace(tmp_path, save_path)
+    # 写入历史结果库，失败时不影响导出，错误信息随结果返回由界面提示
+    history_error = pipeline.record_history(result, dcl_path)
+    pipeline.profiler.flush()
+    return save_path, history_error
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -100,17 +175,32 @@ class MainWindow(QMainWindow):
             file_label_layout.addWidget(label)
         layout.addLayout(file_label_layout)
 
-        # 进度条
+        # 进度条、当前步骤与取消
+        progress_layout = QHBoxLayout()
         self.progress = QProgressBar()
-        layout.addWidget(self.progress)
+        progress_layout.addWidget(self.progress)
+        self.status_label = QLabel("")
+        progress_layout.addWidget(self.status_label)
+        self.cancel_btn = QPushButton("取消")
+        self.cancel_btn.setEnabled(False)
+        progress_layout.addWidget(self.cancel_btn)
+        layout.addLayout(progress_layout)
 
         # 操作按钮
         self.process_btn = QPushButton("🚀 开始处理文件")
         layout.addWidget(self.process_btn)
 
+        # 筛选：对下面所有表格生效，任一列包含输入内容的行
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("筛选："))
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("输入位号、描述等关键字")
+        filter_layout.addWidget(self.filter_edit)
+        layout.addLayout(filter_layout)
+
         # 主表格
         layout.addWidget(QLabel("唯一主编号（主表）"))
-        self.table = QTableWidget()
+        self.table = make_table()
         layout.addWidget(self.table)
         self.export_btn = QPushButton("📥 导出主表Excel")
         self.export_btn.setEnabled(False)
@@ -118,7 +208,7 @@ class MainWindow(QMainWindow):
 
         # /NC表格
         layout.addWidget(QLabel("/NC Components 信息（仅显示/可导出）"))
-        self.nc_table = QTableWidget()
+        self.nc_table = make_table()
         self.nc_table.setMaximumHeight(150)
         layout.addWidget(self.nc_table)
         self.export_nc_btn = QPushButton("导出/NC Excel")
@@ -127,7 +217,7 @@ class MainWindow(QMainWindow):
 
         # 重复项表格
         layout.addWidget(QLabel("Components 重复项（仅显示/可导出）"))
-        self.dup_table = QTableWidget()
+        self.dup_table = make_table()
         self.dup_table.setMaximumHeight(150)
         layout.addWidget(self.dup_table)
         self.export_dup_btn = QPushButton("导出重复项Excel")
@@ -136,7 +226,7 @@ class MainWindow(QMainWindow):
 
         # 无Description表格
         layout.addWidget(QLabel("Description 为空的 Components 信息（仅显示/可导出）"))
-        self.no_desc_table = QTableWidget()
+        self.no_desc_table = make_table()
         self.no_desc_table.setMaximumHeight(150)
         layout.addWidget(self.no_desc_table)
         self.export_no_desc_btn = QPushButton("导出无Description Excel")
@@ -149,23 +239,18 @@ class MainWindow(QMainWindow):
         self.csv_btn.clicked.connect(lambda: self.select_file(2, "CSV 文件 (*.csv)"))
         self.template_btn.clicked.connect(lambda: self.select_file(3, "Excel 文件 (*.xlsx)"))
         self.process_btn.clicked.connect(self.process_files)
+        self.cancel_btn.clicked.connect(self.cancel_task)
+        self.filter_edit.textChanged.connect(self.apply_filter)
         self.export_btn.clicked.connect(self.export_excel)
-        self.export_nc_btn.clicked.connect(lambda: self.export_df(self.nc_data, "nc_data.xlsx"))
-        self.export_dup_btn.clicked.connect(lambda: self.export_df(self.df_dup, "dup_data.xlsx"))
-        self.export_no_desc_btn.clicked.connect(lambda: self.export_df(self.df_no_desc, "no_desc_data.xlsx"))
+        self.export_nc_btn.clicked.connect(lambda: self.export_df(self.result and self.result.nc_data, "nc_data.xlsx"))
+        self.export_dup_btn.clicked.connect(lambda: self.export_df(self.result and self.result.duplicates, "dup_data.xlsx"))
+        self.export_no_desc_btn.clicked.connect(lambda: self.export_df(self.result and self.result.no_description, "no_desc_data.xlsx"))
 
     def reset_state(self):
         self.file_paths = [None, None, None, None]
-        self.header_data = None
-        self.component_df = None
-        self.dat_data = None
-        self.csv_df = None
-        self.ref_to_desc = {}
-        self.df_unique = None
-        self.df_dup = pd.DataFrame()
-        self.df_no_desc = pd.DataFrame()
-        self.nc_data = pd.DataFrame()
-        self.excel_bytes = None
+        self.result = None  # 处理结果 ReportResult
+        self.worker = None
+        self.thread = None
 
     def select_file(self, idx, filter_str):
         path, _ = QFileDialog.getOpenFileName(self, "选择文件", "", filter_str)
@@ -180,165 +265,117 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "提示", "请上传 .dcl 文件和 Excel 模板。")
             self.progress.setValue(0)
             return
-
-        # dcl
-        self.progress.setValue(20)
-        with open(dcl_path, "rb") as f:
-            self.header_data, self.component_df = DclHandler(f).process_dcl()
-
-        # dat
-        self.progress.setValue(40)
-        self.dat_data = None
-        if dat_path:
-            with open(dat_path, "rb") as f:
-                self.dat_data = DatHandler(f).process_dat()
-
-        # csv
-        self.progress.setValue(60)
-        self.csv_df = CsvHandler().process_csv(csv_path) if csv_path else pd.DataFrame()
-        print("csv_df columns:", self.csv_df.columns)
-        print("csv_df head:\n", self.csv_df.head())
-        if csv_path and self.csv_df.empty:
-            QMessageBox.critical(self, "错误", "CSV文件解析失败，请将当前CSV文件另存为CSV UTF8格式。")
-            return
-        # 列名标准化，防止有空格或大小写问题
-        self.csv_df.columns = [str(col).strip() for col in self.csv_df.columns]
-        if not self.csv_df.empty and "Reference" in self.csv_df.columns and "Description" in self.csv_df.columns:
-            self.ref_to_desc = build_ref_to_desc(self.csv_df)
-        else:
-            self.ref_to_desc = {}
-            QMessageBox.warning(self, "提示", "CSV文件缺少 Reference 或 Description 列，或内容为空。")
-            return
-
-        self.progress.setValue(70)
-
-        # 数据处理与去重
-        self.df_unique = pd.DataFrame()
-        self.df_dup = pd.DataFrame()
-        self.df_no_desc = pd.DataFrame()
-        self.nc_data = pd.DataFrame()
-        if self.dat_data is not None and not self.dat_data["data"].empty:
-            print("ref_to_desc keys:", list(self.ref_to_desc.keys()))
-            print("dat_data['data'] head:\n", self.dat_data["data"].head())
-
-            self.dat_data["data"]["Description"] = self.dat_data["data"]["Components"].apply(
-                lambda x: get_description(x, self.ref_to_desc)
-            )
-            print("dat_data['data'] with Description head:\n", self.dat_data["data"].head())
-
-            df_with_desc = self.dat_data["data"][self.dat_data["data"]["Description"].notna() & (self.dat_data["data"]["Description"] != "")].copy()
-            print("df_with_desc head:\n", df_with_desc.head())
-
-            self.df_no_desc = self.dat_data["data"][self.dat_data["data"]["Description"].isna() | (self.dat_data["data"]["Description"] == "")].copy()
-            self.nc_data = self.dat_data["nc_data"].copy() if "nc_data" in self.dat_data else pd.DataFrame()
-            df_with_desc["Remark"] = df_with_desc.apply(gen_remark, axis=1)
-
-            # 去重逻辑
-            if not df_with_desc.empty:
-                df_with_desc["main_comp"] = df_with_desc["Components"].apply(extract_main_comp)
-                df_with_desc["testable_notna"] = df_with_desc["Testable"].apply(lambda x: pd.notna(x) and str(x).strip() != "")
-                df_with_desc["has_np"] = df_with_desc["Components"].apply(lambda x: "/NP" in str(x).upper())
-                df_with_desc["has_slash"] = df_with_desc["Components"].apply(lambda x: "/" in str(x))
-                df_with_desc["has_dash"] = df_with_desc["Components"].apply(lambda x: "-" in str(x))
-                df_with_desc["has_underscore"] = df_with_desc["Components"].apply(lambda x: "_" in str(x))
-                df_with_desc["comp_len"] = df_with_desc["Components"].apply(lambda x: len(str(x)))
-                idx = (
-                    df_with_desc
-                    .sort_values(
-                        ["main_comp", "testable_notna", "has_np", "has_slash", "has_dash", "has_underscore", "comp_len"],
-                        ascending=[True, False, False, False, False, False, True]
-                    )
-                    .groupby("main_comp", as_index=False)
-                    .head(1)
-                    .index
-                )
-                self.df_unique = df_with_desc.loc[idx].copy()
-                self.df_dup = df_with_desc.drop(idx).copy()
-                self.df_unique = self.df_unique.drop(columns=["main_comp", "testable_notna", "has_np", "has_slash", "has_underscore", "has_dash", "comp_len"])
-                self.df_dup = self.df_dup.drop(columns=["main_comp", "testable_notna", "has_np", "has_slash", "has_underscore", "has_dash", "comp_len"])
-            else:
-                self.df_unique = df_with_desc
-                self.df_dup = pd.DataFrame()
-
-            # 显示表格
-            self.show_table(self.df_unique, self.table)
-            self.show_table(self.nc_data, self.nc_table)
-            self.show_table(self.df_dup, self.dup_table)
-            self.show_table(self.df_no_desc, self.no_desc_table)
-            self.export_btn.setEnabled(not self.df_unique.empty)
-            self.export_nc_btn.setEnabled(not self.nc_data.empty)
-            self.export_dup_btn.setEnabled(not self.df_dup.empty)
-            self.export_no_desc_btn.setEnabled(not self.df_no_desc.empty)
+        # 解析、合并、去重在后台线程中进行，界面不卡住，可随时取消
+        self.start_task(process_inputs, (dat_path, dcl_path, csv_path), self.on_processed)
+
+    def on_processed(self, result):
+        self.result = result
+
+        # 显示表格
+        self.show_table(result.parts, self.table)
+        self.show_table(result.nc_data, self.nc_table)
+        self.show_table(result.duplicates, self.dup_table)
+        self.show_table(result.no_description, self.no_desc_table)
+        self.export_btn.setEnabled(not result.parts.empty)
+        self.export_nc_btn.setEnabled(not result.nc_data.empty)
+        self.export_dup_btn.setEnabled(not result.duplicates.empty)
+        self.export_no_desc_btn.setEnabled(not result.no_description.empty)
+        if result.has_dat:
             self.progress.setValue(85)
             QMessageBox.information(self, "完成", "处理完成！可下载Excel文件。")
         else:
-            QMessageBox.warning(self, "提示", "未检测到dat文件内容")
-            self.df_unique = pd.DataFrame()
-            self.df_dup = pd.DataFrame()
-            self.df_no_desc = pd.DataFrame()
-            self.nc_data = pd.DataFrame()
-            self.show_table(self.df_unique, self.table)
-            self.show_table(self.nc_data, self.nc_table)
-            self.show_table(self.df_dup, self.dup_table)
-            self.show_table(self.df_no_desc, self.no_desc_table)
-            self.export_btn.setEnabled(False)
-            self.export_nc_btn.setEnabled(False)
-            self.export_dup_btn.setEnabled(False)
-            self.export_no_desc_btn.setEnabled(False)
             self.progress.setValue(0)
+            QMessageBox.warning(self, "提示", "未检测到dat文件内容")
 
-    def show_table(self, df, table_widget):
-        table_widget.clearContents()
-        if df is None or df.empty:
-            table_widget.setRowCount(0)
-            table_widget.setColumnCount(0)
-            return
-        columns = [str(col) for col in df.columns]
-        table_widget.setColumnCount(len(columns))
-        table_widget.setRowCount(len(df))
-        table_widget.setHorizontalHeaderLabels(columns)
-        for i, row in enumerate(df.itertuples(index=False)):
-            for j, value in enumerate(row):
-                item = QTableWidgetItem(str(value))
-                table_widget.setItem(i, j, item)
-        table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    def start_task(self, task, args, on_done):
+        # 在QThread中运行 task(report, *args)，结果通过信号回到界面线程
+        self.thread = QThread(self)
+        self.worker = TaskWorker(task, args)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.finished.connect(on_done)
+        self.worker.failed.connect(self.on_failed)
+        self.worker.cancelled.connect(self.on_cancelled)
+        self.worker.done.connect(self.thread.quit)
+        self.worker.done.connect(self.worker.deleteLater)
+        self.thread.finished.connect(self.thread.deleteLater)
+        self.thread.finished.connect(lambda: self.set_busy(False))
+        self.set_busy(True)
+        self.thread.start()
+
+    def set_busy(self, busy):
+        # 后台处理时禁止重复提交，表格仍可查看
+        if not busy:
+            self.worker = None
+            self.thread = None
+        self.process_btn.setEnabled(not busy)
+        self.export_btn.setEnabled(not busy and self.result is not None and not self.result.parts.empty)
+        self.cancel_btn.setEnabled(busy)
+
+    def cancel_task(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.status_label.setText("正在取消...")
+
+    def closeEvent(self, event):
+        # 关闭窗口时先取消并等待后台任务结束
+        if self.thread is not None:
+            self.worker.cancel()
+            self.thread.quit()
+            self.thread.wait()
+        event.accept()
+
+    def on_progress(self, percent, text):
+        self.progress.setValue(percent)
+        self.status_label.setText(text)
+
+    def on_failed(self, error):
+        self.progress.setValue(0)
+        self.status_label.setText("")
+        if isinstance(error, ValueError):
+            # 输入文件问题
+            QMessageBox.warning(self, "提示", str(error))
+        else:
+            QMessageBox.critical(self, "错误", f"处理异常：{type(error).__name__}: {error}")
+
+    def on_cancelled(self):
+        self.progress.setValue(0)
+        self.status_label.setText("已取消")
+
+    def show_table(self, df, table_view):
+        # 换上新的模型，保留当前的筛选，排序恢复为原顺序
+        model = DataFrameModel(df if df is not None and not df.empty else None, parent=table_view)
+        model.view.filter(self.filter_edit.text())
+        old_model = table_view.model()
+        table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        table_view.setModel(model)
+        if old_model is not None:
+            old_model.deleteLater()
+
+    def apply_filter(self, text):
+        for table_view in (self.table, self.nc_table, self.dup_table, self.no_desc_table):
+            table_view.model().set_filter(text)
 
     def export_excel(self):
-        if self.df_unique is None or self.df_unique.empty:
+        if self.result is None or self.result.parts.empty:
             QMessageBox.warning(self, "提示", "没有可导出的数据")
             return
         save_path, _ = QFileDialog.getSaveFileName(self, "保存Excel文件", "processed_data.xlsx", "Excel 文件 (*.xlsx)")
         if not save_path:
             return
-        try:
-            # 计算 Parts Testable Percentage
-            if not self.df_unique.empty and "Testable" in self.df_unique.columns:
-                total = len(self.df_unique)
-                testable = (self.df_unique["Testable"] == "Y").sum()
-                coverage = round(testable / total * 100, 2) if total > 0 else 0
-            else:
-                coverage = 0
-
-            # 生成Excel
-            excel_bytes = fill_template_excel(
-                self.file_paths[3],  # template_file
-                self.component_df,
-                self.csv_df,
-                self.header_data,
-                {
-                    "data": self.df_unique,
-                    "nc_data": self.nc_data,
-                    "board_name": self.dat_data.get("board_name", "") if self.dat_data else "",
-                    "test_time": self.dat_data.get("test_time", "") if self.dat_data else "",
-                    "coverage": coverage
-                }
-            )
-            with open(save_path, "wb") as f:
-                f.write(excel_bytes.getvalue())
-            QMessageBox.information(self, "导出成功", f"文件已保存到：{save_path}")
-            self.progress.setValue(100)
-        except Exception as e:
-            QMessageBox.critical(self, "导出失败", f"导出异常：{e}")
+        # 生成Excel在后台进行，写入期间可继续查看表格
+        args = (save_path, self.file_paths[3], self.file_paths[1], self.result)
+        self.start_task(export_report, args, self.on_exported)
+
+    def on_exported(self, exported):
+        save_path, history_error = exported
+        self.progress.setValue(100)
+        self.status_label.setText("")
+        QMessageBox.information(self, "导出成功", f"文件已保存到：{save_path}")
+        if history_error:
+            QMessageBox.warning(self, "提示", history_error)
 
     def export_df(self, df, default_name):
         if df is None or df.empty:
@@ -357,4 +394,6 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    # 事件循环画出窗口后再开始预热
+    QTimer.singleShot(0, warm_up)
     sys.exit(app.exec_())
@@ -0,0 +1,223 @@
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.profiling import Profiler, enable, profile_path, stage_summary, write_records
+from utils.warmup import preload
+
+# 无界面批处理：按板名匹配目录中的 .DAT / .dcl / BOM .csv，并行生成报告
+# 拼板（DCL中有多个子板MulBrdNum）时每个子板单独生成报告，各子板与其它板一起并行处理
+# 用法：python src/batch.py <数据目录> [-t template.xlsx] [-o 输出目录] [-j 进程数] [--profile profile.jsonl]
+# 处理流程和解析器（pandas、openpyxl）在首次使用时导入：--help、参数错误以及报告服务的主进程不加载它们
+
+SUMMARY_FIELDS = ["board", "panel", "status", "dcl", "dat", "bom", "output",
+                  "parse_s", "merge_s", "excel_s", "excel_load_s", "excel_write_s", "excel_style_s", "excel_save_s",
+                  "history_s", "total_s", "error"]
+PANEL_FIELDS = ["panel_board", "panel", "status", "passfail", "result", "panel_result", "detail_result", "output", "total_s", "error"]
+
+def is_dcl_csv(path):
+    # .csv 既可能是DCL测试结果，也可能是BOM；DCL以 "// Header_Data" 开头
+    with open(path, "rb") as f:
+        head = f.read(64)
+    return head.lstrip(b"\xef\xbb\xbf").lstrip().startswith(b"// Header_Data")
+
+def bom_key(stem):
+    # 500504_BOM / 500504-BOM / BOM -> 500504 / 500504 / ""（空表示共用BOM）
+    key = stem
+    if key.upper().endswith("BOM"):
+        key = key[:-3].rstrip("_-. ")
+    return key
+
+def discover_jobs(input_dir, bom_path=None):
+    dat_files, dcl_files, bom_files = {}, {}, {}
+    for name in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, name)
+        if not os.path.isfile(path):
+            continue
+        stem, ext = os.path.splitext(name)
+        ext = ext.lower()
+        if ext == ".dat":
+            dat_files[stem] = path
+        elif ext == ".dcl":
+            dcl_files[stem] = path
+        elif ext == ".csv":
+            if is_dcl_csv(path):
+                # 同名 .dcl 优先
+                dcl_files.setdefault(stem, path)
+            else:
+                bom_files[bom_key(stem)] = path
+
+    shared_bom = bom_path or bom_files.get("")
+    jobs = []
+    for board in sorted(set(dat_files) | set(dcl_files)):
+        jobs.append({
+            "board": board,
+            "dcl": dcl_files.get(board),
+            "dat": dat_files.get(board),
+            "bom": bom_files.get(board, shared_bom),
+        })
+    return jobs
+
+def expand_panels(jobs):
+    # DCL有多个子板时拆为每个子板一个任务（板名为 <板名>_<子板编号>），只读DCL表头，不解析Component_Data
+    from handlers.dcl_handler import DclHandler, split_panels
+    expanded = []
+    for job in jobs:
+        panels = {}
+        if job["dcl"]:
+            with open(job["dcl"], "rb") as f:
+                panels = split_panels([(header,) for header in DclHandler(f).process_headers()])
+        if len(panels) <= 1:
+            expanded.append(job)
+            continue
+        for panel, (header,) in panels.items():
+            expanded.append(dict(
+                job, board=f"{job['board']}_{panel}", panel=panel, panel_board=job["board"],
+                passfail=header["passfail"], result=header["result"],
+                panel_result=header["panel_result"], detail_result=header["detail_result"],
+            ))
+    return expanded
+
+def build_report(dcl_path, dat_path, bom_path, template_file, timings=None, output=None, panel=None, history=True, profiler=None):
+    # 与前端相同的处理流程（utils/pipeline.py）：解析 -> 合并Description -> 去重 -> 生成Excel -> 写入历史结果库
+    # 给出output（路径）时用流式写出，直接写文件，否则返回BytesIO；给出panel时只输出该子板的测试结果
+    # profiler（utils/profiling.py）记录各阶段的耗时、内存和行数，各阶段耗时（秒）同时写入timings
+    from utils.pipeline import ReportPipeline
+    pipeline = ReportPipeline(profiler)
+    try:
+        result = pipeline.run(dcl_path, dat_path, bom_path, panel)
+        excel_bytes = pipeline.export(result, template_file, output)
+        if history:
+            error = pipeline.record_history(result, dcl_path, panel or "")
+            if error:
+                print(f"[warn] {dcl_path}: {error}", file=sys.stderr)
+    finally:
+        if timings is not None:
+            timings.update(pipeline.timings)
+    return excel_bytes
+
+def process_job(job, template_file, output_dir, stream=False, history=True):
+    result = dict(job)
+    result.update({"status": "ok", "output": "", "error": ""})
+    # 启用性能记录时各阶段记录随结果返回，由主进程统一写出
+    profiler = Profiler(job["board"])
+    start = time.perf_counter()
+    try:
+        if not job["dcl"]:
+            raise ValueError("缺少 .dcl 文件")
+        out_path = os.path.join(output_dir, f"{job['board']}.xlsx")
+        if stream:
+            # 先写临时文件，成功后再改名，失败时不留下半个报告
+            tmp_path = out_path + ".tmp"
+            try:
+                build_report(job["dcl"], job["dat"], job["bom"], template_file, result, tmp_path, job.get("panel"), history, profiler)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            os.replace(tmp_path, out_path)
+        else:
+            excel_bytes = build_report(job["dcl"], job["dat"], job["bom"], template_file, result, panel=job.get("panel"),
+                                       history=history, profiler=profiler)
+            with open(out_path, "wb") as f:
+                f.write(excel_bytes.getvalue())
+        result["output"] = out_path
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["total_s"] = time.perf_counter() - start
+    if profiler.enabled:
+        result["profile"] = profiler.records
+    return result
+
+def write_summary(results, path, fields=SUMMARY_FIELDS):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for r in results:
+            row = {k: r.get(k, "") for k in fields}
+            for k in fields:
+                if k.endswith("_s") and isinstance(row[k], float):
+                    row[k] = f"{row[k]:.3f}"
+            writer.writerow(row)
+
+def panel_results(results):
+    # 拼板汇总：{板名: 各子板结果（按子板编号）}
+    panels = {}
+    for r in results:
+        if r.get("panel_board"):
+            panels.setdefault(r["panel_board"], []).append(r)
+    return panels
+
+def run_batch(input_dir, template_file, output_dir, workers=None, bom_path=None, stream=False, history=True):
+    from handlers.dcl_handler import panel_order
+    jobs = expand_panels(discover_jobs(input_dir, bom_path))
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    results = []
+    if jobs:
+        # fork的工作进程继承已导入的模块，只在主进程导入一次；spawn的工作进程各自在首个任务时导入
+        if multiprocessing.get_start_method() == "fork":
+            preload()
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = [pool.submit(process_job, job, template_file, output_dir, stream, history) for job in jobs]
+            for future in as_completed(futures):
+                r = future.result()
+                results.append(r)
+                if r["status"] == "ok":
+                    print(f"[ok] {r['board']} -> {r['output']} ({r['total_s']:.2f}s)")
+                else:
+                    print(f"[failed] {r['board']}: {r['error']}", file=sys.stderr)
+    # 拼板的子板按编号排在一起
+    results.sort(key=lambda r: (r.get("panel_board", r["board"]), panel_order(r.get("panel", ""))))
+    write_summary(results, os.path.join(output_dir, "summary.csv"))
+    if profile_path():
+        write_records([record for r in results for record in r.get("profile", [])], profile_path())
+    panels = panel_results(results)
+    if panels:
+        write_summary([r for subs in panels.values() for r in subs], os.path.join(output_dir, "panels.csv"), PANEL_FIELDS)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量生成ICT测试报告（无界面）")
+    parser.add_argument("input_dir", help="包含 .DAT / .dcl / BOM .csv 的目录")
+    parser.add_argument("-t", "--template", help="Excel 模板，默认使用目录下的 template.xlsx")
+    parser.add_argument("-o", "--output-dir", help="输出目录，默认 <input_dir>/reports")
+    parser.add_argument("-b", "--bom", help="所有板共用的BOM .csv（未找到同名BOM时使用）")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="进程数，默认等于CPU核数")
+    parser.add_argument("--stream", action="store_true", help="流式写出Excel，内存占用不随行数增长（适合大板）")
+    parser.add_argument("--no-history", action="store_true", help="不写入历史结果库")
+    parser.add_argument("--profile", metavar="PATH", help="记录各阶段耗时、内存和行数：.prom 为Prometheus文本格式，否则为JSON lines")
+    parser.add_argument("--profile-tracemalloc", action="store_true", help="性能记录中另外统计tracemalloc内存峰值（较慢）")
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable(args.profile, args.profile_tracemalloc)
+
+    template_file = args.template or os.path.join(args.input_dir, "template.xlsx")
+    if not os.path.isfile(template_file):
+        parser.error(f"找不到Excel模板：{template_file}")
+    output_dir = args.output_dir or os.path.join(args.input_dir, "reports")
+
+    start = time.perf_counter()
+    results = run_batch(args.input_dir, template_file, output_dir, args.workers, args.bom, args.stream, not args.no_history)
+    failed = [r for r in results if r["status"] != "ok"]
+    for board, subs in panel_results(results).items():
+        wall = max(r["total_s"] for r in subs)
+        print(f"拼板 {board}：{len(subs)} 个子板，失败 {sum(1 for r in subs if r['status'] != 'ok')}，"
+              f"结果 {'/'.join(r['panel_result'] or '-' for r in subs)}，最慢子板 {wall:.2f}s")
+    if profile_path():
+        print(f"各阶段耗时（写入 {profile_path()}）：")
+        for stage, count, total, slowest, rows in stage_summary([record for r in results for record in r.get("profile", [])]):
+            print(f"  {stage:<12} {count:>4} 次，共 {total:7.2f}s，最慢 {slowest:6.2f}s，{rows} 行")
+    print(f"完成 {len(results) - len(failed)}/{len(results)} 块板，"
+          f"失败 {len(failed)}，耗时 {time.perf_counter() - start:.2f}s，"
+          f"汇总：{os.path.join(output_dir, 'summary.csv')}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
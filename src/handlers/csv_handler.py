@@ -1,31 +1,117 @@
+import codecs
+import io
+import os
 import pandas as pd
+from utils.cache_utils import read_bytes
+
+# BOM CSV读取：先确定编码再解析，整个文件只解析一次；只读取Reference和Description两列
+
+PARSER_VERSION = 2  # 解析逻辑或输出变化时加1，使解析缓存（utils/parse_cache.py）失效
+ENCODINGS = ["utf-8", "gbk", "latin1"]  # 无BOM标记时按此顺序尝试，latin1总能解码
+BOM_COLUMNS = ("Reference", "Description")
+PROBE_SIZE = 1 << 20  # 编码校验每次解码的字节数
+CHUNK_SIZE = 100_000  # 分块读取的行数
+
+def read_source(file):
+    # 路径直接交给read_csv按块读取；文件对象（Streamlit上传文件）读为bytes，每次尝试重新包装，不受读取位置影响
+    if isinstance(file, (str, os.PathLike)):
+        return file
+    return read_bytes(file)
+
+def open_source(source):
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+def iter_blocks(source):
+    if isinstance(source, bytes):
+        view = memoryview(source)
+        for start in range(0, len(view), PROBE_SIZE):
+            yield view[start:start + PROBE_SIZE]
+    else:
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(PROBE_SIZE), b""):
+                yield block
+
+def detect_encoding(source):
+    # 文件开头有BOM标记时直接确定编码（Excel另存为“CSV UTF-8”会带BOM）
+    head = bytes(next(iter_blocks(source), b"")[:4])
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    # 逐块增量解码校验，遇到第一个非法字节就换下一个编码；不能只看开头，中文描述可能在很靠后的行才出现
+    for encoding in ENCODINGS[:-1]:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            for block in iter_blocks(source):
+                decoder.decode(block)
+            decoder.decode(b"", final=True)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return ENCODINGS[-1]
+
+def candidate_encodings(source):
+    # 检测出的编码优先；解析仍然失败时与原来一样继续尝试后面的编码
+    encoding = detect_encoding(source)
+    if encoding in ENCODINGS:
+        return ENCODINGS[ENCODINGS.index(encoding):]
+    return [encoding] + ENCODINGS
+
+def is_bom_column(name):
+    # 列名前后有空格也读入，select_bom_columns中统一去掉空格
+    return str(name).strip() in BOM_COLUMNS
+
+def select_bom_columns(df):
+    # 只保留Reference和Description列（如果存在），并转为字符串
+    df.columns = [str(col).strip() for col in df.columns]
+    needed_cols = [col for col in BOM_COLUMNS if col in df.columns]
+    if needed_cols:
+        df = df[needed_cols]
+        for col in needed_cols:
+            df[col] = df[col].astype(str)
+    return df
 
 class CsvHandler:
-    def __init__(self):
-        pass
+    def __init__(self, chunksize=CHUNK_SIZE):
+        self.chunksize = chunksize
 
     def process_csv(self, file):
-        # 尝试用多种编码读取，并捕获空数据异常
-        for encoding in ["utf-8", "gbk", "latin1"]:
+        # 文件为空或无法解析时返回空DataFrame
+        source = read_source(file)
+        for encoding in candidate_encodings(source):
+            try:
+                df = pd.read_csv(open_source(source), encoding=encoding, usecols=is_bom_column)
+                if len(df.columns) == 0:
+                    # 没有Reference/Description列：与原来一致返回全部列
+                    df = pd.read_csv(open_source(source), encoding=encoding)
+                break
+            except pd.errors.EmptyDataError:
+                return pd.DataFrame()
+            except Exception:
+                continue
+        else:
+            return pd.DataFrame()
+        if df.empty:
+            return pd.DataFrame()
+        return select_bom_columns(df)
+
+    def iter_csv(self, file):
+        # 分块读取，直接交给BOM索引构建（BomIndex.from_chunks），不拼出整张表；无法解析时不产生任何块
+        source = read_source(file)
+        for encoding in candidate_encodings(source):
             try:
-                df = pd.read_csv(file, encoding=encoding)
-                if not df.empty:
-                    break
+                reader = pd.read_csv(open_source(source), encoding=encoding, usecols=is_bom_column, chunksize=self.chunksize)
+                first = next(reader, None)
+                break
             except pd.errors.EmptyDataError:
-                return pd.DataFrame()  # 文件为空，返回空DataFrame
+                return
             except Exception:
                 continue
         else:
-            return pd.DataFrame()  # 全部尝试失败，返回空DataFrame
-
-        # 只保留Reference和Description列（如果存在）
-        needed_cols = []
-        if "Reference" in df.columns:
-            needed_cols.append("Reference")
-        if "Description" in df.columns:
-            needed_cols.append("Description")
-        if needed_cols:
-            df = df[needed_cols]
-            df["Reference"] = df["Reference"].astype(str)
-            df["Description"] = df["Description"].astype(str)
-        return df
\ No newline at end of file
+            return
+        # 编码已整体校验过，之后的块只可能因格式错误失败，此时异常直接抛出
+        with reader:
+            if first is not None:
+                yield select_bom_columns(first)
+            for chunk in reader:
+                yield select_bom_columns(chunk)
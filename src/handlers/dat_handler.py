@@ -1,155 +1,147 @@
-import pandas as pd
 import re
+from typing import NamedTuple
+import numpy as np
+from .dat_measurements import MeasurementCollector
+from .schema import TESTABLE_NC, step_frame
+from .testable_rules import get_default_rules
 
-class DatHandler:
-    def __init__(self, file):
-        self.file = file
+PARSER_VERSION = 2  # 解析逻辑或输出变化时加1，使解析缓存（utils/parse_cache.py）失效
 
-    def process_dat(self):
-        board_name = ""
-        test_time = ""
-        test_rows = []
-        nc_rows = []
-        content = self.file.read().decode('utf-8')
-        lines = content.splitlines()
-        # 提取板名和时间
-        for line in lines:
-            if line.startswith("! Board Name:"):
-                parts = line.split("Time:")
-                if len(parts) == 2:
-                    board_name = parts[0].replace("! Board Name:", "").strip()
-                    test_time = parts[1].strip()
+# 预编译的行匹配规则
+ROW_PATTERN = re.compile(r'^(\d+)\s+([^\s]+)')
+STEP_PATTERN = re.compile(r'^(\d+)')
 
-        # 查找step为1的数据行作为数据区第一行
-        data_start = 0
-        for idx, line in enumerate(lines):
-            l = line.strip()
-            if not l or l.startswith("!"):
-                continue
-            m = re.match(r'^(\d+)', l)
-            if m and m.group(1) == "1":
-                data_start = idx
-                break
+class DatRecord(NamedTuple):
+    step: str
+    components: str
+    testable: str
+    skip: str
+    is_nc: bool
 
-        i = data_start
-        while i < len(lines):
-            line = lines[i].strip()
-            if not line or line.startswith("!"):
-                i += 1
-                continue
-            match = re.match(r'^(\d+)\s+([^\s]+)', line)
-            if match:
-                step = match.group(1)
-                parts_n = match.group(2)
-                tokens = line.split()
-                # 校验skip字段，只能是0或1，且其后一列为字母
-                skip = ""
-                for idx_token in range(len(tokens) - 1):
-                    if tokens[idx_token] in ("0", "1") and tokens[idx_token + 1].isalpha():
-                        skip = tokens[idx_token]
-                        break
-                # /NC 特殊处理
-                if "/NC" in parts_n.upper():
-                    nc_rows.append({
-                        "Step": step,
-                        "No.": None,
-                        "Components": parts_n,
-                        "Testable": "NC",
-                        "Skip": skip
-                    })
-                    i += 1
-                    continue
+def find_skip(tokens):
+    # 校验skip字段，只能是0或1，且其后一列为字母
+    prev = None
+    for token in tokens:
+        if prev is not None and token.isalpha():
+            return prev
+        prev = token if token == "0" or token == "1" else None
+    return ""
+
+def iter_lines(file, chunk_size=1 << 20):
+    # 按块读取并解码，避免一次性读入整个文件
+    # 跨块未结束的行分段暂存，读到换行时才拼接一次，没有换行的超长行不会每块重复复制
+    pending = []
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        cut = chunk.rfind(b"\n") + 1
+        if cut == 0:
+            pending.append(chunk)
+            continue
+        pending.append(chunk[:cut])
+        yield from b"".join(pending).decode('utf-8').splitlines()
+        pending = [chunk[cut:]]
+    tail = b"".join(pending)
+    if tail:
+        yield from tail.decode('utf-8').splitlines()
 
-                # 新增特殊规则
-                testable = ""
-                parts_n_upper = parts_n.upper()
-                group_y = ["R", "IC", "U", "C", "Q", "D"]
-                group_n = ["SG", "L", "NP", "RM", "VM", "PCB"]
-                group_l = ["TVS", "PCB"]
+class DatHandler:
+    def __init__(self, file, with_measurements=False, rules=None):
+        self.file = file
+        # Testable判定规则，默认读取 config/testable_groups.json
+        self.rules = rules or get_default_rules()
+        self.board_name = ""
+        self.test_time = ""
+        # 可选：同一次遍历中收集step行和测量行的全部字段
+        self.collector = MeasurementCollector() if with_measurements else None
 
-                def match_any(comp, group):
-                    for g in group:
-                        if comp == g:
-                            return True
-                    return False
+    def iter_records(self):
+        testable_cache = {}
+        for step, parts_n, skip, is_nc in self.iter_rows():
+            if is_nc:
+                yield DatRecord(step, parts_n, "NC", skip, True)
+                continue
+            key = (parts_n, skip)
+            testable = testable_cache.get(key)
+            if testable is None:
+                testable = testable_cache[key] = self.rules.classify_one(parts_n, skip)
+            yield DatRecord(step, parts_n, testable, skip, False)
 
-                # 优先用/后缀判断
-                if "/" in parts_n_upper:
-                    suffix = parts_n_upper.split("/")[-1]
-                    prefix_match = re.match(r"^([A-Z]+)\d+", parts_n_upper)
-                    prefix = prefix_match.group(1) if prefix_match else ""
-                    if skip == "0":
-                        if match_any(suffix, group_n):
-                            testable = "N"
-                        elif match_any(suffix, group_y):
-                            testable = "Y"
-                        elif match_any(suffix, group_l):
-                            testable = "L"
-                        else:
-                            # 如果/后面没命中，再用前缀判断
-                            if prefix and match_any(prefix, group_y):
-                                testable = "Y"
-                            elif prefix and match_any(prefix, group_n):
-                                testable = "N"
-                            elif prefix and match_any(prefix, group_l):
-                                testable = "L"
-                            else:
-                                testable = ""
-                    elif skip == "1":
-                        if match_any(suffix, group_n):
-                            testable = "N"
-                        elif match_any(suffix, group_y):
-                            testable = "L"
-                        elif match_any(suffix, group_l):
-                            testable = "L"
-                        else:
-                            if prefix and match_any(prefix, group_n):
-                                testable = "N"
-                            elif prefix and match_any(prefix, group_y):
-                                testable = "L"
-                            elif prefix and match_any(prefix, group_l):
-                                testable = "L"
-                            else:
-                                testable = ""
-                    else:
-                        testable = ""
-                else:
-                    # 没有/，直接判断
-                    if skip == "0":
-                        testable = "Y"
-                    elif skip == "1":
-                        testable = ""
-                    else:
-                        testable = ""
+    def iter_rows(self):
+        # 单次遍历：逐行读取，同时提取板名/时间和数据行，产出 (step, Components, skip, 是否/NC)
+        pending = []  # step为1的数据行出现之前的行，找到step 1后丢弃
+        started = False
+        collector = self.collector
+        for raw_line in iter_lines(self.file):
+            line = raw_line.strip()
+            if not line or line[0] == "!":
+                # 提取板名和时间
+                if raw_line.startswith("! Board Name:"):
+                    parts = raw_line.split("Time:")
+                    if len(parts) == 2:
+                        self.board_name = parts[0].replace("! Board Name:", "").strip()
+                        self.test_time = parts[1].strip()
+                continue
+            # 查找step为1的数据行作为数据区第一行
+            if not started:
+                m = STEP_PATTERN.match(line)
+                if m and m.group(1) == "1":
+                    started = True
+                    pending.clear()
+                    if collector is not None:
+                        collector.reset()
+            match = ROW_PATTERN.match(line)
+            if not match:
+                # step行之后的测量行（Meas-V、ExpectV…）
+                if collector is not None:
+                    collector.add_detail(line)
+                continue
+            step, parts_n = match.groups()
+            tokens = line.split()
+            skip = find_skip(tokens)
+            if collector is not None:
+                collector.add_step(line)
+            # /NC 特殊处理
+            record = (step, parts_n, skip, "/NC" in parts_n.upper())
+            if started:
+                yield record
+            else:
+                pending.append(record)
+        # 没有step为1的行时从头开始
+        yield from pending
 
-                test_rows.append({
-                    "Step": step,
-                    "No.": None,
-                    "Components": parts_n,
-                    "Testable": testable,
-                    "Skip": skip
-                })
-            i += 1
+    def process_dat(self):
+        # 按列收集，再按统一的列类型（handlers/schema.py）构建DataFrame
+        test_cols = ([], [], [])
+        nc_cols = ([], [], [])
+        for step, parts_n, skip, is_nc in self.iter_rows():
+            steps, components, skips = nc_cols if is_nc else test_cols
+            steps.append(step)
+            components.append(parts_n)
+            skips.append(skip)
 
-        df = pd.DataFrame(test_rows)
-        nc_df = pd.DataFrame(nc_rows)
-        # No.为自然序号，Step为原始编号
-        if not df.empty:
-            df["No."] = range(1, len(df) + 1)
-        if not nc_df.empty:
-            nc_df["No."] = range(1, len(nc_df) + 1)
+        # 整列一次判定Testable，判定结果的下标直接作为category编码
+        steps, components, skips = test_cols
+        df = step_frame(np.array(steps, dtype=np.int32), components, self.rules.classify_codes(components, skips), skips)
+        steps, components, skips = nc_cols
+        nc_df = step_frame(np.array(steps, dtype=np.int32), components, np.full(len(steps), TESTABLE_NC, dtype=np.int8), skips)
 
         # 计算覆盖率
-        y_count = df["Testable"].value_counts().get("Y", 0)
-        n_count = df["Testable"].value_counts().get("N", 0)
-        l_count = df["Testable"].value_counts().get("L", 0)
+        testable_counts = df["Testable"].value_counts()
+        y_count = testable_counts.get("Y", 0)
+        n_count = testable_counts.get("N", 0)
+        l_count = testable_counts.get("L", 0)
         total = y_count + n_count + l_count
         coverage = (y_count + l_count) / total if total > 0 else 0
 
-        return {
-            "board_name": board_name,
-            "test_time": test_time,
+        result = {
+            "board_name": self.board_name,
+            "test_time": self.test_time,
             "data": df,
             "nc_data": nc_df,
             "coverage": coverage
         }
+        if self.collector is not None:
+            result["measurements"] = self.collector.to_frame()
+        return result
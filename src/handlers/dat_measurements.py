@@ -0,0 +1,112 @@
+import csv
+import io
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# DAT 每个step两行：第一行为step行（BOM-V、针点、Skip、Type…），第二行为测量行（Meas-V、ExpectV、上下限…）
+# 这里把两行全部解析为按列存储的类型化数组：数值float32，针点等整数int16（缺失为-1），低基数字段为category
+
+STEP_FIELDS = [
+    ("Step", "int32"), ("Components", "category"), ("BOM-V", "value"), ("LC", "category"),
+    ("Hi-P", "int16"), ("Lo-P", "int16"),
+    ("G-P1", "int16"), ("G-P2", "int16"), ("G-P3", "int16"), ("G-P4", "int16"), ("G-P5", "int16"),
+    ("Skip", "int16"), ("Type", "category"), ("CanATL", "int16"), ("AnaSkip", "int16"),
+    ("TJ_Source", "float32"), ("TJ-Frequency", "float32"),
+]
+DETAIL_FIELDS = [
+    ("Meas-V", "value"), ("ExpectV", "value"), ("+Lm%", "float32"), ("-Lm%", "float32"),
+    ("DLY", "int16"), ("MODE", "int16"), ("AVGE", "int16"), ("RPT", "int16"), ("SMP", "int16"),
+    ("OFFSET", "float32"), ("DEV%", "float32"), ("Ver", "int16"),
+]
+
+# 数值后缀：倍率前缀 + 单位（如 K、nF、V）
+VALUE_PATTERN = r'^([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)([pnumKkMG]?)([A-Za-z]*)$'
+SCALE = {"": 1.0, "p": 1e-12, "n": 1e-9, "u": 1e-6, "m": 1e-3, "K": 1e3, "k": 1e3, "M": 1e6, "G": 1e9}
+
+class MeasurementCollector:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.step_lines = []
+        self.detail_lines = []
+
+    def add_step(self, line):
+        # 补齐上一个step缺失的测量行
+        if len(self.detail_lines) < len(self.step_lines):
+            self.detail_lines.append("")
+        self.step_lines.append(line)
+
+    def add_detail(self, line):
+        # 只接受紧跟在step行后的第一条测量行
+        if len(self.detail_lines) < len(self.step_lines):
+            self.detail_lines.append(line)
+
+    def to_frame(self):
+        if len(self.detail_lines) < len(self.step_lines):
+            self.detail_lines.append("")
+        data = {}
+        for fields, lines in ((STEP_FIELDS, self.step_lines), (DETAIL_FIELDS, self.detail_lines)):
+            df = read_fields(lines, fields)
+            for name, kind in fields:
+                if kind == "value":
+                    data[name], unit = parse_values(df[name])
+                    if name == "BOM-V":
+                        data["Unit"] = unit
+                else:
+                    data[name] = convert_column(df[name], kind)
+        return pd.DataFrame(data)
+
+def read_fields(lines, fields):
+    # 按空白分列，整块交给C解析器；缺少的列为缺失值
+    names = [name for name, _ in fields]
+    dtype = {name: "category" for name, kind in fields if kind in ("category", "value")}
+    if not lines:
+        return pd.DataFrame({name: pd.Series(dtype=dtype.get(name, "float64")) for name in names})
+    options = dict(
+        sep=r"\s+", header=None, names=names, dtype=dtype, skip_blank_lines=False,
+        quoting=csv.QUOTE_NONE, keep_default_na=False, na_values=[""],
+    )
+    try:
+        return pd.read_csv(io.StringIO("\n".join(lines)), **options)
+    except pd.errors.ParserError:
+        # 个别行列数多于表头时，截断多余的列后重新解析
+        lines = [" ".join(line.split()[:len(names)]) for line in lines]
+        return pd.read_csv(io.StringIO("\n".join(lines)), **options)
+
+def convert_column(s, kind):
+    if kind == "category":
+        return pd.Categorical(s)
+    numbers = pd.to_numeric(s, errors="coerce")
+    if kind == "float32":
+        return numbers.to_numpy(dtype=np.float32, na_value=np.nan)
+    return numbers.fillna(-1).to_numpy(dtype=kind)
+
+def parse_values(s):
+    # "10.00K" -> 10000.0 ("")，"1.500V" -> 1.5 ("V")，"100nF" -> 1e-7 ("F")
+    # 只解析去重后的类别，再按编码取值；编码-1（缺失）取到末尾追加的NaN
+    cat = pd.Categorical(s)
+    parts = pd.Series(cat.categories.astype(str)).str.extract(VALUE_PATTERN)
+    numbers = pd.to_numeric(parts[0], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    scale = parts[1].map(SCALE).to_numpy(dtype=np.float64, na_value=1.0)
+    values = np.append((numbers * scale).astype(np.float32), np.float32(np.nan))
+    units = pd.Categorical(parts[2].where(parts[0].notna()))
+    unit_codes = np.append(units.codes, -1)
+    unit = pd.Categorical.from_codes(unit_codes[cat.codes], categories=units.categories)
+    return values[cat.codes], unit
+
+def concat_measurements(frames):
+    # 合并多块板的测量数据（{板名: DataFrame}），category列合并类别而不退化为object
+    frames = {board: df for board, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        return pd.DataFrame()
+    columns = list(next(iter(frames.values())).columns)
+    data = {"Board": pd.Categorical(np.repeat(list(frames), [len(df) for df in frames.values()]))}
+    for col in columns:
+        parts = [df[col] for df in frames.values()]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            data[col] = union_categoricals(parts, ignore_order=True)
+        else:
+            data[col] = np.concatenate([p.to_numpy() for p in parts])
+    return pd.DataFrame(data)
@@ -1,89 +1,164 @@
 import pandas as pd
+import csv
 import io
+from itertools import chain
+from .schema import component_frame
+
+PARSER_VERSION = 4  # 解析逻辑或输出变化时加1，使解析缓存（utils/parse_cache.py）失效
+
+# DCL文件由若干条记录组成（多联板、复测）：每条记录一个 // Header_Data 区块，后跟一个或多个 // Component_Data 区块
+# 拼板时每个子板各有记录，MulBrdNum为子板编号、MulBrdResult为子板结果，同一子板的多条记录为复测
+# 按注释行（//开头）切分，Component_Data的数据整块交给read_csv，列映射、HPin/LPin拼接、Result转换都按整列处理
+
+# Component_Data 映射：输出列 -> DCL字段（Testing Point No. 由 HPin、LPin 拼接）
+COMPONENT_FIELDS = {
+    "No.": "StepNum",
+    "Component Name": "PartName",
+    "Testing Type": "Type",
+    "Reference Value": "Std_V",
+    "Lower Limit(%)": "HLim",
+    "Upper Limit(%)": "LLim",
+    "Measured Value": "Msr_V",
+    "Result": "Result",
+}
+
+def split_fields(line):
+    return [x.strip() for x in line.split(',')]
+
+def parse_header(fields, values):
+    field_map = {name: idx for idx, name in enumerate(fields)}
+    def get(name):
+        idx = field_map.get(name)
+        return values[idx] if idx is not None and idx < len(values) else ""
+    date, time = get("Date"), get("Time")
+    test_time = ""
+    if date and time and len(date) == 8 and len(time) == 6:
+        test_time = f"{date[:4]}-{date[4:6]}-{date[6:]} {time[:2]}:{time[2:4]}:{time[4:]}"
+    return {
+        "passfail": get("PASS/FAIL"),
+        "result": get("Result"),
+        "test_time": test_time,
+        "board_name": get("BoardName"),
+        "panel": get("MulBrdNum"),
+        "panel_result": get("MulBrdResult"),
+        "detail_result": get("DetailResult"),
+    }
+
+def panel_order(panel):
+    # 子板编号按数字排序
+    return (0, int(panel), "") if panel.isdigit() else (1, 0, panel)
+
+def split_panels(records):
+    # [(header_data, ...)] -> {子板编号: 该子板的最后一条记录（复测取最后一次）}，按子板编号排序
+    panels = {}
+    for record in records:
+        panels[record[0]["panel"]] = record
+    return {panel: panels[panel] for panel in sorted(panels, key=panel_order)}
+
+def read_components(body, fields):
+    # 一个Component_Data区块的数据行 -> {输出列: 文本列表}；与原逐行解析一致，只保留字段数与表头相同的行
+    n = len(fields)
+    lines = body.splitlines()
+    good = [line for line in lines if line.count(",") == n - 1 and line.strip()]
+    if not good:
+        return None
+    text = body if len(good) == sum(1 for line in lines if line.strip()) else "\n".join(good)
+    # 同名字段取最后一个（与原 comp_field_idx 一致）
+    field_idx = {name: idx for idx, name in enumerate(fields)}
+    wanted = {name: field_idx[name] for name in list(COMPONENT_FIELDS.values()) + ["HPin", "LPin"] if name in field_idx}
+    raw = pd.read_csv(
+        io.StringIO(text), header=None, names=range(n), usecols=sorted(set(wanted.values())),
+        dtype=object, keep_default_na=False, quoting=csv.QUOTE_NONE, skipinitialspace=True,
+    )
+    empty = [""] * len(raw)
+    def field(name):
+        # 行首空白已由skipinitialspace去掉，这里去掉字段末尾的空白
+        return [value.rstrip() for value in raw[wanted[name]].tolist()] if name in wanted else empty
+    columns = {name: field(source) for name, source in COMPONENT_FIELDS.items()}
+    hpin, lpin = pd.Series(field("HPin"), dtype=object), pd.Series(field("LPin"), dtype=object)
+    columns["Testing Point No."] = (hpin + "," + lpin).where((hpin != "") & (lpin != ""), hpin.where(hpin != "", lpin)).tolist()
+    # 处理Result字段
+    columns["Result"] = pd.Series(columns["Result"], dtype=object).eq("0").map({True: "PASS", False: "FAIL"}).tolist()
+    return columns
+
+def components_to_frame(blocks):
+    if not blocks:
+        return pd.DataFrame()
+    if len(blocks) == 1:
+        return component_frame(blocks[0])
+    return component_frame({name: list(chain.from_iterable(block[name] for block in blocks)) for name in blocks[0]})
 
 class DclHandler:
     def __init__(self, file):
         self.file = file
 
-    def process_dcl(self):
-        header_fields = []
-        header_values = []
-        in_header = False
-        component_fields = []
-        component_rows = []
-        in_component = False
+    def iter_sections(self, content):
+        # 产出 (注释行内容, 到下一注释行之前的文本)；注释行为去掉行首空白后以//开头的行
+        # 只查找"//"出现的位置，不逐行扫描数据区
+        comment = None
+        body_start = 0
+        pos = content.find("//")
+        while pos >= 0:
+            line_start = content.rfind("\n", 0, pos) + 1
+            line_end = content.find("\n", pos)
+            if line_end < 0:
+                line_end = len(content)
+            if not content[line_start:pos].strip(" \t"):
+                if comment is not None:
+                    yield comment, content[body_start:line_start]
+                comment = content[pos + 2:line_end].strip()
+                body_start = line_end
+            pos = content.find("//", line_end)
+        if comment is not None:
+            yield comment, content[body_start:]
 
+    def _read_records(self, components=True):
+        # 每条记录 {"fields": 表头字段, "values": 表头数据（没有时为None）, "blocks": Component_Data各区块的列}
+        # components为False时只读表头，不解析Component_Data
         content = self.file.read().decode('utf-8')
-        f = io.StringIO(content)
-
-        for line in f:
-            line = line.strip()
-            # Header_Data 区块
-            if line.startswith("// Header_Data"):
-                in_header = True
-                in_component = False
-                continue
-            if in_header and line.startswith("//"):
-                header_fields = [x.strip() for x in line[2:].split(',')]
-                continue
-            if in_header and line and not line.startswith("//"):
-                header_values = [x.strip() for x in line.split(',')]
-                in_header = False  # 只取第一条
+        records = []
+        state = None
+        for comment, body in self.iter_sections(content):
+            if comment.startswith("Header_Data"):
+                state = "header"
+                records.append({"values": None, "fields": [], "blocks": []})
                 continue
-            # Component_Data 区块
-            if line.startswith("// Component_Data"):
-                in_component = True
+            if comment.startswith("Component_Data"):
+                state = "component"
+                if not records:
+                    records.append({"values": None, "fields": [], "blocks": []})
                 continue
-            if in_component and line.startswith("//"):
-                component_fields = [x.strip() for x in line[2:].split(',')]
-                continue
-            if in_component and line and not line.startswith("//"):
-                row = [x.strip() for x in line.split(',')]
-                if len(row) == len(component_fields):
-                    component_rows.append(row)
-        # Header_Data
-        field_map = {name: idx for idx, name in enumerate(header_fields)}
-        board_name = header_values[field_map.get("BoardName", -1)] if "BoardName" in field_map else ""
-        # 取PASS/FAIL字段
-        passfail = header_values[field_map.get("PASS/FAIL", -1)] if "PASS/FAIL" in field_map else ""
-        result = header_values[field_map.get("Result", -1)] if "Result" in field_map else ""
-        date = header_values[field_map.get("Date", -1)] if "Date" in field_map else ""
-        time = header_values[field_map.get("Time", -1)] if "Time" in field_map else ""
-        test_time = ""
-        if date and time and len(date) == 8 and len(time) == 6:
-            test_time = f"{date[:4]}-{date[4:6]}-{date[6:]} {time[:2]}:{time[2:4]}:{time[4:]}"
-        header_data = {
-            "passfail": passfail,
-            "result": result,
-            "test_time": test_time,
-            "board_name": board_name
-        }
-        # Component_Data 映射
-        comp_map = {
-            "No.": "StepNum",
-            "Component Name": "PartName",
-            "Testing Type": "Type",
-            "Testing Point No.": ("HPin", "LPin"),
-            "Reference Value": "Std_V",
-            "Lower Limit(%)": "HLim",
-            "Upper Limit(%)": "LLim",
-            "Measured Value": "Msr_V",
-            "Result": "Result"
-        }
-        comp_field_idx = {name: idx for idx, name in enumerate(component_fields)}
-        data = []
-        for row in component_rows:
-            item = {}
-            for k, v in comp_map.items():
-                if k == "Testing Point No.":
-                    hpin = row[comp_field_idx.get("HPin", -1)] if "HPin" in comp_field_idx else ""
-                    lpin = row[comp_field_idx.get("LPin", -1)] if "LPin" in comp_field_idx else ""
-                    item[k] = f"{hpin},{lpin}" if hpin and lpin else hpin or lpin
-                else:
-                    idx = comp_field_idx.get(v, -1) if isinstance(v, str) else -1
-                    item[k] = row[idx] if idx >= 0 else ""
-            # 处理Result字段
-            item["Result"] = "PASS" if item["Result"] == "0" else "FAIL"
-            data.append(item)
-        component_df = pd.DataFrame(data)
-        return header_data, component_df
\ No newline at end of file
+            if state == "header":
+                # 字段行之后的第一行为表头数据（只取一行）
+                line = next((line.strip() for line in body.splitlines() if line.strip()), "")
+                if line:
+                    records[-1]["fields"] = split_fields(comment)
+                    records[-1]["values"] = split_fields(line)
+                    state = None
+            elif state == "component" and components:
+                block = read_components(body, split_fields(comment))
+                if block is not None:
+                    records[-1]["blocks"].append(block)
+        return records
+
+    def process_records(self):
+        # 按文件中的顺序返回每条记录的 (header_data, component_df)
+        return [
+            (parse_header(record["fields"], record["values"] or []), components_to_frame(record["blocks"]))
+            for record in self._read_records()
+        ]
+
+    def process_headers(self):
+        # 只读各记录的header_data（判断是否拼板等），不解析Component_Data
+        return [parse_header(record["fields"], record["values"] or []) for record in self._read_records(components=False)]
+
+    def process_panels(self):
+        # 拼板：{子板编号: (header_data, component_df)}，同一子板的复测取最后一条记录
+        return split_panels(self.process_records())
+
+    def process_dcl(self):
+        # 与原有行为一致：表头取最后一条有数据的Header_Data，所有记录的Component_Data按顺序合并
+        records = self._read_records()
+        headers = [record for record in records if record["values"] is not None]
+        header_data = parse_header(headers[-1]["fields"], headers[-1]["values"]) if headers else parse_header([], [])
+        return header_data, components_to_frame([block for record in records for block in record["blocks"]])
@@ -0,0 +1,62 @@
+from sys import intern
+from typing import NamedTuple
+import pandas as pd
+
+# 元件编号（Components，如 C102-PX、T100_1_2、D100/NC、R12/NP、R1,R2）的解析
+# 每个不同的字符串只拆分一次，结果保存在驻留表中：查Description、去重和Remark读取同一份解析结果，
+# 同一编号在各测试步、各处理阶段以及之后处理的板中重复出现时直接查表；拆出的编号用sys.intern共用同一个字符串对象
+# Testable判定只用前缀和/后缀，由 handlers/testable_rules.py 直接计算，不经过此表
+
+MAX_INTERNED = 1 << 18  # 每次处理开始时驻留表超过此条数则清空，长时间运行的报告服务内存不随处理过的板数增长
+
+class Designator(NamedTuple):
+    main: str             # 主编号（去重分组）：第一个/或,之前的编号去掉空格及_、-之后的变体，大写，如 T100_1_2 的 T100
+    refs: tuple           # /或,分隔的各编号去掉变体后的大写编号（不含空编号），按原顺序，查BOM时取第一个命中的
+    partner: str          # 并联元件：最后一个/（没有/时最后一个,）之后的部分，没有分隔符时为None
+    has_np: bool          # 含/NP
+    has_slash: bool
+    has_dash: bool        # 带-变体，如 C102-PX
+    has_underscore: bool  # 带_变体，如 T100_1_2
+    length: int
+
+_table = {}
+
+def trim(max_entries=MAX_INTERNED):
+    # 处理一块板之前调用（utils/pipeline.py）；一块板的处理过程中不清空，大板的各阶段不会重复解析
+    if len(_table) > max_entries:
+        _table.clear()
+
+def parse_designator(text):
+    designator = _table.get(text)
+    if designator is None:
+        designator = _table[text] = _parse(text)
+    return designator
+
+def _parse(text):
+    # 编号的变体：先按下划线分割，再按短横线分割，只取第一段（T100_1_2、C102-PX -> T100、C102）
+    upper = text.upper()
+    has_slash = "/" in text
+    if has_slash or "," in text or " " in text:
+        compact = upper.replace(' ', '')
+        main = intern(compact.partition('/')[0].partition(',')[0].partition('_')[0].partition('-')[0])
+        parts = [part.strip().partition('_')[0].partition('-')[0] for part in compact.replace(',', '/').split('/')]
+        refs = tuple([intern(part) for part in parts if part])
+        separator = "/" if has_slash else ","
+        partner = text.rpartition(separator)[2].strip() if separator in text else None
+    else:
+        # 常见的单个编号（如 C102、T100_1_2），主编号即唯一的编号
+        main = intern(upper.partition('_')[0].partition('-')[0])
+        stripped = upper.strip()
+        ref = main if stripped == upper else stripped.partition('_')[0].partition('-')[0]
+        refs = (intern(ref),) if ref else ()
+        partner = None
+    return Designator(main, refs, partner, "/NP" in upper, has_slash, "-" in text, "_" in text, len(text))
+
+def parse_column(values):
+    # 整列解析：返回 (codes, designators)，第i行的解析结果为 designators[codes[i]]
+    # 只对去重后的字符串查表；空值的编码为-1，对应末位空字符串的解析结果
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), sort=False)
+    get = _table.get
+    designators = [get(value) or parse_designator(str(value)) for value in uniques]
+    designators.append(parse_designator(""))
+    return codes, designators
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+# DAT / NC / DCL 解析结果共用的列类型：编号为整数，取值有限的字段为category，其余文本为pandas字符串类型
+# （pandas 3 的 "str"，安装pyarrow时自动用pyarrow存储）；按列数组直接构建，不经过逐行dict
+
+STEP_COLUMNS = ["Step", "No.", "Components", "Testable", "Skip"]
+TESTABLE_VALUES = ["", "Y", "N", "L", "NC"]  # 前四个与 testable_rules.OUTCOMES 的下标一致
+TESTABLE_NC = TESTABLE_VALUES.index("NC")
+SKIP_VALUES = ["", "0", "1"]
+RESULT_VALUES = ["PASS", "FAIL"]
+
+DCL_COLUMNS = [
+    "No.", "Component Name", "Testing Type", "Testing Point No.", "Reference Value",
+    "Lower Limit(%)", "Upper Limit(%)", "Measured Value", "Result",
+]
+# DCL的No.按原文写入报告（Test Result中为文本），保持为字符串
+DCL_CATEGORIES = {"Testing Type": None, "Result": RESULT_VALUES}
+
+def text_array(values):
+    return pd.array(values, dtype="str")
+
+def step_frame(steps, components, testable_codes, skip):
+    # steps：整数；testable_codes：TESTABLE_VALUES的下标；skip：""/"0"/"1"
+    return pd.DataFrame({
+        "Step": np.asarray(steps, dtype=np.int32),
+        "No.": np.arange(1, len(steps) + 1, dtype=np.int32),  # No.为自然序号，Step为原始编号
+        "Components": text_array(components),
+        "Testable": pd.Categorical.from_codes(np.asarray(testable_codes, dtype=np.int8), categories=TESTABLE_VALUES),
+        "Skip": pd.Categorical(skip, categories=SKIP_VALUES),
+    }, columns=STEP_COLUMNS)
+
+def component_frame(columns):
+    # columns：{DCL列名: 文本列表}，Testing Type按出现的取值建category
+    data = {}
+    for name in DCL_COLUMNS:
+        if name in DCL_CATEGORIES:
+            data[name] = pd.Categorical(columns[name], categories=DCL_CATEGORIES[name])
+        else:
+            data[name] = text_array(columns[name])
+    return pd.DataFrame(data, columns=DCL_COLUMNS)
@@ -0,0 +1,106 @@
+import json
+import os
+import re
+import numpy as np
+import pandas as pd
+
+# Testable（Y/N/L）判定规则引擎：分组从配置文件读取，整列一次判定
+# 只需要前缀和/后缀，不使用 handlers/designator.py 的完整解析（大多数编号不重复的板上完整解析比判定本身慢）
+
+DEFAULT_GROUPS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "testable_groups.json")
+PREFIX_RE = re.compile(r"^([A-Z]+)\d+")
+
+# 分组位掩码，一个名称可同时属于多个分组（如PCB同时在N和L中）
+Y_BIT, N_BIT, L_BIT = 1, 2, 4
+OUTCOMES = np.array(["", "Y", "N", "L"], dtype=object)
+
+def first_hit(mask, order):
+    for bit, outcome in order:
+        if mask & bit:
+            return outcome
+    return 0
+
+def decide(skip, has_slash, suffix_mask, prefix_mask):
+    # 单条规则（与原逐行判定一致），用于生成查找表；返回OUTCOMES中的下标
+    if not has_slash:
+        # 没有/，直接判断
+        return 1 if skip == 0 else 0
+    if skip == 0:
+        # 优先用/后缀判断，没命中再用前缀判断
+        return (first_hit(suffix_mask, ((N_BIT, 2), (Y_BIT, 1), (L_BIT, 3)))
+                or first_hit(prefix_mask, ((Y_BIT, 1), (N_BIT, 2), (L_BIT, 3))))
+    if skip == 1:
+        # skip为1时原本可测的也记为L
+        return (first_hit(suffix_mask, ((N_BIT, 2), (Y_BIT, 3), (L_BIT, 3)))
+                or first_hit(prefix_mask, ((N_BIT, 2), (Y_BIT, 3), (L_BIT, 3))))
+    return 0
+
+# 查找表：[skip(0/1/其他), 是否含/, 后缀掩码, 前缀掩码] -> 结果下标
+DECISION_TABLE = np.array([
+    [[[decide(skip, has_slash, s, p) for p in range(8)] for s in range(8)] for has_slash in (False, True)]
+    for skip in (0, 1, 2)
+], dtype=np.int8)
+
+class TestableRules:
+    def __init__(self, groups):
+        self.groups = {key: frozenset(str(x).upper() for x in groups.get(key, [])) for key in ("Y", "N", "L")}
+        self.masks = {}
+        for key, bit in (("Y", Y_BIT), ("N", N_BIT), ("L", L_BIT)):
+            for name in self.groups[key]:
+                self.masks[name] = self.masks.get(name, 0) | bit
+
+    def cache_key(self):
+        # 规则内容的稳定表示，作为解析缓存键的一部分
+        return json.dumps({key: sorted(names) for key, names in self.groups.items()}, sort_keys=True)
+
+    @classmethod
+    def load(cls, path=None):
+        with open(path or DEFAULT_GROUPS_FILE, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def classify(self, components, skip, suffix=None, prefix=None):
+        # components/skip为等长数组；suffix/prefix可由调用方预先给出，否则按Components计算
+        return OUTCOMES[self.classify_codes(components, skip, suffix, prefix)]
+
+    def classify_codes(self, components, skip, suffix=None, prefix=None):
+        # 同classify，返回OUTCOMES中的下标（int8），可直接作为category编码
+        # 特征只对去重后的Components计算一次，再按编码展开到每一行；空值按空字符串判定
+        # 没有/时结果只取决于Skip，前缀、后缀掩码只对含/的编号计算
+        codes, uniques = pd.factorize(pd.Series(components, dtype=object).fillna(""), sort=False)
+        slashed = [(i, comp) for i, comp in enumerate(map(str, uniques)) if "/" in comp]
+        features = np.zeros((len(uniques), 3), dtype=np.int8)
+        if slashed:
+            rows, comps = zip(*slashed)
+            features[list(rows)] = [self._features(comp) for comp in comps]
+        has_slash, suffix_mask, prefix_mask = features[codes].T
+        if suffix is not None:
+            suffix_mask = self._mask(suffix)
+        if prefix is not None:
+            prefix_mask = self._mask(prefix)
+        skip_codes, skip_values = pd.factorize(pd.Series(skip, dtype=object))
+        skip_idx = np.array([0 if v == "0" else 1 if v == "1" else 2 for v in skip_values] + [2], dtype=np.int8)[skip_codes]
+        return DECISION_TABLE[skip_idx, has_slash, suffix_mask, prefix_mask]
+
+    def classify_one(self, parts_n, skip):
+        # 单条判定（流式解析逐条产出记录时使用），与classify查同一张表
+        has_slash, suffix_mask, prefix_mask = self._features(parts_n)
+        skip_idx = 0 if skip == "0" else 1 if skip == "1" else 2
+        return OUTCOMES[DECISION_TABLE[skip_idx, has_slash, suffix_mask, prefix_mask]]
+
+    def _features(self, comp):
+        # (是否含/, /后缀的分组掩码, 字母前缀的分组掩码)
+        upper = comp.upper()
+        prefix_match = PREFIX_RE.match(upper)
+        prefix_mask = self.masks.get(prefix_match.group(1), 0) if prefix_match else 0
+        return int("/" in upper), self.masks.get(upper.rsplit("/", 1)[-1], 0), prefix_mask
+
+    def _mask(self, names):
+        return pd.Series(names, dtype=object).map(self.masks).fillna(0).to_numpy(dtype=np.int8)
+
+_default_rules = None
+
+def get_default_rules():
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = TestableRules.load()
+    return _default_rules
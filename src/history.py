@@ -0,0 +1,69 @@
+import argparse
+import sys
+import pandas as pd
+from batch import discover_jobs, expand_panels
+from utils.history import failure_rate, history_path, record_report, top_failures, yield_trend
+from utils.parse_cache import parse_dat, parse_dcl, parse_dcl_panels
+
+# 历史结果库查询与回填（库路径见 utils/history.py，可用环境变量 REPORT_GEN_HISTORY_DB 指定）
+# 用法：
+#   python src/history.py import <数据目录>                       回填：解析目录中已归档的DAT/DCL写入历史库（不生成报告）
+#   python src/history.py failure-rate C121 [--last 10000]      元件失败率（主编号或完整测试名）
+#   python src/history.py trend [--board 500504] [--period day]  良率与覆盖率趋势
+#   python src/history.py top [--last 10000] [--limit 20]       失败最多的元件
+# 各查询都可加 --board / --since / --until 筛选
+
+def import_dir(input_dir):
+    count = 0
+    for job in expand_panels(discover_jobs(input_dir)):
+        if not job["dcl"]:
+            continue
+        panel = job.get("panel")
+        header_data, component_df = parse_dcl_panels(job["dcl"])[panel] if panel else parse_dcl(job["dcl"])
+        dat_data = parse_dat(job["dat"]) if job["dat"] else None
+        # 与生成报告时的记录使用相同的键，已记录过的不重复写入
+        error = record_report(job["dcl"], header_data, component_df, dat_data, panel=panel or "")
+        if error:
+            print(f"[warn] {job['dcl']}: {error}", file=sys.stderr)
+        else:
+            count += 1
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ICT测试历史结果查询")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="回填目录中的DAT/DCL")
+    p_import.add_argument("input_dir")
+    p_rate = sub.add_parser("failure-rate", help="元件失败率")
+    p_rate.add_argument("component")
+    p_trend = sub.add_parser("trend", help="良率与覆盖率趋势")
+    p_trend.add_argument("--period", choices=["day", "month"], default="day")
+    p_top = sub.add_parser("top", help="失败最多的元件")
+    p_top.add_argument("--limit", type=int, default=20)
+    for p in (p_rate, p_trend, p_top):
+        p.add_argument("--board")
+        p.add_argument("--since", help="起始测试时间，如 2025-07-01")
+        p.add_argument("--until", help="截止测试时间（不含）")
+    for p in (p_rate, p_top):
+        p.add_argument("--last", type=int, help="只统计最近N次运行")
+    args = parser.parse_args(argv)
+
+    if history_path() is None:
+        parser.error("历史结果库未启用（REPORT_GEN_HISTORY_DB=off）")
+    if args.command == "import":
+        print(f"已处理 {import_dir(args.input_dir)} 次运行：{history_path()}")
+    elif args.command == "failure-rate":
+        r = failure_rate(args.component, args.board, args.since, args.until, args.last)
+        print(f"{args.component}：测试 {r['runs']} 块板，失败 {r['failed_runs']} 块（{r['rate']:.2%}），"
+              f"测试项 {r['tests']}，失败项 {r['failures']}")
+    else:
+        if args.command == "trend":
+            df = yield_trend(args.board, args.since, args.until, args.period)
+        else:
+            df = top_failures(args.board, args.since, args.until, args.last, args.limit)
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(df.to_string(index=False) if not df.empty else "没有记录")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+import argparse
+import email.parser
+import email.policy
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from urllib.parse import quote
+from concurrent.futures import ProcessPoolExecutor
+from email.message import EmailMessage
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from batch import process_job
+from utils.profiling import enable, profile_path, write_records
+
+# 报告生成HTTP服务：MES等系统上传 DCL/DAT/BOM 提交任务，后台进程池生成报告，轮询状态后下载xlsx
+# 只依赖标准库，默认只监听本机
+# 用法：python src/service.py [-t template.xlsx] [--host 127.0.0.1] [--port 8502] [-j 进程数] [--max-queue 16] [--stream] [--profile metrics.prom]
+# 接口：
+#   POST /jobs               multipart/form-data：dcl（必需）、dat、bom、template（可选，默认用 -t 指定的模板）
+#                            返回 202 {"id": ..., "status": "queued"}；排队已满返回 503 并带 Retry-After
+#   GET  /jobs/<id>          任务状态（queued / running / done / failed）与各阶段耗时
+#   GET  /jobs/<id>/report   完成后下载xlsx，未完成返回 409
+#   GET  /health             进程数、排队和运行中的任务数
+# curl示例：curl -F dcl=@500504.csv -F dat=@500504.DAT -F bom=@BOM.csv http://127.0.0.1:8502/jobs
+
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+UPLOAD_FIELDS = {"dcl": "input.dcl", "dat": "input.dat", "bom": "bom.csv", "template": "template.xlsx"}
+JOB_PATH = re.compile(r"^/jobs/([0-9a-f]{32})(/report)?$")
+
+def parse_multipart(content_type, body):
+    # 解析multipart/form-data，返回 {字段名: (文件名, 内容)}
+    header = EmailMessage()
+    header["Content-Type"] = content_type
+    boundary = header.get_param("boundary")
+    if header.get_content_type() != "multipart/form-data" or not boundary:
+        raise ValueError("请求需为 multipart/form-data")
+    fields = {}
+    delimiter = b"--" + boundary.encode("latin-1")
+    for part in body.split(delimiter)[1:]:
+        if part.startswith(b"--"):
+            break
+        head, sep, data = part.partition(b"\r\n\r\n")
+        if not sep:
+            raise ValueError("multipart格式错误")
+        headers = email.parser.BytesHeaderParser(policy=email.policy.HTTP).parsebytes(head.lstrip(b"\r\n") + b"\r\n\r\n")
+        name = headers.get_param("name", header="content-disposition")
+        if name:
+            fields[name] = (headers.get_filename() or name, data[:-2] if data.endswith(b"\r\n") else data)
+    return fields
+
+def board_name(filename):
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return re.sub(r"[^\w.-]", "_", stem) or "report"
+
+def content_disposition(filename):
+    # 板名可能含中文：HTTP头只能用latin-1，filename给ASCII替代名，filename*（RFC 6266）给UTF-8原名
+    fallback = re.sub(r"[^\w.-]", "_", filename, flags=re.ASCII)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+class Job:
+    def __init__(self, work_dir, board):
+        self.id = uuid.uuid4().hex
+        self.work_dir = work_dir
+        self.board = board
+        self.created = time.time()
+        self.finished = None
+        self.future = None
+        self.result = None
+
+    def status(self):
+        if self.result is not None:
+            return "done" if self.result["status"] == "ok" else "failed"
+        return "running" if self.future.running() else "queued"
+
+    def to_dict(self):
+        info = {"id": self.id, "board": self.board, "status": self.status(), "created": self.created}
+        if self.result is not None:
+            info["error"] = self.result["error"]
+            info["elapsed_s"] = self.finished - self.created
+            # 进程池内的处理耗时，其余为排队时间
+            info["queued_s"] = max(info["elapsed_s"] - self.result["total_s"], 0.0)
+            info["timings"] = {k: v for k, v in self.result.items() if k.endswith("_s")}
+        return info
+
+class ReportService:
+    def __init__(self, template_file=None, workers=None, max_queue=16, stream=False, keep_seconds=3600, work_root=None):
+        self.template_file = template_file
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue  # 排队（未开始）的任务上限，超出时拒绝新任务
+        self.stream = stream
+        self.keep_seconds = keep_seconds  # 完成的任务及其报告保留时间
+        self.work_root = tempfile.mkdtemp(prefix="report_service_", dir=work_root)
+        self.jobs = {}
+        self.lock = threading.Lock()
+        # HTTP请求在多个线程中处理，fork带线程的进程不安全，进程池用spawn
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def counts(self):
+        with self.lock:
+            statuses = [job.status() for job in self.jobs.values()]
+        return {s: statuses.count(s) for s in ("queued", "running", "done", "failed")}
+
+    def submit(self, fields):
+        # 返回 (HTTP状态, JSON内容, 额外响应头)
+        self.purge()
+        if "dcl" not in fields:
+            return HTTPStatus.BAD_REQUEST, {"error": "缺少 dcl 文件"}, {}
+        if "template" not in fields and not self.template_file:
+            return HTTPStatus.BAD_REQUEST, {"error": "缺少 template 文件（服务未配置默认模板）"}, {}
+        with self.lock:
+            active = sum(1 for job in self.jobs.values() if job.result is None)
+            if active >= self.workers + self.max_queue:
+                return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "排队任务已满，请稍后重试"}, {"Retry-After": "1"}
+            work_dir = tempfile.mkdtemp(dir=self.work_root)
+            paths = {}
+            for field, filename in UPLOAD_FIELDS.items():
+                if field in fields:
+                    paths[field] = os.path.join(work_dir, filename)
+                    with open(paths[field], "wb") as f:
+                        f.write(fields[field][1])
+            job = Job(work_dir, board_name(fields["dcl"][0]))
+            spec = {"board": job.board, "dcl": paths["dcl"], "dat": paths.get("dat"), "bom": paths.get("bom")}
+            job.future = self.pool.submit(process_job, spec, paths.get("template", self.template_file), work_dir, self.stream)
+            self.jobs[job.id] = job
+        job.future.add_done_callback(lambda future, job=job: self._finish(job, future))
+        return HTTPStatus.ACCEPTED, {"id": job.id, "status": "queued"}, {"Location": f"/jobs/{job.id}"}
+
+    def _finish(self, job, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            # 工作进程异常退出等，process_job内的异常已记入result
+            result = {"status": "failed", "error": f"{type(e).__name__}: {e}", "total_s": 0.0, "output": ""}
+        with self.lock:
+            job.finished = time.time()
+            job.result = result
+        # 工作进程返回的各阶段性能记录在服务进程中统一写出（Prometheus格式时为全部任务的累计值）
+        if result.get("profile"):
+            write_records(result["profile"], profile_path())
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def purge(self):
+        # 删除超过保留时间的已完成任务及其文件
+        cutoff = time.time() - self.keep_seconds
+        with self.lock:
+            expired = [job for job in self.jobs.values() if job.finished is not None and job.finished < cutoff]
+            for job in expired:
+                del self.jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.work_dir, ignore_errors=True)
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(self.work_root, ignore_errors=True)
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    max_upload = 512 * 1024 * 1024
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        service = self.server.service
+        if self.path != "/jobs":
+            return self.send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.max_upload:
+            self.close_connection = True
+            return self.send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "上传文件过大"})
+        body = self.rfile.read(length)
+        try:
+            fields = parse_multipart(self.headers.get("Content-Type", ""), body)
+        except ValueError as e:
+            return self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        status, payload, headers = service.submit(fields)
+        self.send_json(status, payload, headers)
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/health":
+            return self.send_json(HTTPStatus.OK, {"workers": service.workers, "max_queue": service.max_queue, **service.counts()})
+        m = JOB_PATH.match(self.path)
+        job = service.get(m.group(1)) if m else None
+        if job is None:
+            return self.send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+        if not m.group(2):
+            return self.send_json(HTTPStatus.OK, job.to_dict())
+        status = job.status()
+        if status != "done":
+            return self.send_json(HTTPStatus.CONFLICT, {"id": job.id, "status": status})
+        with open(job.result["output"], "rb") as f:
+            body = f.read()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", XLSX_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Content-Disposition", content_disposition(f"{job.board}.xlsx"))
+        self.end_headers()
+        self.wfile.write(body)
+
+def make_server(service, host="127.0.0.1", port=8502, quiet=False):
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    if quiet:
+        ServiceHandler.log_message = lambda self, *args: None
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ICT测试报告生成HTTP服务")
+    parser.add_argument("-t", "--template", help="默认Excel模板（提交时未上传template时使用）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("-j", "--workers", type=int, default=None, help="进程数，默认等于CPU核数")
+    parser.add_argument("--max-queue", type=int, default=16, help="排队任务上限，超出时返回503")
+    parser.add_argument("--keep-seconds", type=int, default=3600, help="完成的任务保留时间（秒）")
+    parser.add_argument("--stream", action="store_true", help="流式写出Excel（适合大板）")
+    parser.add_argument("--quiet", action="store_true", help="不输出每个请求的日志")
+    parser.add_argument("--profile", metavar="PATH", help="记录各阶段耗时、内存和行数：.prom 为Prometheus文本格式，否则为JSON lines")
+    parser.add_argument("--profile-tracemalloc", action="store_true", help="性能记录中另外统计tracemalloc内存峰值（较慢）")
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable(args.profile, args.profile_tracemalloc)
+
+    if args.template and not os.path.isfile(args.template):
+        parser.error(f"找不到Excel模板：{args.template}")
+    service = ReportService(args.template, args.workers, args.max_queue, args.stream, args.keep_seconds)
+    server = make_server(service, args.host, args.port, args.quiet)
+    # 收到SIGTERM时与Ctrl+C一样正常退出，关闭进程池，不留下孤立的工作进程
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"报告服务已启动：http://{args.host}:{server.server_address[1]}（{service.workers} 个进程）", flush=True)
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
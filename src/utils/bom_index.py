@@ -0,0 +1,263 @@
+import bisect
+import heapq
+import io
+import os
+import re
+from collections import defaultdict
+from itertools import chain
+import numpy as np
+import pandas as pd
+from handlers.csv_handler import CsvHandler
+from utils.cache_utils import get_cache_dir, read_bytes, content_hash
+from utils.progress import ProgressReader
+
+# BOM位号索引：单个位号存字典，区间（如 R1-R200）不展开，按前缀存为互不重叠的数字区间
+# 同一位号出现多次时与原 build_ref_to_desc 一致：后出现的BOM行覆盖前面的
+
+INDEX_VERSION = 3
+RANGE_PATTERN = re.compile(r'([A-Za-z]+)(\d+)-([A-Za-z]+)?(\d+)')
+DESIGNATOR_PATTERN = re.compile(r"([A-Z]+)([0-9]+)")
+MAX_NUMBER = 2 ** 62
+
+class BomIndex:
+    def __init__(self, descriptions, exact, seg_prefixes, seg_offsets, seg_start, seg_end, seg_seq, seg_desc):
+        self.descriptions = descriptions
+        self.exact = exact  # 位号 -> (BOM行号, 描述编号)
+        self.seg_start = seg_start
+        self.seg_end = seg_end
+        self.seg_seq = seg_seq
+        self.seg_desc = seg_desc
+        self.seg_slices = {p: (int(seg_offsets[i]), int(seg_offsets[i + 1])) for i, p in enumerate(seg_prefixes)}
+        self._exact_index = None
+        # 单个查询用bisect在Python列表上二分，比逐次调用np.searchsorted快
+        self.seg_lists = {
+            p: (seg_start[lo:hi].tolist(), seg_end[lo:hi].tolist(), seg_seq[lo:hi].tolist(), seg_desc[lo:hi].tolist())
+            for p, (lo, hi) in self.seg_slices.items()
+        }
+
+    def size(self):
+        # 索引条目数：单独位号 + 区间段
+        return len(self.exact) + len(self.seg_start)
+
+    @classmethod
+    def from_frame(cls, csv_df):
+        return cls.from_chunks([csv_df])
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        # 逐块构建（CsvHandler.iter_csv），BOM行号跨块连续编号
+        desc_ids = {}
+        exact = {}
+        ranges = defaultdict(list)
+        seq_base = 0
+        for csv_df in chunks:
+            if csv_df.empty or "Reference" not in csv_df.columns or "Description" not in csv_df.columns:
+                continue
+            for seq, (ref_str, desc) in enumerate(zip(csv_df["Reference"], csv_df["Description"]), start=seq_base):
+                desc_id = desc_ids.setdefault(desc, len(desc_ids))
+                for part in str(ref_str).replace(' ', '').split(','):
+                    m = RANGE_PATTERN.match(part)
+                    if m:
+                        prefix1, start, prefix2, end = m.groups()
+                        prefix = (prefix2 if prefix2 else prefix1).upper()
+                        start, end = int(start), min(int(end), MAX_NUMBER)
+                        if start <= end:
+                            ranges[prefix].append((start, end, seq, desc_id))
+                    elif part:
+                        exact[part.upper()] = (seq, desc_id)
+            seq_base += len(csv_df)
+
+        seg_prefixes, seg_offsets, segments = [], [0], []
+        for prefix in sorted(ranges):
+            resolved = resolve_ranges(ranges[prefix])
+            seg_prefixes.append(prefix)
+            segments.extend(resolved)
+            seg_offsets.append(len(segments))
+        seg = np.array(segments, dtype=np.int64).reshape(-1, 4)
+        return cls(
+            list(desc_ids), exact, seg_prefixes, seg_offsets,
+            seg[:, 0].copy(), seg[:, 1].copy(), seg[:, 2].copy(), seg[:, 3].copy(),
+        )
+
+    def lookup(self, ref):
+        # 返回描述编号，未命中为-1；单个位号与区间同时命中时取BOM中靠后的一行
+        best_seq, best_desc = -1, -1
+        hit = self.exact.get(ref)
+        if hit is not None:
+            best_seq, best_desc = hit
+        m = DESIGNATOR_PATTERN.fullmatch(ref) if self.seg_lists else None
+        if m:
+            prefix, digits = m.groups()
+            segs = self.seg_lists.get(prefix)
+            # 区间展开后的位号不带前导0（R01-R03 -> R1、R2、R3）
+            if segs is not None and (digits[0] != "0" or digits == "0"):
+                starts, ends, seqs, descs = segs
+                number = int(digits)
+                idx = bisect.bisect_right(starts, number) - 1
+                if idx >= 0 and number <= ends[idx] and seqs[idx] > best_seq:
+                    best_desc = descs[idx]
+        return best_desc
+
+    def lookup_many(self, refs):
+        # 批量查询，返回描述编号数组（未命中为-1）：单个位号一次哈希查找，区间按前缀分组后用searchsorted
+        refs = list(refs)
+        best_seq = np.full(len(refs), -1, dtype=np.int64)
+        best_desc = np.full(len(refs), -1, dtype=np.int64)
+        if self.exact and refs:
+            if self._exact_index is None:
+                self._exact_index = pd.Index(list(self.exact), dtype=object)
+                self._exact_values = np.array(list(self.exact.values()), dtype=np.int64).reshape(-1, 2)
+            pos = self._exact_index.get_indexer(pd.Index(refs, dtype=object))
+            hit = pos >= 0
+            best_seq[hit] = self._exact_values[pos[hit], 0]
+            best_desc[hit] = self._exact_values[pos[hit], 1]
+        if self.seg_slices and refs:
+            # 去掉末尾数字得到前缀，只处理有区间的前缀
+            prefix_codes, prefix_uniques = pd.factorize(pd.Index([ref.rstrip("0123456789") for ref in refs], dtype=object))
+            for code, prefix in enumerate(prefix_uniques):
+                if prefix not in self.seg_slices:
+                    continue
+                lo, hi = self.seg_slices[prefix]
+                rows = np.flatnonzero(prefix_codes == code)
+                digits = [refs[r][len(prefix):] for r in rows]
+                # 与lookup一致：不带前导0；过长的编号超出int64，不可能落在区间内
+                valid = np.array([bool(d) and (d[0] != "0" or d == "0") and len(d) <= 18 for d in digits], dtype=bool)
+                rows = rows[valid]
+                numbers = np.array([int(d) for d, v in zip(digits, valid) if v], dtype=np.int64)
+                idx = np.searchsorted(self.seg_start[lo:hi], numbers, side="right") - 1
+                safe = np.maximum(idx, 0) + lo
+                ok = (idx >= 0) & (numbers <= self.seg_end[safe]) & (self.seg_seq[safe] > best_seq[rows])
+                best_desc[rows[ok]] = self.seg_desc[safe[ok]]
+        return best_desc
+
+    def get(self, ref, default=None):
+        desc_id = self.lookup(ref)
+        return self.descriptions[desc_id] if desc_id >= 0 else default
+
+    def __contains__(self, ref):
+        return self.lookup(ref) >= 0
+
+    def __getitem__(self, ref):
+        desc_id = self.lookup(ref)
+        if desc_id < 0:
+            raise KeyError(ref)
+        return self.descriptions[desc_id]
+
+    def __repr__(self):
+        return f"BomIndex(refs={len(self.exact)}, ranges={len(self.seg_start)}, descriptions={len(self.descriptions)})"
+
+    def covering(self, prefix, number):
+        # 直接按数字查询区间，不展开为字符串：返回 (起, 止, 描述) 或 None
+        starts, ends, _, descs = self.seg_lists.get(prefix.upper(), ([], [], [], []))
+        idx = bisect.bisect_right(starts, number) - 1
+        if idx >= 0 and number <= ends[idx]:
+            return starts[idx], ends[idx], self.descriptions[descs[idx]]
+        return None
+
+    def save(self, path):
+        keys = list(self.exact)
+        values = np.array([self.exact[k] for k in keys], dtype=np.int64).reshape(-1, 2)
+        prefixes = list(self.seg_slices)
+        offsets = [0] + [self.seg_slices[p][1] for p in prefixes]
+        # 空描述（NaN）单独存掩码，按字符串保存会变成"nan"，加载后不再视为缺失
+        missing = np.array([pd.isna(desc) for desc in self.descriptions], dtype=bool)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                version=np.array([INDEX_VERSION]),
+                descriptions=np.array(["" if m else desc for m, desc in zip(missing, self.descriptions)], dtype=str),
+                descriptions_missing=missing,
+                exact_keys=np.array(keys, dtype=str),
+                exact_values=values,
+                seg_prefixes=np.array(prefixes, dtype=str),
+                seg_offsets=np.array(offsets, dtype=np.int64),
+                seg_start=self.seg_start, seg_end=self.seg_end, seg_seq=self.seg_seq, seg_desc=self.seg_desc,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"][0]) != INDEX_VERSION:
+                raise ValueError("BOM索引版本不一致")
+            keys = data["exact_keys"].tolist()
+            values = data["exact_values"].tolist()
+            descriptions = [np.nan if m else desc for m, desc in zip(data["descriptions_missing"].tolist(), data["descriptions"].tolist())]
+            return cls(
+                descriptions,
+                {k: tuple(v) for k, v in zip(keys, values)},
+                data["seg_prefixes"].tolist(), data["seg_offsets"],
+                data["seg_start"], data["seg_end"], data["seg_seq"], data["seg_desc"],
+            )
+
+def resolve_ranges(ranges):
+    # 把可能重叠的区间整理为互不重叠的 (起, 止, 行号, 描述)，重叠部分取行号最大的（后出现的覆盖前面的）
+    points = sorted({s for s, _, _, _ in ranges} | {e + 1 for _, e, _, _ in ranges})
+    by_start = sorted(ranges)
+    heap, out, i = [], [], 0
+    for left, right in zip(points, points[1:]):
+        while i < len(by_start) and by_start[i][0] == left:
+            start, end, seq, desc_id = by_start[i]
+            heapq.heappush(heap, (-seq, end, desc_id))
+            i += 1
+        while heap and heap[0][1] < left:
+            heapq.heappop(heap)
+        if not heap:
+            continue
+        seq, desc_id = -heap[0][0], heap[0][2]
+        if out and out[-1][1] == left - 1 and out[-1][2] == seq:
+            out[-1][1] = right - 1
+        else:
+            out.append([left, right - 1, seq, desc_id])
+    return out
+
+def _cached(key, build):
+    try:
+        path = os.path.join(get_cache_dir("bom_index"), f"{key}.npz")
+    except OSError:
+        # 缓存目录不可用时直接构建
+        return build()
+    if os.path.exists(path):
+        try:
+            return BomIndex.load(path)
+        except (OSError, ValueError, KeyError):
+            pass
+    index = build()
+    if index is not None:
+        try:
+            index.save(path)
+        except OSError:
+            pass
+    return index
+
+def bom_index_for_frame(csv_df):
+    # 已解析的BOM（Reference/Description两列）：按内容哈希复用磁盘上的索引
+    if csv_df.empty or "Reference" not in csv_df.columns or "Description" not in csv_df.columns:
+        return BomIndex.from_frame(pd.DataFrame())
+    frame_hash = pd.util.hash_pandas_object(csv_df[["Reference", "Description"]], index=False).to_numpy().tobytes()
+    return _cached(content_hash("frame", INDEX_VERSION, frame_hash), lambda: BomIndex.from_frame(csv_df))
+
+def bom_index_for_file(file, progress=None):
+    # BOM文件：按文件内容哈希命中缓存时不再解析CSV；BOM无法解析时返回None
+    # progress(已解析字节数, 总字节数)：解析时按读取的字节回调，命中缓存时不回调
+    data = read_bytes(file)
+
+    def source():
+        return io.BytesIO(data) if progress is None else ProgressReader(io.BytesIO(data), len(data), progress)
+
+    def build():
+        handler = CsvHandler()
+        chunks = handler.iter_csv(source())
+        first = next(chunks, None)
+        if first is not None and len(first.columns) == 0:
+            # 没有Reference/Description列：与原来一致，有数据时得到空索引
+            return None if handler.process_csv(io.BytesIO(data)).empty else BomIndex.from_frame(pd.DataFrame())
+        if first is None or first.empty:
+            return None
+        try:
+            return BomIndex.from_chunks(chain([first], chunks))
+        except (pd.errors.ParserError, ValueError):
+            return None
+
+    return _cached(content_hash("file", INDEX_VERSION, data), build)
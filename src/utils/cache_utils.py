@@ -0,0 +1,28 @@
+import hashlib
+import os
+
+# 本地磁盘缓存（BOM索引等），目录可用环境变量 REPORT_GEN_CACHE_DIR 指定
+
+def get_cache_dir(kind):
+    root = os.environ.get("REPORT_GEN_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".report_gen", "cache")
+    path = os.path.join(root, kind)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def read_bytes(file):
+    # 路径或文件对象（Streamlit上传文件、open(..., "rb")）都读为bytes，文件对象读完后复位
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return f.read()
+    pos = file.tell() if hasattr(file, "tell") else None
+    data = file.read()
+    if pos is not None and hasattr(file, "seek"):
+        file.seek(pos)
+    return data
+
+def content_hash(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
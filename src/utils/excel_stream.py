@@ -0,0 +1,303 @@
+import logging
+import os
+import posixpath
+import re
+import threading
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from io import BytesIO
+from numbers import Number
+from xml.sax.saxutils import escape
+import numpy as np
+import pandas as pd
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string, get_column_letter, range_boundaries
+from openpyxl.utils.exceptions import IllegalCharacterError
+from utils.excel_template import get_template, START_ROW, MAX_TEMPLATES
+from utils.excel_utils import fill_template_excel, iter_frame_rows, prepare_parts_frame
+
+# 流式写出报告：不把模板和数据加载为openpyxl对象，直接生成两个数据sheet的XML并写入zip
+# 模板中的其它部件（图片、条件格式、页面设置、共享字符串等）原样复制，内存占用不随数据行数增长
+# 写出结果与fill_template_excel一致：同样的单元格值，数据区同样加细边框并居中
+# 模板的sheet或样式表结构无法按文本改写时（如样式表元素带命名空间前缀），记录警告并改用fill_template_excel生成
+
+logger = logging.getLogger(__name__)
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+SHEET_DATA_PATTERN = re.compile(r"<sheetData\s*/>|<sheetData\b[^>]*>(.*?)</sheetData>", re.S)
+ROW_PATTERN = re.compile(r"<row\b[^>]*?(?:/>|>.*?</row>)", re.S)
+CELL_PATTERN = re.compile(r"<c\b[^>]*?(?:/>|>.*?</c>)", re.S)
+BORDERS_PATTERN = re.compile(r"<borders\b([^>]*?)(/?)>")
+BORDER_PATTERN = re.compile(r"<border\b")
+CELL_XFS_PATTERN = re.compile(r"<cellXfs\b[^>]*?(?:/>|>(.*?)</cellXfs>)", re.S)
+XF_PATTERN = re.compile(r"<xf\b[^>]*?(?:/>|>.*?</xf>)", re.S)
+DIMENSION_PATTERN = re.compile(r'<dimension ref="([^"]*)"\s*/>')
+R_ATTR = re.compile(r'\sr="([^"]*)"')
+S_ATTR = re.compile(r'\ss="(\d+)"')
+SPANS_ATTR = re.compile(r'\sspans="[^"]*"')
+TABLE_BORDER_XML = (
+    '<border><left style="thin"><color rgb="00000000"/></left><right style="thin"><color rgb="00000000"/></right>'
+    '<top style="thin"><color rgb="00000000"/></top><bottom style="thin"><color rgb="00000000"/></bottom><diagonal/></border>'
+)
+TABLE_ALIGNMENT_XML = '<alignment horizontal="center" vertical="center"/>'
+FLUSH_ROWS = 1000
+
+class SheetLayout:
+    # 模板sheet拆为：<sheetData>之前的文本、各行原始XML、</sheetData>之后的文本
+    def __init__(self, text):
+        m = SHEET_DATA_PATTERN.search(text)
+        if m is None:
+            raise ValueError("模板sheet中没有<sheetData>")
+        self.head = text[:m.start()] + "<sheetData>"
+        self.tail = "</sheetData>" + text[m.end():]
+        self.rows = OrderedDict()
+        for row_match in ROW_PATTERN.finditer(m.group(1) or ""):
+            raw = row_match.group(0)
+            self.rows[int(R_ATTR.search(raw[:raw.index(">") + 1]).group(1))] = raw
+        dim = DIMENSION_PATTERN.search(self.head)
+        self.max_col, self.max_row = 1, max(self.rows, default=1)
+        if dim:
+            _, _, max_col, max_row = range_boundaries(dim.group(1))
+            self.max_col, self.max_row = max_col or 1, max(max_row or 1, self.max_row)
+
+    def cells(self, r):
+        # 模板某行的单元格：{列号: (原始XML, 样式编号或None)}
+        raw = self.rows.get(r)
+        if raw is None or raw.endswith("/>") and "</row>" not in raw:
+            return {}
+        out = {}
+        for cell_match in CELL_PATTERN.finditer(raw[raw.index(">") + 1:]):
+            cell = cell_match.group(0)
+            ref = R_ATTR.search(cell[:cell.index(">") + 1]).group(1)
+            style = S_ATTR.search(cell[:cell.index(">") + 1])
+            out[column_index_from_string(coordinate_from_string(ref)[0])] = (cell, int(style.group(1)) if style else 0)
+        return out
+
+    def row_open_tag(self, r):
+        raw = self.rows.get(r)
+        if raw is None:
+            return f'<row r="{r}">'
+        tag = SPANS_ATTR.sub("", raw[:raw.index(">") + 1])
+        return tag[:-2] + ">" if tag.endswith("/>") else tag
+
+class StreamLayout:
+    # 每个模板只解析一次：数据sheet的部件路径与行布局、加了边框/居中的样式表
+    def __init__(self, template):
+        self.template = template
+        with zipfile.ZipFile(BytesIO(template.data)) as zf:
+            self.sheet_parts, styles_part = self.find_parts(zf)
+            self.sheets = {name: SheetLayout(zf.read(part).decode("utf-8")) for name, part in self.sheet_parts.items()}
+            self.styles_part = styles_part
+            self.styles_xml, self.xf_count = self.table_styles(zf.read(styles_part).decode("utf-8"))
+
+    @staticmethod
+    def find_parts(zf):
+        workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+        rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        targets = {}
+        styles_part = "xl/styles.xml"
+        for rel in rels.iter(f"{{{PKG_REL_NS}}}Relationship"):
+            target = rel.get("Target")
+            target = target[1:] if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+            targets[rel.get("Id")] = target
+            if rel.get("Type", "").endswith("/styles"):
+                styles_part = target
+        parts = {}
+        for sheet in workbook.iter(f"{{{MAIN_NS}}}sheet"):
+            if sheet.get("name") in ("Test Result", "PartsCoverage"):
+                parts[sheet.get("name")] = targets[sheet.get(f"{{{REL_NS}}}id")]
+        return parts, styles_part
+
+    @staticmethod
+    def table_styles(text):
+        # 追加一个细边框，并为每个原有单元格样式追加一个“原样式+细边框+居中”的样式：
+        # 新样式编号 = 原编号 + 原样式数；模板中不存在的单元格（无样式）用 2 * 原样式数
+        # 边框数按<border>元素计，不依赖count属性；<borders/>自闭合时原有边框数为0
+        m = BORDERS_PATTERN.search(text)
+        if m is None:
+            raise ValueError("模板样式表（styles.xml）中没有<borders>")
+        attrs = re.sub(r'\scount="[^"]*"', "", m.group(1))
+        if m.group(2):
+            border_id, body_end, end = 0, m.end(), m.end()
+        else:
+            body_end = text.find("</borders>", m.end())
+            if body_end < 0:
+                raise ValueError("模板样式表（styles.xml）中<borders>没有结束标签")
+            border_id = len(BORDER_PATTERN.findall(text, m.end(), body_end))
+            end = body_end + len("</borders>")
+        text = (text[:m.start()] + f'<borders count="{border_id + 1}"{attrs}>' + text[m.end():body_end]
+                + TABLE_BORDER_XML + "</borders>" + text[end:])
+
+        m = CELL_XFS_PATTERN.search(text)
+        if m is None:
+            raise ValueError("模板样式表（styles.xml）中没有<cellXfs>")
+        xfs = XF_PATTERN.findall(m.group(1) or "")
+        new_xfs = [table_xf(xf, border_id) for xf in xfs]
+        new_xfs.append(table_xf('<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>', border_id))
+        cell_xfs = f'<cellXfs count="{len(xfs) * 2 + 1}">' + "".join(xfs) + "".join(new_xfs) + "</cellXfs>"
+        return text[:m.start()] + cell_xfs + text[m.end():], len(xfs)
+
+def table_xf(xf, border_id):
+    # 与openpyxl中 cell.border = ...; cell.alignment = ... 的效果一致：整体替换边框和对齐方式
+    open_end = xf.index(">") + 1
+    tag = xf[:open_end].rstrip("/>").rstrip()
+    body = "" if xf.endswith("/>") and "</xf>" not in xf else xf[open_end:-len("</xf>")]
+    attrs = OrderedDict(re.findall(r'(\w+)="([^"]*)"', tag))
+    attrs["borderId"] = str(border_id)
+    attrs["applyBorder"] = "1"
+    attrs["applyAlignment"] = "1"
+    body = re.sub(r"<alignment\b[^>]*?(?:/>|>.*?</alignment>)", "", body, flags=re.S)
+    return "<xf " + " ".join(f'{k}="{v}"' for k, v in attrs.items()) + ">" + TABLE_ALIGNMENT_XML + body + "</xf>"
+
+def cell_xml(ref, style, value):
+    # 单元格XML；字符串写为内联字符串，不维护共享字符串表
+    start = f'<c r="{ref}"' + (f' s="{style}"' if style is not None else "")
+    if value is None or (isinstance(value, str) and value == ""):
+        return start + "/>"
+    if isinstance(value, (bool, np.bool_)):
+        return f'{start} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (Number, np.number)):
+        return f"{start}><v>{value}</v></c>"
+    text = str(value)
+    if ILLEGAL_CHARACTERS_RE.search(text):
+        raise IllegalCharacterError(f"{text} cannot be used in worksheets.")
+    if text.startswith("=") and len(text) > 1:
+        return f"{start}><f>{escape(text[1:])}</f><v></v></c>"
+    preserve = ' xml:space="preserve"' if text != text.strip() else ""
+    return f'{start} t="inlineStr"><is><t{preserve}>{escape(text)}</t></is></c>'
+
+def restyle_cell(cell, style):
+    if S_ATTR.search(cell[:cell.index(">") + 1]):
+        return S_ATTR.sub(f' s="{style}"', cell, count=1)
+    return re.sub(r"^<c\b", f'<c s="{style}"', cell, count=1)
+
+def sheet_chunks(layout, sheet, anchors, rows, n_cols, merged):
+    # 依次产出sheet的XML片段：表头以上的模板行（写入锚点单元格）、数据行（覆盖模板同一行的单元格）、其余模板行
+    letters = [get_column_letter(col) for col in range(1, n_cols + 1)]
+    table_style = layout.xf_count * 2
+    anchor_cells = {}
+    for coord, value in anchors.items():
+        col, row = coordinate_from_string(coord)
+        anchor_cells.setdefault(row, {})[column_index_from_string(col)] = value
+
+    def emit(r, values=None):
+        if values is None and r not in anchor_cells:
+            return sheet.rows[r]
+        template_cells = sheet.cells(r)
+        cells = {col: cell for col, (cell, _) in template_cells.items()}
+        for col, value in anchor_cells.get(r, {}).items():
+            style = template_cells[col][1] if col in template_cells else None
+            cells[col] = cell_xml(f"{get_column_letter(col)}{r}", style, value)
+        if values is not None:
+            for col, value in enumerate(values, start=1):
+                # 模板中已有的单元格在原样式上加边框居中，新单元格用默认样式加边框居中
+                style = template_cells[col][1] + layout.xf_count if col in template_cells else table_style
+                if (r, col) in merged:
+                    # 合并区域中的单元格不写值，只加边框
+                    cells[col] = restyle_cell(cells[col], style) if col in cells else cell_xml(f"{letters[col - 1]}{r}", style, None)
+                else:
+                    cells[col] = cell_xml(f"{letters[col - 1]}{r}", style, value)
+        return sheet.row_open_tag(r) + "".join(cells[col] for col in sorted(cells)) + "</row>"
+
+    fixed_rows = sorted(set(sheet.rows) | set(anchor_cells))
+    buffer = [emit(r) for r in fixed_rows if r < START_ROW]
+    end_row = START_ROW - 1
+    for r, values in enumerate(rows, start=START_ROW):
+        buffer.append(emit(r, values))
+        end_row = r
+        if len(buffer) >= FLUSH_ROWS:
+            yield "".join(buffer)
+            buffer = []
+    buffer.extend(emit(r) for r in fixed_rows if r > end_row)
+    yield "".join(buffer)
+    yield sheet.tail
+
+def write_sheet(zf, info, layout, name, anchors, df, headers, merged):
+    sheet = layout.sheets[name]
+    zinfo = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    with zf.open(zinfo, "w", force_zip64=True) as f:
+        # dimension按写入范围更新
+        max_row = max(sheet.max_row, START_ROW - 1 + len(df))
+        max_col = max(sheet.max_col, len(headers))
+        head = DIMENSION_PATTERN.sub(f'<dimension ref="A1:{get_column_letter(max_col)}{max_row}"/>', sheet.head, count=1)
+        f.write(head.encode("utf-8"))
+        rows = iter_frame_rows(df, headers)
+        for chunk in sheet_chunks(layout, sheet, anchors, rows, len(headers), merged):
+            f.write(chunk.encode("utf-8"))
+
+_layouts = OrderedDict()
+_lock = threading.Lock()  # 与 excel_template._templates 相同，多线程共用，构建在锁外进行
+
+def get_stream_layout(template):
+    with _lock:
+        layout = _layouts.get(template.key)
+        if layout is not None:
+            _layouts.move_to_end(template.key)
+            return layout
+    layout = StreamLayout(template)
+    with _lock:
+        _layouts[template.key] = layout
+        while len(_layouts) > MAX_TEMPLATES:
+            _layouts.popitem(last=False)
+    return layout
+
+def stream_template_excel(template_file, output, dcl_df, dcl_data, dat_data=None, timings=None):
+    # output 为文件路径或可写的二进制文件对象；参数含义与fill_template_excel相同
+    # timings 传入dict时记录 load_s（模板）/ write_s（生成并压缩sheet）
+    if timings is None:
+        timings = {}
+    t0 = time.perf_counter()
+    template = get_template(template_file)
+    try:
+        layout = get_stream_layout(template)
+    except ValueError as e:
+        logger.warning("模板无法流式写出（%s），改用openpyxl生成", e)
+        excel_bytes = fill_template_excel(template_file, dcl_df, pd.DataFrame(), dcl_data, dat_data, timings)
+        if isinstance(output, (str, os.PathLike)):
+            with open(output, "wb") as f:
+                f.write(excel_bytes.getvalue())
+        else:
+            output.write(excel_bytes.getvalue())
+        return output
+    t1 = time.perf_counter()
+    timings["load_s"] = t1 - t0
+
+    result_anchors = template.anchors["Test Result"]
+    result_values = {coord: dcl_data.get(key, "") for key, coord in result_anchors.items()}
+    result_headers = template.headers["Test Result"]
+
+    parts_values = {}
+    parts_headers = list(template.headers["PartsCoverage"])
+    parts_df = pd.DataFrame()
+    if dat_data and "data" in dat_data:
+        # 确保Description在表头中
+        if "Description" not in parts_headers:
+            parts_headers.append("Description")
+        parts_df = prepare_parts_frame(dat_data["data"])
+    if dat_data:
+        anchors = template.anchors["PartsCoverage"]
+        parts_values[anchors["board_name"]] = dat_data.get("board_name", "")
+        parts_values[anchors["test_time"]] = dat_data.get("test_time", "")
+        coverage = dat_data.get("coverage", None)
+        if coverage is not None:
+            parts_values[anchors["coverage"]] = "{:.2%}".format(coverage)
+
+    with zipfile.ZipFile(BytesIO(template.data)) as zin, zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            if info.filename == layout.sheet_parts["Test Result"]:
+                write_sheet(zout, info, layout, "Test Result", result_values, dcl_df,
+                            result_headers, template.merged["Test Result"])
+            elif info.filename == layout.sheet_parts["PartsCoverage"]:
+                write_sheet(zout, info, layout, "PartsCoverage", parts_values, parts_df,
+                            parts_headers, template.merged["PartsCoverage"])
+            elif info.filename == layout.styles_part:
+                zout.writestr(info, layout.styles_xml.encode("utf-8"))
+            else:
+                zout.writestr(info, zin.read(info))
+    timings["write_s"] = time.perf_counter() - t1
+    return output
@@ -0,0 +1,59 @@
+import pickle
+import threading
+from collections import OrderedDict
+from io import BytesIO
+import openpyxl
+from utils.cache_utils import read_bytes, content_hash
+
+# 报告模板：每个进程内按文件内容哈希只解析一次，之后每份报告拿一份副本
+# 副本用pickle还原，不再解析xlsx中的XML
+
+SHEETS = ("Test Result", "PartsCoverage")
+HEADER_ROW = 10  # 表头在第10行，数据从第11行开始
+START_ROW = 11
+# 需要写入的单元格位置
+ANCHOR_CELLS = {
+    "Test Result": {"board_name": "I4", "passfail": "I7", "test_time": "I8"},
+    "PartsCoverage": {"board_name": "H4", "test_time": "H7", "coverage": "C7"},
+}
+MAX_TEMPLATES = 8
+
+class ReportTemplate:
+    def __init__(self, data):
+        wb = openpyxl.load_workbook(BytesIO(data))
+        self.key = content_hash(data)
+        self.data = data  # 原始xlsx内容，流式写出时直接复用其中的部件
+        self.headers = {}  # sheet -> 表头列表（含空表头）
+        self.merged = {}  # sheet -> 合并区域中非左上角单元格的 (行, 列)，写入时跳过
+        for name in SHEETS:
+            ws = wb[name]
+            headers = [cell.value for cell in ws[HEADER_ROW]]
+            self.headers[name] = headers
+            self.merged[name] = frozenset(
+                cell for rng in ws.merged_cells.ranges for cell in rng.cells
+                if cell != (rng.min_row, rng.min_col)
+            )
+        self.anchors = ANCHOR_CELLS
+        self._pickled = pickle.dumps(wb, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def new_workbook(self):
+        return pickle.loads(self._pickled)
+
+_templates = OrderedDict()
+_lock = threading.Lock()  # Streamlit的多个会话线程共用此缓存；解析模板在锁外进行
+
+def get_template(template_file):
+    # template_file 可以是路径或文件对象（Streamlit上传文件）
+    data = read_bytes(template_file)
+    key = content_hash(data)
+    with _lock:
+        template = _templates.get(key)
+        if template is not None:
+            _templates.move_to_end(key)
+            return template
+    template = ReportTemplate(data)
+    with _lock:
+        _templates[key] = template
+        while len(_templates) > MAX_TEMPLATES:
+            _templates.popitem(last=False)
+    return template
@@ -1,143 +1,136 @@
-import pandas as pd
-import openpyxl
-from openpyxl.cell.cell import MergedCell
+import time
+from copy import copy
 from io import BytesIO
 from openpyxl.styles import Border, Side
 from openpyxl.styles import Alignment
+from utils.excel_template import get_template, START_ROW
+from utils.progress import PROGRESS_EVERY
+from utils.report_utils import gen_remarks
 
-def add_full_border(ws, min_row, max_row, min_col, max_col):
-    thin = Side(border_style="thin", color="000000")
-    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+THIN = Side(border_style="thin", color="000000")
+TABLE_BORDER = Border(left=THIN, right=THIN, top=THIN, bottom=THIN)
+TABLE_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+
+def iter_frame_rows(df, headers, chunk_size=10000):
+    # 按表头顺序转为行元组，空值写为""；分块转换，流式写出时不复制整张表
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size].reindex(columns=headers).astype(object)
+        chunk = chunk.where(chunk.notna(), "")
+        yield from chunk.itertuples(index=False, name=None)
+
+def frame_rows(df, headers):
+    return list(iter_frame_rows(df, headers))
+
+def write_rows(ws, start_row, rows, merged=frozenset(), progress=None):
+    # 逐行批量写入，合并单元格（非左上角）跳过；progress(已写行数) 每隔PROGRESS_EVERY行回调一次
+    for row_idx, values in enumerate(rows, start=start_row):
+        for col_idx, val in enumerate(values, start=1):
+            if (row_idx, col_idx) not in merged:
+                ws.cell(row=row_idx, column=col_idx).value = val
+        if progress is not None and (row_idx - start_row + 1) % PROGRESS_EVERY == 0:
+            progress(row_idx - start_row + 1)
+
+def style_table(ws, min_row, max_row, min_col, max_col):
+    # 加边框并居中：模板中每种原有样式只计算一次新样式，其余单元格直接共用，保留模板原有字体、数字格式等
+    styled = {}
     for row in ws.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
         for cell in row:
-            cell.border = border
-            
-def fill_template_excel(template_file, dcl_df, csv_df, dcl_data, dat_data=None):
-    wb = openpyxl.load_workbook(template_file)
+            key = tuple(cell._style) if cell._style is not None else None  # None为模板范围外的新单元格
+            new_style = styled.get(key)
+            if new_style is None:
+                cell.border = TABLE_BORDER
+                cell.alignment = TABLE_ALIGNMENT
+                styled[key] = copy(cell._style)
+            else:
+                cell._style = copy(new_style)
+
+def prepare_parts_frame(dat_df):
+    # 只保留有Description的行，并重排No.为连续自然数
+    # 只有DCL时（ReportResult.parts为没有列的空表）PartsCoverage没有数据行，只写表头、板名和覆盖率
+    if "Description" not in dat_df.columns:
+        return dat_df.iloc[:0]
+    dat_df = dat_df[dat_df["Description"].notna() & (dat_df["Description"] != "")]
+    dat_df = dat_df.reset_index(drop=True)
+    if "No." in dat_df.columns:
+        dat_df["No."] = range(1, len(dat_df) + 1)
+
+    # Remark由处理流程生成（ReportResult.parts，编辑后由with_edits重新生成），这里不再重复生成；没有Remark列时才补上
+    if "Remark" not in dat_df.columns:
+        dat_df["Remark"] = gen_remarks(dat_df)
+    return dat_df
+
+def fill_template_excel(template_file, dcl_df, csv_df, dcl_data, dat_data=None, timings=None, progress=None):
+    # timings 传入dict时记录各阶段耗时（秒）：load_s / write_s / style_s / save_s
+    # progress(阶段, 已完成, 总数)：阶段为 "write"（按行）/ "style" / "save"，回调中抛出Cancelled可中止
+    if timings is None:
+        timings = {}
+    if progress is None:
+        progress = lambda stage, done, total: None
+    t0 = time.perf_counter()
+    # 模板按内容哈希缓存，表头、合并单元格只在首次解析时读取
+    template = get_template(template_file)
+    wb = template.new_workbook()
     ws_result = wb['Test Result']
     ws_parts = wb['PartsCoverage']
+    t1 = time.perf_counter()
+    timings["load_s"] = t1 - t0
 
     # 写入Test Result（dcl数据）
-    ws_result['I7'] = dcl_data.get("passfail", "")
-    ws_result['I8'] = dcl_data.get("test_time", "")
-    ws_result['I4'] = dcl_data.get("board_name", "")
+    for key, coord in template.anchors["Test Result"].items():
+        ws_result[coord] = dcl_data.get(key, "")
 
-    # 获取Test Result表头（假设表头在第10行，数据从A11开始）
-    header_row = 10
-    start_row = 11
-    headers = [cell.value for cell in ws_result[header_row]]
+    # Test Result表头（第10行，数据从A11开始）
+    start_row = START_ROW
+    headers = template.headers["Test Result"]
 
     # 保证dcl_df列顺序与表头一致，只保留表头列
-    dcl_df_to_write = dcl_df.reindex(columns=headers)
-
-    for i, row in dcl_df_to_write.iterrows():
-        for col_idx, col_name in enumerate(headers, start=1):
-            cell = ws_result.cell(row=start_row + i, column=col_idx)
-            if not isinstance(cell, MergedCell):
-                val = row.get(col_name, "")
-                if isinstance(val, (pd.Series, list)):
-                    val = val.iloc[0] if hasattr(val, "iloc") else val[0]
-                if pd.isna(val):
-                    val = ""
-                cell.value = val
+    dcl_rows = frame_rows(dcl_df, headers)
+    parts_count = len(dat_data["data"]) if dat_data and "data" in dat_data else 0
+    total_rows = len(dcl_rows) + parts_count
+    write_rows(ws_result, start_row, dcl_rows, template.merged["Test Result"],
+               lambda done: progress("write", done, total_rows))
 
     # 写入PartsCoverage（dat_data["data"]，同理按表头名称写入，表头在第10行，数据从A11开始）
+    parts_rows = []
     if dat_data and "data" in dat_data:
         dat_df = dat_data["data"]
-        parts_header_row = 10
-        parts_start_row = 11
-        parts_headers = [cell.value for cell in ws_parts[parts_header_row]]
+        parts_start_row = START_ROW
+        parts_headers = list(template.headers["PartsCoverage"])
 
         # 确保Description在表头中
         if "Description" not in parts_headers:
             parts_headers.append("Description")
-
-                # 只保留有Description的行，并重排No.为连续自然数
-        dat_df = dat_df[dat_df["Description"].notna() & (dat_df["Description"] != "")]
-        dat_df = dat_df.reset_index(drop=True)
-        if "No." in dat_df.columns:
-            dat_df["No."] = range(1, len(dat_df) + 1)
-
-        # 自动生成Remark列
-        def gen_remark(row):
-            if row.get("Testable") == "N":
-                return "No test point"
-            elif row.get("Testable") == "L":
-                comps = str(row.get("Components", ""))
-                if "/" in comps:
-                    return f"it is in parallel with {comps.split('/')[-1].strip()}"
-                elif "," in comps:
-                    return f"it is in parallel with {comps.split(',')[-1].strip()}"
-                else:
-                    return "it is in parallel with"
-            else:
-                return row.get("Remark", "")
-        dat_df["Remark"] = dat_df.apply(gen_remark, axis=1)
+        dat_df = prepare_parts_frame(dat_df)
 
         # 保证dat_df列顺序与表头一致，只保留表头列
-        dat_df_to_write = dat_df.reindex(columns=parts_headers)
-
-        for i, row in dat_df_to_write.iterrows():
-            for col_idx, col_name in enumerate(parts_headers, start=1):
-                cell = ws_parts.cell(row=parts_start_row + i, column=col_idx)
-                if not isinstance(cell, MergedCell):
-                    val = row.get(col_name, "")
-                    if isinstance(val, (pd.Series, list)):
-                        val = val.iloc[0] if hasattr(val, "iloc") else val[0]
-                    if pd.isna(val):
-                        val = ""
-                    cell.value = val
+        parts_rows = frame_rows(dat_df, parts_headers)
+        write_rows(ws_parts, parts_start_row, parts_rows, template.merged["PartsCoverage"],
+                   lambda done: progress("write", len(dcl_rows) + done, total_rows))
 
     # 写入dat_data的board_name和test_time到PartsCoverage的指定单元格
     if dat_data:
-        ws_parts['H4'] = dat_data.get("board_name", "")
-        ws_parts['H7'] = dat_data.get("test_time", "")
-        
+        anchors = template.anchors["PartsCoverage"]
+        ws_parts[anchors["board_name"]] = dat_data.get("board_name", "")
+        ws_parts[anchors["test_time"]] = dat_data.get("test_time", "")
+
         coverage = dat_data.get("coverage", None)
         if coverage is not None:
-            ws_parts['C7'] = "{:.2%}".format(coverage)
-            
-     # 给Test Result sheet加边框
-    if not dcl_df_to_write.empty:
-        min_row = start_row
-        max_row = start_row + len(dcl_df_to_write) - 1
-        min_col = 1
-        max_col = len(headers)
-        add_full_border(ws_result, min_row, max_row, min_col, max_col)
-
-    # 给PartsCoverage sheet加边框
-    if dat_data and "data" in dat_data and not dat_df_to_write.empty:
-        min_row = parts_start_row
-        max_row = parts_start_row + len(dat_df_to_write) - 1
-        min_col = 1
-        max_col = len(parts_headers)
-        add_full_border(ws_parts, min_row, max_row, min_col, max_col)
-    
-    # 给Test Result sheet加边框
-    if not dcl_df_to_write.empty:
-        min_row = start_row
-        max_row = start_row + len(dcl_df_to_write) - 1
-        min_col = 1
-        max_col = len(headers)
-        add_full_border(ws_result, min_row, max_row, min_col, max_col)
-        # 居中显示
-        for row in ws_result.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
-            for cell in row:
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-
-    # 给PartsCoverage sheet加边框
-    if dat_data and "data" in dat_data and not dat_df_to_write.empty:
-        min_row = parts_start_row
-        max_row = parts_start_row + len(dat_df_to_write) - 1
-        min_col = 1
-        max_col = len(parts_headers)
-        add_full_border(ws_parts, min_row, max_row, min_col, max_col)
-        # 居中显示
-        for row in ws_parts.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
-            for cell in row:
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-   
+            ws_parts[anchors["coverage"]] = "{:.2%}".format(coverage)
+    t2 = time.perf_counter()
+    timings["write_s"] = t2 - t1
+    progress("style", 0, 1)
+
+    # 给两个sheet的数据区加边框并居中显示
+    if dcl_rows:
+        style_table(ws_result, start_row, start_row + len(dcl_rows) - 1, 1, len(headers))
+    if parts_rows:
+        style_table(ws_parts, parts_start_row, parts_start_row + len(parts_rows) - 1, 1, len(parts_headers))
+    t3 = time.perf_counter()
+    timings["style_s"] = t3 - t2
+    progress("save", 0, 1)
+
     output = BytesIO()
     wb.save(output)
     output.seek(0)
+    timings["save_s"] = time.perf_counter() - t3
     return output
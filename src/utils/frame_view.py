@@ -0,0 +1,65 @@
+# DataFrame的只读表格视图（桌面版结果表格的数据源）
+# 直接引用各列数组，只在单元格显示时格式化；排序、筛选只维护一个行号数组，不复制数据
+# 打开大表的耗时与内存与行数基本无关，只有排序/筛选时扫描一次对应的列
+# pandas / numpy 在排序、筛选时才导入：桌面版启动时创建空表格不加载它们
+
+class FrameView:
+    def __init__(self, df=None):
+        self.columns, self.arrays, self.length = [], [], 0
+        if df is not None:
+            self.columns = [str(col) for col in df.columns]
+            self.arrays = [df.iloc[:, j].array for j in range(df.shape[1])]
+            self.length = len(df)
+        self.order = None  # 排序后的行号，None为原顺序
+        self.mask = None  # 筛选结果，None为不筛选
+        self.rows = None  # 当前显示的行号，None为 0..length-1
+
+    def row_count(self):
+        return self.length if self.rows is None else len(self.rows)
+
+    def column_count(self):
+        return len(self.columns)
+
+    def source_row(self, row):
+        return row if self.rows is None else int(self.rows[row])
+
+    def cell(self, row, column):
+        # 与原 QTableWidgetItem(str(value)) 显示一致
+        return str(self.arrays[column][self.source_row(row)])
+
+    def sort(self, column, descending=False):
+        # column < 0 恢复原顺序；稳定排序，空值排在最后
+        if column < 0 or column >= len(self.arrays):
+            self.order = None
+        else:
+            import pandas as pd
+            series = pd.Series(self.arrays[column], copy=False)
+            try:
+                ordered = series.sort_values(ascending=not descending, kind="stable", na_position="last")
+            except TypeError:
+                # 同一列混有数字和文本时按显示的文本排序
+                ordered = series.astype(str).sort_values(ascending=not descending, kind="stable")
+            self.order = ordered.index.to_numpy()
+        self.update_rows()
+
+    def filter(self, text):
+        # 任一列的显示文本包含 text（不区分大小写）的行；空文本取消筛选
+        text = (text or "").strip()
+        if not text:
+            self.mask = None
+        else:
+            import numpy as np
+            import pandas as pd
+            mask = np.zeros(self.length, dtype=bool)
+            for array in self.arrays:
+                mask |= pd.Series(array, copy=False).astype(str).str.contains(text, case=False, regex=False).to_numpy(dtype=bool)
+            self.mask = mask
+        self.update_rows()
+
+    def update_rows(self):
+        if self.mask is None:
+            self.rows = self.order
+        elif self.order is None:
+            self.rows = self.mask.nonzero()[0]
+        else:
+            self.rows = self.order[self.mask[self.order]]
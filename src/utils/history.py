@@ -0,0 +1,208 @@
+import os
+import sqlite3
+import time
+from contextlib import closing
+import pandas as pd
+from utils.cache_utils import read_bytes, content_hash
+from utils.report_utils import calc_coverage
+
+# 历史结果库（SQLite）：每次生成报告追加一条运行记录（DCL表头、覆盖率）和各测试项按元件汇总的结果
+# 按板名、测试时间、元件建索引，统计良率、失败率趋势时不必重新解析原始DAT/DCL
+# 路径默认 ~/.report_gen/history.sqlite，可用环境变量 REPORT_GEN_HISTORY_DB 指定，设为 off 不记录
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_key TEXT UNIQUE,
+    board TEXT NOT NULL,
+    panel TEXT NOT NULL DEFAULT '',
+    test_time TEXT NOT NULL,
+    passfail TEXT,
+    result TEXT,
+    panel_result TEXT,
+    detail_result TEXT,
+    steps INTEGER,
+    failed_steps INTEGER,
+    coverage REAL,
+    parts_coverage REAL,
+    testable_y INTEGER,
+    testable_n INTEGER,
+    testable_l INTEGER,
+    recorded_at REAL
+);
+CREATE INDEX IF NOT EXISTS runs_board_time ON runs (board, test_time);
+CREATE INDEX IF NOT EXISTS runs_time ON runs (test_time);
+CREATE TABLE IF NOT EXISTS names (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    part TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS names_part ON names (part);
+CREATE TABLE IF NOT EXISTS results (
+    name_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    tests INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    PRIMARY KEY (name_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id);
+CREATE INDEX IF NOT EXISTS results_failed ON results (run_id, name_id, failures) WHERE failures > 0;
+"""
+QUERY_CHUNK = 500  # IN (...) 每次查询的参数个数
+
+_initialized = set()  # 本进程中已建表的库
+
+def history_path():
+    path = os.environ.get("REPORT_GEN_HISTORY_DB")
+    if path and path.lower() == "off":
+        return None
+    return path or os.path.join(os.path.expanduser("~"), ".report_gen", "history.sqlite")
+
+def connect(path=None):
+    path = path or history_path()
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 批处理、报告服务的多个进程同时写入：WAL模式，写锁等待
+    conn = sqlite3.connect(path, timeout=30)
+    if path not in _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        _initialized.add(path)
+    return conn
+
+def part_of(name):
+    # 元件主编号（C121-PX -> C121，T100_1_2 -> T100），与查BOM Description时的取法一致
+    return name.strip().upper().split('_')[0].split('-')[0]
+
+def name_ids(conn, names):
+    conn.executemany("INSERT OR IGNORE INTO names (name, part) VALUES (?, ?)", [(name, part_of(name)) for name in names])
+    ids = {}
+    for start in range(0, len(names), QUERY_CHUNK):
+        chunk = names[start:start + QUERY_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        ids.update(conn.execute(f"SELECT name, id FROM names WHERE name IN ({placeholders})", chunk).fetchall())
+    return ids
+
+def record_run(header_data, component_df, dat_data=None, parts=None, run_key=None, board=None, path=None):
+    # 写入一次运行，返回运行id；run_key相同的运行（同一DCL再次导出）只记录一次；未启用时返回None
+    # parts为报告中的唯一主编号表，用于记录报告中的覆盖率
+    path = path or history_path()
+    if path is None:
+        return None
+    if component_df is not None and not component_df.empty:
+        names = component_df["Component Name"].astype(str)
+        failed = component_df["Result"].astype(str) == "FAIL"
+        summary = pd.DataFrame({"name": names, "failed": failed}).groupby("name", sort=False)["failed"].agg(["size", "sum"])
+    else:
+        summary = pd.DataFrame({"size": [], "sum": []})
+    y_count = n_count = l_count = None
+    coverage = parts_coverage = None
+    if dat_data is not None:
+        y_count, n_count, l_count, coverage = calc_coverage(dat_data["data"])
+    if parts is not None and not parts.empty and "Testable" in parts.columns:
+        parts_coverage = calc_coverage(parts)[3]
+    test_time = header_data.get("test_time") or time.strftime("%Y-%m-%d %H:%M:%S")
+    row = (
+        run_key, board or header_data.get("board_name", ""), header_data.get("panel", ""), test_time,
+        header_data.get("passfail", ""), header_data.get("result", ""),
+        header_data.get("panel_result", ""), header_data.get("detail_result", ""),
+        int(summary["size"].sum()), int(summary["sum"].sum()), coverage, parts_coverage,
+        None if y_count is None else int(y_count), None if n_count is None else int(n_count),
+        None if l_count is None else int(l_count), time.time(),
+    )
+    with closing(connect(path)) as conn, conn:
+        if run_key is not None:
+            existing = conn.execute("SELECT id FROM runs WHERE run_key = ?", (run_key,)).fetchone()
+            if existing:
+                return existing[0]
+        run_id = conn.execute(
+            "INSERT INTO runs (run_key, board, panel, test_time, passfail, result, panel_result, detail_result, "
+            "steps, failed_steps, coverage, parts_coverage, testable_y, testable_n, testable_l, recorded_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row,
+        ).lastrowid
+        ids = name_ids(conn, summary.index.tolist())
+        conn.executemany(
+            "INSERT INTO results (name_id, run_id, tests, failures) VALUES (?, ?, ?, ?)",
+            [(ids[name], run_id, int(size), int(fails)) for name, size, fails in summary.itertuples(name=None)],
+        )
+    return run_id
+
+def record_report(dcl_file, header_data, component_df, dat_data=None, parts=None, panel=""):
+    # 各前端生成报告后调用，同一DCL（拼板为同一子板）只记录一次；返回错误信息（成功或未启用时为""），写入失败不影响报告
+    try:
+        record_run(header_data, component_df, dat_data, parts, run_key=content_hash("run", read_bytes(dcl_file), panel))
+    except (sqlite3.Error, OSError) as e:
+        return f"写入历史结果库失败：{e}"
+    return ""
+
+def run_filter(board=None, since=None, until=None):
+    # 运行的筛选条件：板名、测试时间范围（"2025-07-01"、"2025-07-19 12:00:00" 等，until不含）
+    where, params = [], []
+    if board:
+        where.append("board = ?")
+        params.append(board)
+    if since:
+        where.append("test_time >= ?")
+        params.append(since)
+    if until:
+        where.append("test_time < ?")
+        params.append(until)
+    return (" WHERE " + " AND ".join(where) if where else ""), params
+
+def recent_runs_sql(board=None, since=None, until=None, last=None):
+    # 筛选运行的子查询，last为按测试时间倒序取最近的运行数
+    where, params = run_filter(board, since, until)
+    sql = "SELECT id FROM runs" + where
+    if last:
+        sql += " ORDER BY test_time DESC, id DESC LIMIT ?"
+        params.append(int(last))
+    return sql, params
+
+def failure_rate(component, board=None, since=None, until=None, last=None, path=None):
+    # 元件（主编号，如C121；或完整测试名，如C121-PX）的失败率：
+    # {"runs": 测过该元件的运行数, "failed_runs": 其中失败的运行数, "tests": 测试项数, "failures": 失败项数, "rate": failed_runs / runs}
+    runs_sql, params = recent_runs_sql(board, since, until, last)
+    key = component.strip().upper()
+    column = "part" if key == part_of(key) else "name"
+    with closing(connect(path)) as conn:
+        runs, failed_runs, tests, failures = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(failed), 0), COALESCE(SUM(tests), 0), COALESCE(SUM(failures), 0) FROM ("
+            f"  SELECT SUM(r.tests) AS tests, SUM(r.failures) AS failures, MAX(r.failures > 0) AS failed"
+            f"  FROM names n CROSS JOIN results r ON r.name_id = n.id"
+            f"  WHERE n.{column} = ? AND r.run_id IN ({runs_sql}) GROUP BY r.run_id)",
+            [key if column == "part" else component.strip()] + params,
+        ).fetchone()
+    return {"runs": runs, "failed_runs": failed_runs, "tests": tests, "failures": failures,
+            "rate": failed_runs / runs if runs else 0.0}
+
+def yield_trend(board=None, since=None, until=None, period="day", path=None):
+    # 按天/月统计运行数、PASS数、良率和平均覆盖率
+    length = {"day": 10, "month": 7}[period]
+    where, params = run_filter(board, since, until)
+    with closing(connect(path)) as conn:
+        df = pd.read_sql_query(
+            f"SELECT substr(test_time, 1, {length}) AS period, COUNT(*) AS runs, SUM(passfail = 'PASS') AS passed, "
+            f"AVG(coverage) AS coverage FROM runs{where} GROUP BY period ORDER BY period",
+            conn, params=params,
+        )
+    df["yield"] = df["passed"] / df["runs"]
+    return df
+
+def top_failures(board=None, since=None, until=None, last=None, limit=20, path=None):
+    # 失败次数最多的元件（按主编号）：先只在失败的结果（部分索引 results_failed）中排名，再统计这些元件的测试运行数
+    runs_sql, params = recent_runs_sql(board, since, until, last)
+    with closing(connect(path)) as conn:
+        df = pd.read_sql_query(
+            f"SELECT n.part AS part, COUNT(DISTINCT r.run_id) AS failed_runs, SUM(r.failures) AS failures "
+            f"FROM results r JOIN names n ON n.id = r.name_id WHERE r.failures > 0 AND r.run_id IN ({runs_sql}) "
+            f"GROUP BY n.part ORDER BY failures DESC, part LIMIT ?",
+            conn, params=params + [int(limit)],
+        )
+        df.insert(1, "runs", [
+            conn.execute(
+                f"SELECT COUNT(DISTINCT r.run_id) FROM names n CROSS JOIN results r ON r.name_id = n.id "
+                f"WHERE n.part = ? AND r.run_id IN ({runs_sql})", [part] + params,
+            ).fetchone()[0]
+            for part in df["part"]
+        ])
+    return df
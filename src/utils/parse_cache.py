@@ -0,0 +1,134 @@
+import copy
+import io
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from handlers import csv_handler, dat_handler, dcl_handler
+from handlers.csv_handler import CsvHandler
+from handlers.dat_handler import DatHandler
+from handlers.dcl_handler import DclHandler
+from handlers.testable_rules import get_default_rules
+from utils.cache_utils import get_cache_dir, read_bytes, content_hash
+from utils.progress import ProgressReader
+
+# DAT/DCL/BOM解析结果缓存：键为 文件类型 + 解析器版本 + 文件内容哈希
+# 内存中按LRU保留最近的结果，磁盘上按总大小淘汰最久未用的；Streamlit重跑、重复导出时直接取缓存
+# 每次返回一份副本，调用方修改结果不影响缓存
+# Streamlit在同一进程的多个线程中处理各会话：内存LRU的读写加锁，解析和复制在锁外进行
+
+MAX_MEMORY_ENTRIES = 8
+DEFAULT_DISK_LIMIT_MB = 512  # 可用环境变量 REPORT_GEN_PARSE_CACHE_MB 修改，0为不写磁盘
+
+_results = OrderedDict()
+_lock = threading.Lock()
+
+def disk_limit():
+    return int(os.environ.get("REPORT_GEN_PARSE_CACHE_MB", DEFAULT_DISK_LIMIT_MB)) * 1024 * 1024
+
+def _remember(key, result):
+    with _lock:
+        _results[key] = result
+        _results.move_to_end(key)
+        while len(_results) > MAX_MEMORY_ENTRIES:
+            _results.popitem(last=False)
+
+def _load(path):
+    try:
+        with open(path, "rb") as f:
+            result = pickle.load(f)
+        os.utime(path)  # 记录最近使用时间，淘汰时按此排序
+        return result
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError):
+        # 文件不存在、被其它进程淘汰或由不兼容的pandas版本写出：重新解析
+        return None
+
+def _save(path, result):
+    # 临时文件名含进程号和线程号，同一键被多个线程同时写入时互不覆盖
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def evict(cache_dir, limit):
+    # 总大小超过上限时从最久未用的开始删除
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".pkl"):
+            continue
+        try:
+            stat = os.stat(os.path.join(cache_dir, name))
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, name))
+            total -= size
+        except OSError:
+            pass
+
+def cached_parse(kind, version, data, parse, *key_parts):
+    key = content_hash(kind, version, *key_parts, data)
+    with _lock:
+        result = _results.get(key)
+        if result is not None:
+            _results.move_to_end(key)
+    if result is not None:
+        return copy.deepcopy(result)
+
+    limit = disk_limit()
+    path = None
+    if limit > 0:
+        try:
+            cache_dir = get_cache_dir("parse")
+            path = os.path.join(cache_dir, f"{key}.pkl")
+        except OSError:
+            path = None
+    if path is not None and os.path.exists(path):
+        result = _load(path)
+    if result is None:
+        result = parse()
+        if path is not None:
+            _save(path, result)
+            evict(cache_dir, limit)
+    _remember(key, result)
+    return copy.deepcopy(result)
+
+def source(data, progress):
+    # progress(已解析字节数, 总字节数)：解析时按读取的字节回调，命中缓存时不回调
+    if progress is None:
+        return io.BytesIO(data)
+    return ProgressReader(io.BytesIO(data), len(data), progress)
+
+def parse_dat(file, with_measurements=False, rules=None, progress=None):
+    # 与 DatHandler(file, ...).process_dat() 相同；Testable规则内容也计入缓存键
+    data = read_bytes(file)
+    rules = rules or get_default_rules()
+    return cached_parse(
+        "dat", dat_handler.PARSER_VERSION, data,
+        lambda: DatHandler(source(data, progress), with_measurements=with_measurements, rules=rules).process_dat(),
+        with_measurements, rules.cache_key(),
+    )
+
+def parse_dcl(file, progress=None):
+    # 与 DclHandler(file).process_dcl() 相同，返回 (header_data, component_df)
+    data = read_bytes(file)
+    return cached_parse("dcl", dcl_handler.PARSER_VERSION, data, lambda: DclHandler(source(data, progress)).process_dcl())
+
+def parse_dcl_panels(file):
+    # 与 DclHandler(file).process_panels() 相同，返回 {子板编号: (header_data, component_df)}
+    data = read_bytes(file)
+    return cached_parse("dcl_panels", dcl_handler.PARSER_VERSION, data, lambda: DclHandler(io.BytesIO(data)).process_panels())
+
+def parse_csv(file, progress=None):
+    # 与 CsvHandler().process_csv(file) 相同
+    data = read_bytes(file)
+    return cached_parse("csv", csv_handler.PARSER_VERSION, data, lambda: CsvHandler().process_csv(source(data, progress)))
@@ -0,0 +1,145 @@
+import time
+from dataclasses import dataclass, replace
+import pandas as pd
+from handlers import designator
+from utils.bom_index import bom_index_for_file
+from utils.parse_cache import parse_dat, parse_dcl, parse_dcl_panels
+from utils.profiling import Profiler
+from utils.report_utils import merge_description, dedup_main_comp, calc_coverage, gen_remarks
+
+# 报告处理流程：解析DCL/DAT/BOM -> 合并Description（同时生成Remark）-> 去重 -> 统计覆盖率，只运行一次
+# 结果为不可变的ReportResult，批处理、报告服务、网页版和桌面版都由它显示和导出，不再各自拼装处理步骤
+# 界面中编辑表格后用 ReportResult.with_edits() 得到新结果，只重新生成Remark和统计覆盖率
+# 生成Excel（openpyxl）和历史结果库在首次导出/写入时导入，只解析和预览时不加载
+
+BOM_PARSE_ERROR = "CSV文件解析失败，请将当前CSV文件另存为CSV UTF8格式。"
+BOM_COLUMNS_ERROR = "CSV文件缺少 Reference 或 Description 列，或内容为空。"
+
+@dataclass(frozen=True)
+class ReportResult:
+    # 其中的DataFrame不做拷贝，调用方不要原地修改
+    header_data: dict
+    component_df: pd.DataFrame    # Test Result
+    dat_data: dict                # DAT解析结果（data、nc_data、board_name、test_time），没有DAT时为None
+    parts: pd.DataFrame           # PartsCoverage：有Description的唯一主编号，No.连续，含Remark
+    duplicates: pd.DataFrame      # 去重时去掉的行
+    no_description: pd.DataFrame  # Description为空的行
+    counts: tuple                 # PartsCoverage中Testable为 (Y, N, L) 的行数
+    coverage: float               # (Y+L)/(Y+L+N)
+
+    @property
+    def has_dat(self):
+        return self.dat_data is not None and not self.dat_data["data"].empty
+
+    @property
+    def nc_data(self):
+        return self.dat_data["nc_data"] if self.dat_data else pd.DataFrame()
+
+    def report_data(self):
+        # fill_template_excel / stream_template_excel 的 dat_data 参数
+        return {
+            "data": self.parts,
+            "nc_data": self.nc_data,
+            "board_name": self.dat_data.get("board_name", "") if self.dat_data else "",
+            "test_time": self.dat_data.get("test_time", "") if self.dat_data else "",
+            "coverage": self.coverage,
+        }
+
+    def with_edits(self, component_df=None, parts=None):
+        # 编辑后的Test Result / PartsCoverage：PartsCoverage按编辑后的Testable重新生成Remark、统计覆盖率
+        changes = {}
+        if component_df is not None:
+            changes["component_df"] = component_df
+        if parts is not None:
+            parts = parts.copy()
+            if not parts.empty:
+                parts["Remark"] = gen_remarks(parts)
+            y_count, n_count, l_count, coverage = calc_coverage(parts) if "Testable" in parts.columns else (0, 0, 0, 0)
+            changes.update(parts=parts, counts=(y_count, n_count, l_count), coverage=coverage)
+        return replace(self, **changes)
+
+class ReportPipeline:
+    # profiler：记录各阶段的耗时、内存和行数（utils/profiling.py）
+    # progress(阶段, 已完成, 总数)：解析dcl/dat/bom时按字节回调，合并Description（description）、去重（dedup）开始时
+    # 回调一次（总数为行数），生成Excel时按 fill_template_excel 的 write/style/save 回调；回调中抛出Cancelled可中止
+    # timings：parse_s / merge_s / excel_s / excel_*_s / history_s（秒）
+    def __init__(self, profiler=None, progress=None):
+        self.profiler = profiler or Profiler(enabled=False)
+        self.progress = progress or (lambda stage, done, total: None)
+        self.timings = {}
+
+    def parse_progress(self, stage):
+        self.progress(stage, 0, 0)
+        return lambda done, total: self.progress(stage, done, total)
+
+    def run(self, dcl, dat=None, bom=None, panel=None, require_bom=False):
+        # dcl/dat/bom 为文件路径或上传的文件对象，解析结果和BOM位号索引按文件内容缓存；panel为拼板的子板编号
+        # BOM无法解析时抛出ValueError；require_bom为True时没有BOM或BOM中没有位号也抛出ValueError（桌面版）
+        t0 = time.perf_counter()
+        designator.trim()
+        with self.profiler.stage("dcl") as record:
+            if panel is None:
+                header_data, component_df = parse_dcl(dcl, self.parse_progress("dcl"))
+            else:
+                header_data, component_df = parse_dcl_panels(dcl)[panel]
+            record["rows"] = len(component_df)
+        with self.profiler.stage("dat") as record:
+            dat_data = parse_dat(dat, progress=self.parse_progress("dat")) if dat else None
+            record["rows"] = len(dat_data["data"]) if dat_data else 0
+        with self.profiler.stage("bom") as record:
+            ref_to_desc = bom_index_for_file(bom, self.parse_progress("bom")) if bom else None
+            if bom and ref_to_desc is None:
+                raise ValueError(BOM_PARSE_ERROR)
+            if require_bom and (ref_to_desc is None or ref_to_desc.size() == 0):
+                raise ValueError(BOM_COLUMNS_ERROR)
+            record["rows"] = ref_to_desc.size() if ref_to_desc is not None else 0
+        t1 = time.perf_counter()
+        self.timings["parse_s"] = t1 - t0
+
+        parts = duplicates = no_description = pd.DataFrame()
+        counts, coverage = (0, 0, 0), 0
+        if dat_data is not None and not dat_data["data"].empty:
+            dat_df = dat_data["data"]
+            with self.profiler.stage("description", len(dat_df)):
+                self.progress("description", 0, len(dat_df))
+                df_with_desc, no_description = merge_description(dat_df, ref_to_desc if ref_to_desc is not None else {})
+            # 去重：同主编号只保留一行，No.重排为连续序号
+            with self.profiler.stage("dedup", len(df_with_desc)):
+                self.progress("dedup", 0, len(df_with_desc))
+                parts, duplicates = dedup_main_comp(df_with_desc)
+                if "No." in parts.columns:
+                    parts["No."] = range(1, len(parts) + 1)
+                y_count, n_count, l_count, coverage = calc_coverage(parts)
+                counts = (y_count, n_count, l_count)
+        self.timings["merge_s"] = time.perf_counter() - t1
+        return ReportResult(header_data, component_df, dat_data, parts, duplicates, no_description, counts, coverage)
+
+    def export(self, result, template_file, output=None):
+        # 生成Excel：给出output（路径或可写的文件对象）时流式写出，否则用openpyxl生成，返回BytesIO
+        from utils.excel_stream import stream_template_excel
+        from utils.excel_utils import fill_template_excel
+        t0 = time.perf_counter()
+        excel_timings = {}
+        with self.profiler.stage("excel", len(result.component_df) + len(result.parts)):
+            if output is not None:
+                excel_bytes = stream_template_excel(
+                    template_file, output, result.component_df, result.header_data, result.report_data(), excel_timings,
+                )
+            else:
+                # 模板写入不使用BOM内容
+                excel_bytes = fill_template_excel(
+                    template_file, result.component_df, pd.DataFrame(), result.header_data, result.report_data(),
+                    excel_timings, self.progress,
+                )
+        self.timings["excel_s"] = time.perf_counter() - t0
+        self.timings.update({f"excel_{k}": v for k, v in excel_timings.items()})
+        return excel_bytes
+
+    def record_history(self, result, dcl, panel=""):
+        # 写入历史结果库，返回错误信息（成功或未启用时为""），写入失败不影响报告
+        from utils.history import record_report
+        t0 = time.perf_counter()
+        with self.profiler.stage("history", len(result.component_df)):
+            error = record_report(dcl, result.header_data, result.component_df, result.dat_data, result.parts, panel)
+        self.timings["history_s"] = time.perf_counter() - t0
+        return error
@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows没有resource模块，不记录峰值RSS
+    resource = None
+
+# 处理流程各阶段（解析DCL/DAT/BOM、合并Description、去重、生成Excel、写历史库）的耗时、内存和行数记录
+# 设置环境变量 REPORT_GEN_PROFILE=<输出文件> 启用（批处理、报告服务也可用 --profile 参数）：
+#   以 .prom 结尾时输出Prometheus文本格式（按阶段累计，每次写入时整体重写），否则每个阶段追加一行JSON
+# REPORT_GEN_PROFILE_TRACEMALLOC=1 时另外用tracemalloc统计各阶段Python内存分配的峰值（处理会明显变慢）
+# 未启用时各阶段只多一次判断，不计时也不统计内存
+
+PROFILE_ENV = "REPORT_GEN_PROFILE"
+TRACEMALLOC_ENV = "REPORT_GEN_PROFILE_TRACEMALLOC"
+
+# Prometheus输出：(指标名, 类型, 记录中的字段, 累计方式, 说明)
+PROM_METRICS = [
+    ("report_gen_stage_runs_total", "counter", None, "count", "Number of times the stage ran"),
+    ("report_gen_stage_failures_total", "counter", "failed", "sum", "Number of times the stage raised"),
+    ("report_gen_stage_seconds_total", "counter", "wall_s", "sum", "Total wall time spent in the stage"),
+    ("report_gen_stage_seconds_max", "gauge", "wall_s", "max", "Slowest single run of the stage"),
+    ("report_gen_stage_rows_total", "counter", "rows", "sum", "Total rows handled by the stage"),
+    ("report_gen_stage_peak_rss_bytes", "gauge", "peak_rss_bytes", "max", "Process peak RSS after the stage"),
+    ("report_gen_stage_tracemalloc_peak_bytes", "gauge", "py_peak_bytes", "max", "Peak Python allocations during the stage"),
+]
+
+_totals = {}  # Prometheus输出：{阶段: {指标名: 累计值}}
+_lock = threading.Lock()
+
+def profile_path():
+    return os.environ.get(PROFILE_ENV) or None
+
+def enable(path, trace_memory=False):
+    # 命令行参数启用：写入环境变量，之后创建的工作进程同样记录
+    os.environ[PROFILE_ENV] = path
+    if trace_memory:
+        os.environ[TRACEMALLOC_ENV] = "1"
+
+def rss_bytes():
+    # 当前常驻内存，只在Linux上可取
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class Profiler:
+    # 一次报告生成的各阶段记录，run为板名等标识
+    def __init__(self, run="", path=None, enabled=True):
+        self.run = run
+        self.path = (path or profile_path()) if enabled else None
+        self.enabled = self.path is not None
+        self.trace_memory = self.enabled and os.environ.get(TRACEMALLOC_ENV, "") not in ("", "0")
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        # with profiler.stage("dcl") as record: ...; record["rows"] = len(df)
+        record = {"run": self.run, "stage": name, "rows": rows}
+        if not self.enabled:
+            yield record
+            return
+        started_tracing = False
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+            base = tracemalloc.get_traced_memory()[0]
+        record["failed"] = False
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record["failed"] = True
+            raise
+        finally:
+            record["wall_s"] = round(time.perf_counter() - start, 6)
+            if self.trace_memory:
+                record["py_peak_bytes"] = tracemalloc.get_traced_memory()[1] - base
+                if started_tracing:
+                    tracemalloc.stop()
+            record["rss_bytes"] = rss_bytes()
+            record["peak_rss_bytes"] = peak_rss_bytes()
+            record["pid"] = os.getpid()
+            record["ts"] = round(time.time(), 3)
+            self.records.append(record)
+
+    def flush(self):
+        # 单进程前端（网页版、桌面版）每次处理后写出；批处理、报告服务由主进程汇总工作进程返回的records后写出
+        if self.enabled and self.records:
+            write_records(self.records, self.path)
+        self.records = []
+
+def write_records(records, path):
+    with _lock:
+        if path.endswith(".prom"):
+            for record in records:
+                totals = _totals.setdefault(record["stage"], dict.fromkeys((m[0] for m in PROM_METRICS), 0))
+                for metric, _, field, how, _ in PROM_METRICS:
+                    value = 1 if how == "count" else record.get(field) or 0
+                    totals[metric] = max(totals[metric], value) if how == "max" else totals[metric] + value
+            write_prometheus(path)
+        else:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+
+def write_prometheus(path):
+    # 供node_exporter textfile collector等读取，先写临时文件再改名
+    lines = []
+    for metric, kind, _, _, help_text in PROM_METRICS:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for stage, totals in _totals.items():
+            lines.append(f'{metric}{{stage="{stage}"}} {totals[metric]:.12g}')
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+def stage_summary(records):
+    # 按阶段汇总：[(阶段, 次数, 总耗时, 最大耗时, 总行数)]，总耗时从大到小
+    summary = {}
+    for record in records:
+        entry = summary.setdefault(record["stage"], [record["stage"], 0, 0.0, 0.0, 0])
+        entry[1] += 1
+        entry[2] += record.get("wall_s", 0.0)
+        entry[3] = max(entry[3], record.get("wall_s", 0.0))
+        entry[4] += record.get("rows") or 0
+    return sorted((tuple(entry) for entry in summary.values()), key=lambda entry: -entry[2])
@@ -0,0 +1,23 @@
+# 长时间处理的进度回调与取消：回调由界面提供，取消时在回调中抛出Cancelled，处理在下一个检查点中止
+
+PROGRESS_EVERY = 1000  # 逐行写入时每隔多少行回调一次
+
+class Cancelled(Exception):
+    pass
+
+class ProgressReader:
+    # 包装文件对象，每次read后回调 (已读字节数, 总字节数)
+    def __init__(self, file, total, callback):
+        self.file = file
+        self.total = total
+        self.callback = callback
+        self.done = 0
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self.done += len(data)
+        self.callback(self.done, self.total)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
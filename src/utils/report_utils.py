@@ -0,0 +1,108 @@
+from itertools import chain
+import numpy as np
+import pandas as pd
+from handlers.designator import parse_column
+from utils.bom_index import BomIndex
+
+# 报告处理流程（utils/pipeline.py）中的数据合并、Remark、去重和覆盖率统计
+# Components的编号、变体、并联元件等都取自 handlers/designator.py 驻留表中的解析结果，各阶段不再各自拆分字符串
+
+def resolve_descriptions(components, ref_to_desc):
+    # 整列查Description：每行取第一个能在BOM中找到的编号
+    # 各编号取自去重后Components的解析结果，查BOM是一次批量查询，再按编码展开到每一行
+    components = pd.Series(components, dtype=object)
+    codes, designators = parse_column(components)
+    result = np.full(len(designators), "", dtype=object)  # 末位对应空值（编码-1），没有编号
+    ref_lists = [designator.refs for designator in designators]
+    owners = np.repeat(np.arange(len(ref_lists)), [len(refs) for refs in ref_lists])
+    if len(owners):
+        part_codes, part_uniques = pd.factorize(pd.Index(list(chain.from_iterable(ref_lists)), dtype=object), sort=False)
+        keys = part_uniques.tolist()
+        if isinstance(ref_to_desc, BomIndex):
+            desc_ids = ref_to_desc.lookup_many(keys)
+            found = desc_ids >= 0
+            values = np.array(ref_to_desc.descriptions + [""], dtype=object)[desc_ids]
+        else:
+            found = np.array([key in ref_to_desc for key in keys], dtype=bool)
+            values = np.array([ref_to_desc.get(key, "") for key in keys], dtype=object)
+        # 编号按原顺序排列，每个Components取第一个命中
+        hit = np.flatnonzero(found[part_codes])
+        matched, first = np.unique(owners[hit], return_index=True)
+        result[matched] = values[part_codes[hit[first]]]
+    return pd.Series(list(result[codes]), index=components.index)
+
+def parallel_remark(designator):
+    if designator.partner is None:
+        return "it is in parallel with"
+    return f"it is in parallel with {designator.partner}"
+
+def gen_remarks(df):
+    # Remark列：Testable为N时"No test point"，为L时注明并联的元件，其余保留原Remark（没有Remark列时为空）
+    # 整列处理，L行的并联元件取自解析结果，每个不同的Components只生成一次
+    remarks = (df["Remark"] if "Remark" in df.columns else pd.Series("", index=df.index)).to_numpy(dtype=object, copy=True)
+    if "Testable" in df.columns:
+        testable = df["Testable"].to_numpy(dtype=object)
+        remarks[testable == "N"] = "No test point"
+        l_rows = np.flatnonzero(testable == "L")
+        comps = df["Components"].to_numpy(dtype=object)[l_rows] if "Components" in df.columns else [""] * len(l_rows)
+        codes, designators = parse_column(comps)
+        texts = np.array([parallel_remark(designator) for designator in designators], dtype=object)
+        remarks[l_rows] = texts[codes]
+    return pd.Series(remarks, index=df.index)
+
+def merge_description(dat_df, ref_to_desc):
+    # 添加Description列（支持区间和多编号Reference），并分离Description为空和非空的行
+    dat_df["Description"] = resolve_descriptions(dat_df["Components"], ref_to_desc)
+    df_with_desc = dat_df[dat_df["Description"].notna() & (dat_df["Description"] != "")].copy()
+    df_no_desc = dat_df[dat_df["Description"].isna() | (dat_df["Description"] == "")].copy()
+    # 生成Remark列
+    df_with_desc["Remark"] = gen_remarks(df_with_desc)
+    return df_with_desc, df_no_desc
+
+def dedup_main_comp(df_with_desc):
+    # 去重逻辑：同主编号优先保留Testable非空的，其次带/NP的，其次带/的，其次带-的，其次带_的，最后字符串长度最短的
+    # 各项合成一个整数优先级（越小越优先），每组取最小值，不对整表排序；优先级相同时取靠前的行
+    if df_with_desc.empty:
+        return df_with_desc, pd.DataFrame()
+    n = len(df_with_desc)
+    # 主编号、/NP、/、-、_ 和长度取自去重后Components的解析结果
+    comp_codes, designators = parse_column(df_with_desc["Components"])
+    designators[-1] = designators[-1]._replace(length=3)  # 末位对应空值（编码-1），长度与str(nan)一致
+    main_codes, main_uniques = pd.factorize(pd.Index([d.main for d in designators], dtype=object), sort=False)
+    len_rank = pd.factorize(np.array([d.length for d in designators], dtype=np.int64), sort=True)[0]
+    bits = np.array(
+        [(not d.has_np) * 8 + (not d.has_slash) * 4 + (not d.has_dash) * 2 + (not d.has_underscore) for d in designators],
+        dtype=np.int64,
+    )
+    comp_priority = bits * len(designators) + len_rank
+    testable_codes, testable_uniques = pd.factorize(df_with_desc["Testable"], sort=False)
+    testable_missing = np.array(
+        [not (pd.notna(x) and str(x).strip() != "") for x in testable_uniques.tolist()] + [True], dtype=np.int64
+    )[testable_codes]
+    priority = testable_missing * (16 * len(designators)) + comp_priority[comp_codes]
+    # 复合键 = 优先级 * 行数 + 行位置，每个主编号取最小值即为保留的行
+    composite = priority * n + np.arange(n, dtype=np.int64)
+    groups = main_codes[comp_codes]
+    best = np.full(len(main_uniques), np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(best, groups, composite)
+    # 结果按主编号排序（与原sort_values+groupby一致），只对出现过的主编号排序
+    present = np.flatnonzero(best != np.iinfo(np.int64).max)
+    main_names = main_uniques.tolist()
+    present = sorted(present.tolist(), key=main_names.__getitem__)
+    winners = best[present] % n
+    is_dup = np.ones(n, dtype=bool)
+    is_dup[winners] = False
+    # 保留唯一主编号的行（按主编号排序），其余为重复项（保持原顺序）
+    df_unique = df_with_desc.iloc[winners].copy()
+    df_dup = df_with_desc[is_dup].copy()
+    return df_unique, df_dup
+
+def calc_coverage(df):
+    # 统计Testable字段，覆盖率 (Y+L)/(Y+L+N)
+    testable_counts = df["Testable"].value_counts()
+    y_count = testable_counts.get("Y", 0)
+    n_count = testable_counts.get("N", 0)
+    l_count = testable_counts.get("L", 0)
+    total = y_count + n_count + l_count
+    coverage = (y_count + l_count) / total if total > 0 else 0
+    return y_count, n_count, l_count, coverage
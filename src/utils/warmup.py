@@ -0,0 +1,28 @@
+import importlib
+import threading
+
+# 启动加速：入口（桌面版、网页版、批处理、报告服务）启动时不导入 pandas / openpyxl / 解析器，
+# 界面显示后调用 warm_up() 在后台线程中预先导入，用户开始处理时通常已导入完成
+# 导入有模块锁：预热未完成时开始处理，处理线程等待正在进行的导入，不会重复导入
+
+HEAVY_MODULES = ("utils.pipeline", "utils.excel_utils", "utils.excel_stream", "utils.history")
+
+_thread = None
+_lock = threading.Lock()
+
+def preload(modules=HEAVY_MODULES):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # 预热失败不影响界面，真正使用时再报错
+            pass
+
+def warm_up(modules=HEAVY_MODULES):
+    # 每个进程只启动一次（网页版每次重跑都会调用）
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=preload, args=(modules,), name="warm-up", daemon=True)
+            _thread.start()
+    return _thread